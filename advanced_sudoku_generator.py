@@ -1,201 +1,228 @@
 import random
 import numpy as np
 
+from calibration import choose_clues
+from deadline import Deadline, as_deadline
+from difficulty_grader import DifficultyGrader
 from puzzle_generator import PuzzleGenerator
 
+# Rotational: 180 degree turn about the centre; mirror: left-right reflection;
+# diagonal: reflection in the main diagonal
+SYMMETRY_MODES = ('rotational', 'mirror', 'diagonal')
+
 class AdvancedSudokuGenerator(PuzzleGenerator):
-    
-    def generate_professional_sudoku(self, min_clues=None, symmetry=False, required_difficulty="medium", timeout=60):
-        """Generate a professional Sudoku puzzle with optional symmetry and specified difficulty."""
-        # Default clue counts based on grid size and difficulty
-        default_clues = {
-            4: {
-                'easy': 8,
-                'medium': 6,
-                'hard': 4
-            },
-            9: {
-                'easy': 40,
-                'medium': 35,
-                'hard': 30
-            },
-            16: {
-                'easy': 200,
-                'medium': 150,
-                'hard': 120
-            }
-        }
-
-        # If min_clues not specified, use default based on size and difficulty
+
+    def __init__(self, size=9):
+        super().__init__(size)
+        self.grader = DifficultyGrader(size)
+        # Candidates tried per puzzle when they are graded, most are rejected
+        self.graded_attempts = 1000
+
+    def generate_professional_sudoku(self, min_clues=None, symmetry=False, required_difficulty="medium", timeout=60,
+                                     deadline=None, grade=False):
+        """Generate a professional Sudoku puzzle with optional symmetry and specified difficulty.
+
+        symmetry is False, True (rotational) or one of SYMMETRY_MODES. The
+        timeout covers filling and number removal. A shared deadline, if
+        given, replaces it and lets another thread or process cancel the work.
+
+        With grade=True each candidate is rated by the DifficultyGrader and
+        rejected unless its rating matches required_difficulty; otherwise the
+        difficulty only selects the clue count.
+
+        min_clues is used as given; calibration.check_clues tells whether
+        it can be reached in time.
+        """
+        # If min_clues not specified, use the calibrated count for the difficulty
         if min_clues is None:
-            min_clues = default_clues[self.size][required_difficulty]
+            min_clues = choose_clues(self.size, required_difficulty, timeout, grade)
 
-        # For 16x16, ensure minimum clues for better performance
-        if self.size == 16:
-            min_clues = max(min_clues, 120)
+        mode = self._symmetry_mode(symmetry)
+        if mode:
+            self._check_symmetric_clue_count(mode, min_clues)
 
-        import time
-        start_time = time.time()
-        max_attempts = 5
+        if deadline is None:
+            deadline = Deadline(timeout)
+        max_attempts = self.graded_attempts if grade else 5
         attempt = 0
         
-        grid = np.zeros((self.size, self.size), dtype=object if self.size == 16 else int)
+        grid = np.zeros((self.size, self.size), dtype=object if self.size >= 16 else int)
         while attempt < max_attempts:
-            if time.time() - start_time > timeout:
-                raise TimeoutError(f"Failed to generate {self.size}x{self.size} puzzle within {timeout} seconds")
+            deadline.check(f"Generating a {self.size}x{self.size} puzzle")
 
             attempt += 1
-            grid = np.zeros((self.size, self.size), dtype=object if self.size == 16 else int)
+            grid = np.zeros((self.size, self.size), dtype=object if self.size >= 16 else int)
             
-            if self.fill_grid(grid):
+            if self.fill_grid(grid, deadline=deadline):
+                # Boards dug from the previous solution will not come up again
+                self.transpositions.clear()
                 try:
                     # Store solution for enforce_exact_clue_count
                     self.solution = grid.copy()
 
                     # Apply appropriate number removal strategy
-                    if symmetry:
-                        puzzle = self.remove_numbers_with_symmetry(grid.copy(), num_clues=min_clues)
+                    if mode:
+                        puzzle = self.remove_numbers_with_symmetry(grid.copy(), num_clues=min_clues,
+                                                                   deadline=deadline, mode=mode)
                     else:
-                        puzzle = self.remove_numbers_exact_clues(grid.copy(), num_clues=min_clues)
+                        puzzle = self.remove_numbers_exact_clues(grid.copy(), num_clues=min_clues, deadline=deadline)
 
                     # Ensure exact clue count while maintaining symmetry
-                    puzzle = self.enforce_exact_clue_count(puzzle, min_clues, symmetry)
-                    
+                    puzzle = self.enforce_exact_clue_count(puzzle, min_clues, mode, deadline)
+
+                    if grade and not self.grader.accepts(self._to_values(puzzle), required_difficulty):
+                        continue
+
                     # Check if the puzzle is valid
                     if min_clues <= self.size * self.size:
                         return puzzle, grid
+                except TimeoutError:
+                    raise
                 except Exception:
                     continue
 
         raise RuntimeError(f"Failed to generate valid puzzle after {max_attempts} attempts")
 
-    def remove_numbers_with_symmetry(self, grid, num_clues):
-        """Remove numbers symmetrically from the grid."""
-        total_cells = self.size * self.size
-        cells_to_remove = total_cells - num_clues
-        removed = 0
-        
-        # Get all symmetric pairs (mirror across center)
-        max_idx = self.size - 1
-        symmetric_pairs = [
-            (r, c, max_idx - r, max_idx - c) 
-            for r in range(self.size) 
-            for c in range(self.size) 
-            if r <= max_idx - r and c <= max_idx - c
-        ]
-        random.shuffle(symmetric_pairs)
-
-        for r1, c1, r2, c2 in symmetric_pairs:
-            if removed >= cells_to_remove // 2:
-                break
-
-            if grid[r1][c1] == 0 or grid[r2][c2] == 0:
-                continue
-
-            backup1, backup2 = grid[r1][c1], grid[r2][c2]
-            grid[r1][c1], grid[r2][c2] = 0, 0
-
-            # Ensure unique solution
-            if self.has_unique_solution(grid):
-                removed += 2  # Removing two cells symmetrically
-            else:
-                grid[r1][c1], grid[r2][c2] = backup1, backup2  # Restore if removing breaks uniqueness
-
+    def _symmetry_mode(self, symmetry):
+        """Map a symmetry argument to a mode name, None when symmetry is off."""
+        if not symmetry:
+            return None
+        if symmetry is True:
+            return 'rotational'
+        if symmetry not in SYMMETRY_MODES:
+            raise ValueError(f"Symmetry must be one of {', '.join(SYMMETRY_MODES)}")
+        return symmetry
+
+    def symmetry_groups(self, mode='rotational'):
+        """Split the flat cell indices into orbits of a symmetry.
+
+        Returns:
+            list: Tuples of one cell (mapped onto itself) or two symmetric cells
+        """
+        size = self.size
+        max_idx = size - 1
+        image = {
+            'rotational': lambda r, c: (max_idx - r, max_idx - c),
+            'mirror': lambda r, c: (r, max_idx - c),
+            'diagonal': lambda r, c: (c, r),
+        }[self._symmetry_mode(mode)]
+
+        groups = []
+        for r in range(size):
+            for c in range(size):
+                r2, c2 = image(r, c)
+                cell, twin = r * size + c, r2 * size + c2
+                if cell < twin:
+                    groups.append((cell, twin))
+                elif cell == twin:
+                    groups.append((cell,))
+        return groups
+
+    def _check_symmetric_clue_count(self, mode, num_clues):
+        """Raise ValueError if no symmetric puzzle can have exactly num_clues clues."""
+        if any(len(group) == 1 for group in self.symmetry_groups(mode)):
+            return
+        if num_clues % 2:
+            raise ValueError(
+                f"A {self.size}x{self.size} puzzle with {mode} symmetry needs an even clue count, got {num_clues}"
+            )
+
+    def remove_numbers_with_symmetry(self, grid, num_clues, deadline=None, mode='rotational'):
+        """Remove numbers symmetrically, leaving exactly num_clues if the clue miner gets there.
+
+        Symmetric cells are removed together and every removal is checked for
+        uniqueness, so the puzzle is always uniquely solvable; it keeps more
+        clues than requested if the miner's time budget runs out first.
+        """
+        deadline = as_deadline(deadline)
+        self._check_symmetric_clue_count(mode, num_clues)
+        solution = self._to_values(grid) if np.all(grid != 0) else None
+        self.mine_clues(grid, num_clues, solution, deadline, self.symmetry_groups(mode))
         return grid
 
-    def remove_numbers_exact_clues(self, grid, num_clues):
-        """Remove numbers to leave exactly num_clues in the grid."""
+    def remove_numbers_exact_clues(self, grid, num_clues, start_time=None, timeout=None, deadline=None, pool=None):
+        """Remove numbers to leave exactly num_clues in the grid.
+
+        With a multiprocessing pool the removal is the base class's
+        speculative one (see SpeculativeRemover).
+        """
+        if pool is not None:
+            return super().remove_numbers_exact_clues(grid, num_clues, start_time, timeout, deadline, pool)
+        deadline = as_deadline(deadline, start_time, timeout)
+        values = self._to_values(grid)
+        key = self.transpositions.key(values)
+        solution = None
+        if all(values) and self.solver.load(values):
+            # A complete valid grid is its own unique solution
+            solution = list(values)
+            self.transpositions.put(key, 1)
         total_cells = self.size * self.size
         cells_to_remove = total_cells - num_clues
         removed = 0
 
-        all_cells = [(r, c) for r in range(self.size) for c in range(self.size)]
+        all_cells = list(range(total_cells))
         random.shuffle(all_cells)
 
-        for row, col in all_cells:
+        for cell in all_cells:
+            deadline.check("Number removal")
             if removed >= cells_to_remove:
                 break
 
-            if grid[row][col] == 0:
+            value = values[cell]
+            if not value:
                 continue
 
-            backup = grid[row][col]
-            grid[row][col] = 0
+            values[cell] = 0
+            key = self.transpositions.toggle(key, cell, value)
 
             # Check if the puzzle still has a unique solution
-            if self.has_unique_solution(grid):
+            if self._is_unique(values, deadline, key, (cell, value)):
                 removed += 1  # Successful removal
             else:
-                grid[row][col] = backup  # Restore if removing breaks uniqueness
+                values[cell] = value  # Restore if removing breaks uniqueness
+                key = self.transpositions.toggle(key, cell, value)
 
+        self._from_values(grid, values)
+        if removed < cells_to_remove:
+            self.mine_clues(grid, num_clues, solution, deadline)
         return grid
 
-    def enforce_exact_clue_count(self, grid, min_clues, symmetry=False):
-        """Ensure the puzzle has exactly `min_clues` by forcefully removing or restoring cells."""
+    def enforce_exact_clue_count(self, grid, min_clues, symmetry=False, deadline=None):
+        """Ensure the puzzle has exactly `min_clues` by restoring cells or removing them.
+
+        Restored cells come from self.solution. Cells are only removed while
+        the solution stays unique, and with symmetry cells are restored and
+        removed together with their symmetric counterparts. RuntimeError is
+        raised if the clue miner cannot get down to min_clues, so the caller
+        can retry.
+        """
+        mode = self._symmetry_mode(symmetry)
+        if mode:
+            self._check_symmetric_clue_count(mode, min_clues)
+            groups = self.symmetry_groups(mode)
+        else:
+            groups = [(cell,) for cell in range(self.size * self.size)]
         current_clues = sum(1 for r in range(self.size) for c in range(self.size) if grid[r][c] != 0)
-        total_cells = self.size * self.size
 
-        max_idx = self.size - 1
-
-        if symmetry:
-            # Handle symmetric restoration/removal
-            if current_clues < min_clues:
-                # Get all symmetric pairs of empty cells
-                empty_pairs = [
-                    (r1, c1, r2, c2) for r1 in range(self.size) for c1 in range(self.size)
-                    for r2, c2 in [(max_idx - r1, max_idx - c1)]
-                    if grid[r1][c1] == 0 and grid[r2][c2] == 0 and (r1 < r2 or (r1 == r2 and c1 <= c2))
-                ]
-                random.shuffle(empty_pairs)
-                
-                for r1, c1, r2, c2 in empty_pairs:
-                    if current_clues >= min_clues:
-                        break
-                    if r1 == r2 and c1 == c2:  # Center cell
-                        grid[r1][c1] = self.solution[r1][c1]
-                        current_clues += 1
-                    else:
-                        grid[r1][c1] = self.solution[r1][c1]
-                        grid[r2][c2] = self.solution[r2][c2]
-                        current_clues += 2
-
-            if current_clues > min_clues:
-                # Get all symmetric pairs of filled cells
-                filled_pairs = [
-                    (r1, c1, r2, c2) for r1 in range(self.size) for c1 in range(self.size)
-                    for r2, c2 in [(max_idx - r1, max_idx - c1)]
-                    if grid[r1][c1] != 0 and grid[r2][c2] != 0 and (r1 < r2 or (r1 == r2 and c1 <= c2))
-                ]
-                random.shuffle(filled_pairs)
-                
-                for r1, c1, r2, c2 in filled_pairs:
-                    if current_clues <= min_clues:
-                        break
-                    if r1 == r2 and c1 == c2:  # Center cell
-                        if current_clues - 1 >= min_clues:
-                            grid[r1][c1] = 0
-                            current_clues -= 1
-                    else:
-                        grid[r1][c1] = grid[r2][c2] = 0
-                        current_clues -= 2
-        else:
-            # Original non-symmetric logic
-            if current_clues < min_clues:
-                all_cells = [(r, c) for r in range(self.size) for c in range(self.size) if grid[r][c] == 0]
-                random.shuffle(all_cells)
-                for row, col in all_cells:
-                    if current_clues >= min_clues:
-                        break
+        if current_clues < min_clues:
+            empty_groups = [group for group in groups if grid[divmod(group[0], self.size)] == 0]
+            random.shuffle(empty_groups)
+            # Restore whole groups that fit; if only pairs are left one too
+            # many clues is restored and mined away below
+            empty_groups.sort(key=lambda group: current_clues + len(group) > min_clues)
+            for group in empty_groups:
+                if current_clues >= min_clues:
+                    break
+                for cell in group:
+                    row, col = divmod(cell, self.size)
                     grid[row][col] = self.solution[row][col]
-                    current_clues += 1
-
-            if current_clues > min_clues:
-                all_filled_cells = [(r, c) for r in range(self.size) for c in range(self.size) if grid[r][c] != 0]
-                random.shuffle(all_filled_cells)
-                for row, col in all_filled_cells:
-                    if current_clues <= min_clues:
-                        break
-                    grid[row][col] = 0
-                    current_clues -= 1
+                current_clues += len(group)
+
+        if current_clues > min_clues:
+            solution = self._to_values(self.solution)
+            if not self.mine_clues(grid, min_clues, solution, deadline, groups if mode else None):
+                raise RuntimeError(
+                    f"Could not reduce the puzzle to {min_clues} clues while keeping a unique solution"
+                )
 
         return grid
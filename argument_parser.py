@@ -9,7 +9,9 @@ class ArgumentParser:
             epilog="""
 Examples:
   python sudoku.py -config easy:20:40 -config medium:30:35 --use-symmetry
-  python sudoku.py -config hard:10:17 -output sudoku_puzzles.pdf --gen-answers
+  python sudoku.py -config hard:10:24 -output diagonal.pdf --symmetry diagonal
+  python sudoku.py -config hard:10:22 -output sudoku_puzzles.pdf --gen-answers
+  python sudoku.py -manifest nightly.toml
         """
         )
         self._add_arguments()
@@ -19,9 +21,9 @@ Examples:
         self.parser.add_argument(
             '-size',
             type=int,
-            choices=[4, 9, 16],
+            choices=[4, 9, 16, 25],
             default=9,
-            help='Grid size (4 for 4x4, 9 for 9x9, 16 for 16x16). Default: 9'
+            help='Grid size (4 for 4x4, 9 for 9x9, 16 for 16x16, 25 for 25x25). Default: 9'
         )
 
         # Puzzle difficulty and number of puzzles in format "easy:20:40" (difficulty:count:clues)
@@ -29,15 +31,21 @@ Examples:
             '-config', 
             action='append', 
             help='Puzzle difficulty and number in format "easy:20", "medium:35", "hard:10".\n'
-                 'You can specify multiple difficulties with different counts.',
-            required=True
+                 'You can specify multiple difficulties with different counts.'
         )
 
         # Output PDF file name
         self.parser.add_argument(
             '-output', 
-            help="Name of the output PDF file (e.g., sudoku_puzzles.pdf).", 
-            required=True
+            help="Name of the output PDF file (e.g., sudoku_puzzles.pdf)."
+        )
+
+        # Many books in one run, instead of -size/-config/-output
+        self.parser.add_argument(
+            '-manifest',
+            help="JSON or TOML file describing several books, each with its own\n"
+                 "output, size, config, symmetry, grade, timeout and gen_answers settings.\n"
+                 "All books share one worker pool; each is written once it is complete."
         )
 
         # Generate answers
@@ -54,6 +62,38 @@ Examples:
             action='store_true'
         )
 
+        # Symmetry mode, implies --use-symmetry
+        self.parser.add_argument(
+            '--symmetry',
+            choices=['rotational', 'mirror', 'diagonal'],
+            help="Symmetry of the clue pattern. --use-symmetry alone means rotational."
+        )
+
+        # Reject puzzles whose technique rating does not match their difficulty
+        self.parser.add_argument(
+            '--grade',
+            help="Rate each puzzle by the solving techniques it needs and keep only\n"
+                 "puzzles whose rating matches the requested difficulty.",
+            action='store_true'
+        )
+
+        # Time limit per puzzle
+        self.parser.add_argument(
+            '-timeout',
+            type=float,
+            default=60,
+            help="Seconds allowed per puzzle attempt before it gives up. Default: 60"
+        )
+
+        # Serve the tasks to sudoku_worker.py processes instead of a local pool
+        self.parser.add_argument(
+            '-coordinator',
+            metavar='HOST:PORT',
+            help="Hand the generation tasks to workers started with\n"
+                 "python sudoku_worker.py -coordinator HOST:PORT, e.g. on other machines,\n"
+                 "instead of generating them locally. Port 0 picks a free port."
+        )
+
         # Check if no arguments are provided
         if len(sys.argv) == 1:
             self.parser.print_help(sys.stderr)
@@ -61,4 +101,109 @@ Examples:
 
     # Parse the command line arguments
     def parse(self):
-        return self.parser.parse_args()
+        args = self.parser.parse_args()
+        if args.manifest and (args.config or args.output):
+            self.parser.error("-manifest replaces -config and -output")
+        if not args.manifest and not (args.config and args.output):
+            self.parser.error("-config and -output are required without -manifest")
+        return args
+
+
+class WorkerArgumentParser:
+    def __init__(self):
+        self.parser = argparse.ArgumentParser(
+            description="Generate puzzles for a sudoku.py run started with -coordinator.",
+            formatter_class=argparse.RawTextHelpFormatter,
+            epilog="""
+Examples:
+  python sudoku.py -config easy:5000 -output big.pdf -coordinator 0.0.0.0:7700
+  python sudoku_worker.py -coordinator render-node:7700 -processes 8
+        """
+        )
+        self._add_arguments()
+
+    def _add_arguments(self):
+        # Address of the coordinating sudoku.py run
+        self.parser.add_argument(
+            '-coordinator',
+            metavar='HOST:PORT',
+            required=True,
+            help="Address the coordinating sudoku.py listens on."
+        )
+
+        # Number of worker processes
+        self.parser.add_argument(
+            '-processes',
+            type=int,
+            default=None,
+            help="Number of worker processes. Default: all CPU cores"
+        )
+
+        # Heartbeat interval
+        self.parser.add_argument(
+            '-heartbeat',
+            type=float,
+            default=2.0,
+            help="Seconds between heartbeats while a task runs. Default: 2"
+        )
+
+    # Parse the command line arguments
+    def parse(self):
+        args = self.parser.parse_args()
+        if args.processes is not None and args.processes < 1:
+            self.parser.error("-processes must be at least 1")
+        return args
+
+
+class SolverArgumentParser:
+    def __init__(self):
+        self.parser = argparse.ArgumentParser(
+            description="Solve Sudoku puzzles in line format (one board per line, '.' or '0' for empty cells).",
+            formatter_class=argparse.RawTextHelpFormatter,
+            epilog="""
+Examples:
+  python solve.py -input partner_puzzles.txt -output solutions.txt
+  cat puzzles.txt | python solve.py -workers 4 > solutions.txt
+        """
+        )
+        self._add_arguments()
+
+    def _add_arguments(self):
+        # Input file with one puzzle per line, stdin by default
+        self.parser.add_argument(
+            '-input',
+            default='-',
+            help="File with one puzzle per line. Default: stdin"
+        )
+
+        # Output file for solutions, stdout by default
+        self.parser.add_argument(
+            '-output',
+            default='-',
+            help="File to write one result line per puzzle. Default: stdout"
+        )
+
+        # Number of worker processes
+        self.parser.add_argument(
+            '-workers',
+            type=int,
+            default=None,
+            help="Number of worker processes. Default: all CPU cores"
+        )
+
+        # Puzzles sent to a worker at once
+        self.parser.add_argument(
+            '-chunk-size',
+            type=int,
+            default=256,
+            help="Number of puzzles handed to a worker at once. Default: 256"
+        )
+
+    # Parse the command line arguments
+    def parse(self):
+        args = self.parser.parse_args()
+        if args.workers is not None and args.workers < 1:
+            self.parser.error("-workers must be at least 1")
+        if args.chunk_size < 1:
+            self.parser.error("-chunk-size must be at least 1")
+        return args
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Benchmark of batched generation tasks against one task per puzzle.
+
+The per-puzzle mode is what sudoku.py used to do: every task builds a new
+generator and returns a pickled pair of numpy arrays through pool.map.
+The batched mode builds one generator per worker and returns each batch
+as a single packed buffer (PuzzleGenerator.pack_puzzles).
+
+Usage: python benchmarks/bench_batching.py [-size 4] [-count 2000] [-difficulty easy]
+"""
+
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Pool, cpu_count
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sudoku
+from advanced_sudoku_generator import AdvancedSudokuGenerator
+from calibration import choose_clues
+from puzzle_generator import PuzzleGenerator
+
+
+def per_puzzle_task(task):
+    min_clues, difficulty, grid_size = task
+    generator = AdvancedSudokuGenerator(size=grid_size)
+    return generator.generate_professional_sudoku(min_clues=min_clues, required_difficulty=difficulty)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-size', type=int, default=4, choices=[4, 9, 16, 25])
+    parser.add_argument('-count', type=int, default=2000)
+    parser.add_argument('-difficulty', default='easy', choices=['easy', 'medium', 'hard'])
+    args = parser.parse_args()
+
+    min_clues = choose_clues(args.size, args.difficulty, 60)
+    cores = cpu_count()
+    print(f"{args.count} {args.difficulty} {args.size}x{args.size} puzzles on {cores} CPUs")
+
+    with Pool(cores) as pool:
+        start = time.perf_counter()
+        pool.map(per_puzzle_task, [(min_clues, args.difficulty, args.size)] * args.count)
+        elapsed = time.perf_counter() - start
+    print(f"  {'per puzzle':<10} {args.count / elapsed:9.0f} puzzles/s")
+
+    counts = sudoku.batch_sizes(args.count, args.size, cores)
+    tasks = [(min_clues, args.difficulty, False, args.size, 60, False, count, sum(counts[:i]))
+             for i, count in enumerate(counts)]
+    with Pool(cores) as pool:
+        start = time.perf_counter()
+        buffers = pool.map(sudoku.generate_batch, tasks)
+        decoder = PuzzleGenerator(args.size)
+        puzzles = [pair for buffer in buffers for pair in decoder.unpack_puzzles(buffer)]
+        elapsed = time.perf_counter() - start
+    print(f"  {'batched':<10} {len(puzzles) / elapsed:9.0f} puzzles/s   "
+          f"({len(tasks)} tasks, {sum(map(len, buffers))} bytes returned)")
+
+
+if __name__ == "__main__":
+    main()
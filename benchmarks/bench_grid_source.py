@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Speed and bias benchmark for SolvedGridGenerator (the generators' fill stage).
+
+Compares grids from plain randomized search with grids from the pooled
+search + transform source on:
+  * time per grid
+  * per-cell symbol frequencies (chi-square / degrees of freedom, ~1 means uniform)
+  * a transform-invariant statistic, the number of unavoidable 4-cell
+    rectangles per grid. Transforms cannot change it, so a source whose
+    pool of base grids were too small or biased would show a shifted mean.
+    Grids transformed from the same base share their count, so the pooled
+    source's standard error treats each base as one sample, weighted by
+    the grids it gave (a cluster-robust standard error); "bases" is the
+    number of them behind the grids.
+
+Usage: python benchmarks/bench_grid_source.py [-size 16] [-count 400]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solved_grid_generator import SolvedGridGenerator
+
+
+def count_rectangles(grid):
+    """Count 2x2 rectangles spanning two boxes whose diagonals hold equal symbols."""
+    size = grid.shape[0]
+    box = int(size ** 0.5)
+    total = 0
+    for g in (grid, grid.T):
+        for r1 in range(size):
+            for r2 in range(r1 + 1, (r1 // box + 1) * box):
+                a, b = g[r1], g[r2]
+                match = (a[:, None] == b[None, :]) & (a[None, :] == b[:, None])
+                total += int(np.triu(match, 1).sum())
+    return total
+
+
+def chi_square_per_dof(grids, size):
+    counts = np.zeros((size * size, size + 1))
+    for grid in grids:
+        counts[np.arange(size * size), grid.ravel()] += 1
+    counts = counts[:, 1:]
+    expected = len(grids) / size
+    chi2 = ((counts - expected) ** 2 / expected).sum()
+    return chi2 / (size * size * (size - 1))
+
+
+def sample(source, count, fresh_only):
+    """Draw count grids; also return, per grid, the index of the base grid it was transformed from."""
+    bases = []
+    transform = source.transform
+
+    def tracked(base):
+        bases.append(base)
+        return transform(base)
+
+    source.transform = tracked
+    grids = []
+    start = time.perf_counter()
+    for _ in range(count):
+        values = source.search_grid() if fresh_only else source.generate()
+        grids.append(np.array(values).reshape(source.size, source.size))
+    elapsed = (time.perf_counter() - start) / count
+    if fresh_only:
+        return grids, np.arange(count), elapsed
+    index = {}
+    return grids, np.array([index.setdefault(id(base), len(index)) for base in bases]), elapsed
+
+
+def clustered_mean(values, clusters):
+    """Mean of values and its standard error when values of one cluster are not independent.
+
+    Returns:
+        tuple: (mean, standard error, number of clusters)
+    """
+    mean = values.mean()
+    sums = np.bincount(clusters, weights=values - mean)
+    count = len(sums)
+    return mean, np.sqrt((sums ** 2).sum() * count / (count - 1)) / len(values), count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-size', type=int, default=16, choices=[4, 9, 16, 25])
+    parser.add_argument('-count', type=int, default=400)
+    parser.add_argument('-seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.size}x{args.size}, {args.count} grids per source")
+    results = {}
+    for name, fresh_only in (('search only', True), ('search + transforms', False)):
+        source = SolvedGridGenerator(args.size, rng=random.Random(args.seed))
+        grids, clusters, per_grid = sample(source, args.count, fresh_only)
+        rectangles = np.array([count_rectangles(grid) for grid in grids], dtype=float)
+        results[name] = mean, error, bases = clustered_mean(rectangles, clusters)
+        print(f"  {name:<20} {per_grid * 1000:8.2f} ms/grid   chi2/dof {chi_square_per_dof(grids, args.size):5.2f}   "
+              f"rectangles {mean:6.2f} +/- {error:.2f} ({bases} bases)")
+
+    (a, error_a, _), (b, error_b, _) = results.values()
+    print(f"  rectangle mean difference: {abs(a - b) / np.hypot(error_a, error_b):.2f} standard errors")
+
+
+if __name__ == "__main__":
+    main()
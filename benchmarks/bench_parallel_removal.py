@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Benchmark of speculative parallel removal checks for a single puzzle.
+
+Digs the same grids (same seeds) with the sequential removal pass and with
+SpeculativeRemover over a process pool, reporting time per puzzle, the
+uniqueness checks sent to the pool and the rounds spent waiting on them.
+Rounds, not checks, are on the critical path once there is a core per
+worker, so checks / rounds bounds the latency gain on such a machine.
+
+Usage: python benchmarks/bench_parallel_removal.py [-size 16] [-count 5] [-clues 120] [-workers 4]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deadline import Deadline
+from parallel_removal import SpeculativeRemover
+from puzzle_generator import PuzzleGenerator
+
+
+def dig(generator, grid, clues, seed, remover=None):
+    values = list(grid)
+    table = generator.transpositions
+    table.clear()
+    key = table.key(values)
+    table.put(key, 1)
+    order = list(range(len(values)))
+    random.Random(seed).shuffle(order)
+    cells_to_remove = len(values) - clues
+    if remover is not None:
+        return remover.remove(values, cells_to_remove, order, Deadline(), key)
+    removed = 0
+    for cell in order:
+        if removed >= cells_to_remove:
+            break
+        value = values[cell]
+        values[cell] = 0
+        child = table.toggle(key, cell, value)
+        if generator._is_unique(values, key=child, removed=(cell, value)):
+            key = child
+            removed += 1
+        else:
+            values[cell] = value
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-size', type=int, default=16, choices=[9, 16, 25])
+    parser.add_argument('-count', type=int, default=5)
+    parser.add_argument('-clues', type=int, default=120)
+    parser.add_argument('-workers', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('-seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generator = PuzzleGenerator(args.size)
+    grids = [generator.grid_source.generate() for _ in range(args.count)]
+    print(f"{args.size}x{args.size}, {args.count} puzzles with {args.clues} clues, "
+          f"{args.workers} workers on {os.cpu_count()} CPUs")
+
+    start = time.perf_counter()
+    for index, grid in enumerate(grids):
+        dig(generator, grid, args.clues, args.seed + index)
+    print(f"  {'sequential':<12} {(time.perf_counter() - start) / args.count * 1000:9.1f} ms/puzzle")
+
+    with Pool(args.workers) as pool:
+        remover = SpeculativeRemover(generator, pool, window=args.workers)
+        start = time.perf_counter()
+        for index, grid in enumerate(grids):
+            dig(generator, grid, args.clues, args.seed + index, remover)
+        elapsed = time.perf_counter() - start
+    print(f"  {'speculative':<12} {elapsed / args.count * 1000:9.1f} ms/puzzle   "
+          f"checks {remover.checks / args.count:7.1f}   rounds {remover.rounds / args.count:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
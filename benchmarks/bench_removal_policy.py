@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark of the batch policies of number removal on large grids.
+
+Digs the same grids (same seeds) with each of REMOVAL_POLICIES, reporting
+time per puzzle, uniqueness checks per puzzle and how many of them needed
+a search (the rest were settled by the transposition table).
+
+Usage: python benchmarks/bench_removal_policy.py [-size 16] [-count 10] [-clues 150]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from puzzle_generator import PuzzleGenerator, REMOVAL_POLICIES
+
+
+def run(size, grids, clues, policy, seed):
+    random.seed(seed)
+    generator = PuzzleGenerator(size)
+    generator.removal_policy = policy
+    generator.miner.time_budget = 0
+    checks = 0
+    is_unique = generator._is_unique
+
+    def counted(*args, **kwargs):
+        nonlocal checks
+        checks += 1
+        return is_unique(*args, **kwargs)
+
+    generator._is_unique = counted
+    start = time.perf_counter()
+    remaining = 0
+    for grid in grids:
+        generator.transpositions.clear()
+        puzzle = generator.remove_numbers_exact_clues(grid.copy(), clues)
+        remaining += sum(1 for value in puzzle.flat if value)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(grids), checks / len(grids), remaining / len(grids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-size', type=int, default=16, choices=[16, 25])
+    parser.add_argument('-count', type=int, default=10)
+    parser.add_argument('-clues', type=int, default=150)
+    parser.add_argument('-seed', type=int, default=0)
+    args = parser.parse_args()
+
+    source = PuzzleGenerator(args.size)
+    random.seed(args.seed)
+    grids = []
+    for _ in range(args.count):
+        grid = source.generate_sudoku(min_clues=args.size * args.size)[1]
+        grids.append(grid)
+
+    print(f"{args.size}x{args.size}, {args.count} puzzles dug to {args.clues} clues (clue miner off)")
+    for policy in REMOVAL_POLICIES:
+        per_puzzle, checks, remaining = run(args.size, grids, args.clues, policy, args.seed)
+        print(f"  {policy:<9} {per_puzzle * 1000:9.1f} ms/puzzle   checks {checks:7.1f}   clues left {remaining:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
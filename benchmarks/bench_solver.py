@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Throughput benchmark for the bulk solver (solve.py).
+
+Builds a corpus of uniquely solvable puzzles with the bitmask solver, then
+streams it through solve_stream with 1 worker and with all cores.
+
+Usage: python benchmarks/bench_solver.py [-count 20000] [-size 9]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from multiprocessing import cpu_count
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitmask_solver import BitmaskSolver
+from line_format import format_line
+from solve import read_chunks, solve_stream
+
+
+def build_corpus(size, distinct, seed=0):
+    """Dig random full grids down to minimal unique puzzles."""
+    rng = random.Random(seed)
+    solver = BitmaskSolver(size)
+    lines = []
+    for _ in range(distinct):
+        values = solver.fill([0] * size * size, rng)
+        cells = list(range(size * size))
+        rng.shuffle(cells)
+        for cell in cells:
+            backup = values[cell]
+            values[cell] = 0
+            if not solver.has_unique_solution(values):
+                values[cell] = backup
+        lines.append(format_line(values))
+    return lines
+
+
+def run(lines, workers, chunk_size):
+    start = time.perf_counter()
+    solved = sum(
+        1 for results in solve_stream(read_chunks(iter(lines), chunk_size), workers)
+        for status, _ in results if status == 'solved'
+    )
+    elapsed = time.perf_counter() - start
+    print(f"  workers={workers:<3} {len(lines)} puzzles in {elapsed:.2f}s "
+          f"-> {len(lines) / elapsed:,.0f} puzzles/s ({solved} solved)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-count', type=int, default=20000)
+    parser.add_argument('-size', type=int, default=9, choices=[4, 9, 16])
+    parser.add_argument('-chunk-size', type=int, default=256)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.size, distinct=200)
+    lines = [corpus[i % len(corpus)] for i in range(args.count)]
+    print(f"Bulk solve, {args.size}x{args.size}, minimal-clue puzzles:")
+    run(lines, 1, args.chunk_size)
+    run(lines, cpu_count(), args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Start-up time of the command line tools and the web app against a budget.
+
+Every command runs in a fresh interpreter; the best of -runs wall times is
+compared with its budget after subtracting the start-up time of a bare
+`python -c pass`, which leaves the cost of the imports and set-up the
+command itself does. Exits with status 1 when a command is over budget.
+
+Usage: python benchmarks/bench_startup.py [-runs 10]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Milliseconds on top of the bare interpreter start-up allowed per command
+STARTUP_BUDGETS = {
+    'sudoku.py --help': 60,
+    'sudoku.py (argument error)': 60,
+    'solve.py --help': 60,
+    'sudoku_worker.py --help': 80,
+    'web app import': 400,
+}
+
+COMMANDS = {
+    'sudoku.py --help': ['sudoku.py', '--help'],
+    'sudoku.py (argument error)': ['sudoku.py', '-size', '9'],
+    'solve.py --help': ['solve.py', '--help'],
+    'sudoku_worker.py --help': ['sudoku_worker.py', '--help'],
+    'web app import': ['-c', 'import web.app'],
+}
+
+
+def best_time(arguments, runs):
+    """Best wall time in milliseconds of running the interpreter with these arguments."""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + arguments, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-runs', type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = best_time(['-c', 'pass'], args.runs)
+    print(f"{'bare interpreter':>28}: {baseline:7.1f} ms")
+    over = []
+    for name, arguments in COMMANDS.items():
+        elapsed = best_time(arguments, args.runs) - baseline
+        budget = STARTUP_BUDGETS[name]
+        status = 'ok' if elapsed <= budget else 'OVER BUDGET'
+        print(f"{name:>28}: {elapsed:+7.1f} ms  (budget {budget} ms)  {status}")
+        if elapsed > budget:
+            over.append(name)
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
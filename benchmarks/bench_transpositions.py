@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Benchmark of the transposition table shared by uniqueness checks while digging.
+
+Generates the same puzzles (same seeds) with the table enabled and with it
+disabled (capacity 0), reporting time per puzzle and the table's hit rate.
+Each check looks up the board and, after a single removal, its parent
+board, so a hit rate near 50% means most removals were settled without
+a search.
+
+Usage: python benchmarks/bench_transpositions.py [-size 9] [-count 20] [-clues 24]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from advanced_sudoku_generator import AdvancedSudokuGenerator
+
+
+def run(size, count, clues, capacity, seed):
+    random.seed(seed)
+    generator = AdvancedSudokuGenerator(size)
+    generator.miner.rng = random.Random(seed)
+    generator.transpositions.capacity = capacity
+    start = time.perf_counter()
+    for _ in range(count):
+        generator.generate_professional_sudoku(min_clues=clues)
+    table = generator.transpositions
+    return (time.perf_counter() - start) / count, table.hits, table.misses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-size', type=int, default=9, choices=[4, 9, 16, 25])
+    parser.add_argument('-count', type=int, default=20)
+    parser.add_argument('-clues', type=int, default=24)
+    parser.add_argument('-seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.size}x{args.size}, {args.count} puzzles with {args.clues} clues")
+    for name, capacity in (('no table', 0), ('transposition table', 1 << 16)):
+        per_puzzle, hits, misses = run(args.size, args.count, args.clues, capacity, args.seed)
+        print(f"  {name:<20} {per_puzzle * 1000:9.1f} ms/puzzle   lookups {hits + misses:7d}   "
+              f"hits {hits / max(1, hits + misses):6.1%}")
+
+
+if __name__ == "__main__":
+    main()
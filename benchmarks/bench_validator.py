@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Audit benchmark: vectorized find_violations vs. per-grid Python checks.
+
+Usage: python benchmarks/bench_validator.py [-count 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitmask_solver import BitmaskSolver
+from grid_validator import find_violations
+from puzzle_generator import PuzzleGenerator
+
+
+def loop_audit(grids, generator):
+    """Reference audit: re-place every symbol and check it with is_valid."""
+    ok = []
+    for grid in grids:
+        board = grid.copy()
+        valid = True
+        for row in range(generator.size):
+            for col in range(generator.size):
+                value = board[row, col]
+                board[row, col] = 0
+                valid = valid and generator.is_valid(board, row, col, value)
+                board[row, col] = value
+        ok.append(valid)
+    return np.array(ok)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-count', type=int, default=100000)
+    args = parser.parse_args()
+
+    solver = BitmaskSolver(9)
+    distinct = np.array([solver.fill([0] * 81) for _ in range(100)]).reshape(-1, 9, 9)
+    grids = distinct[np.arange(args.count) % len(distinct)].copy()
+    grids[::1000, 0, 0] = 0  # Plant some violations
+
+    start = time.perf_counter()
+    ok, violations = find_violations(grids)
+    elapsed = time.perf_counter() - start
+    print(f"find_violations: {args.count} grids in {elapsed:.3f}s "
+          f"({args.count / elapsed:,.0f} grids/s), {int((~ok).sum())} bad, {len(violations)} violations")
+
+    sample = grids[:1000]
+    start = time.perf_counter()
+    loop_ok = loop_audit(sample, PuzzleGenerator(9))
+    elapsed = time.perf_counter() - start
+    assert np.array_equal(loop_ok, ok[:1000])
+    print(f"is_valid loop:   {len(sample)} grids in {elapsed:.3f}s "
+          f"({len(sample) / elapsed:,.0f} grids/s)")
+
+
+if __name__ == "__main__":
+    main()
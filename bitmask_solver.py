@@ -0,0 +1,353 @@
+import math
+import random
+
+SUPPORTED_SIZES = (4, 9, 16, 25)
+
+
+class SearchLimitReached(Exception):
+    """Raised when a search exceeds its node budget before finishing."""
+
+
+# Lookup tables by grid size, shared by every solver of that size. They are
+# immutable, so a process that builds them before forking (see
+# web/gunicorn.conf.py) shares them copy-on-write with its children.
+_tables = {}
+
+
+def lookup_tables(size):
+    """Return the cell and unit lookup tables of a grid size, building them on first use.
+
+    Returns:
+        tuple: (cell_row, cell_col, cell_box, units, cell_units, peers)
+    """
+    tables = _tables.get(size)
+    if tables is None:
+        box_size = math.isqrt(size)
+        cells = range(size * size)
+        cell_row = tuple(i // size for i in cells)
+        cell_col = tuple(i % size for i in cells)
+        cell_box = tuple((i // size) // box_size * box_size + (i % size) // box_size for i in cells)
+        units = tuple(
+            tuple(i for i in cells if lookup[i] == index)
+            for lookup in (cell_row, cell_col, cell_box)
+            for index in range(size)
+        )
+        cell_units = tuple(
+            (units[cell_row[i]], units[size + cell_col[i]], units[2 * size + cell_box[i]])
+            for i in cells
+        )
+        peers = tuple(
+            tuple(sorted({peer for unit in cell_units[i] for peer in unit} - {i}))
+            for i in cells
+        )
+        tables = _tables[size] = (cell_row, cell_col, cell_box, units, cell_units, peers)
+    return tables
+
+
+class BitmaskSolver:
+    """Constraint solver keeping row, column and box usage as integer bitmasks.
+
+    Boards are flat lists of ints in row-major order, 0 for an empty cell and
+    1..size for a placed symbol. The search is iterative: guesses live on an
+    explicit stack and every assignment on an undo trail, in state arrays
+    allocated once per solver. It always branches on the empty cell with the
+    fewest candidates after applying naked and hidden singles.
+
+    The engine is resumable. `load` a board, then call `run` with a node
+    budget as many times as needed until it returns True; `count`,
+    `solution` and `nodes` describe the progress so far.
+    """
+
+    def __init__(self, size=9):
+        """Initialize lookup tables and state arrays for a given grid size.
+
+        Args:
+            size (int): Size of the grid (4, 9, 16, or 25)
+        """
+        if size not in SUPPORTED_SIZES:
+            raise ValueError(f"Grid size must be one of {', '.join(map(str, SUPPORTED_SIZES))}")
+        self.size = size
+        self.box_size = math.isqrt(size)
+        self.full_mask = (1 << size) - 1
+
+        num_cells = size * size
+        self.cell_row, self.cell_col, self.cell_box, self.units, self.cell_units, self.peers = lookup_tables(size)
+
+        # Search state, preallocated and reused by every load()
+        self.rows = [0] * size
+        self.cols = [0] * size
+        self.boxes = [0] * size
+        self.grid = [0] * num_cells
+        self.candidates = [0] * num_cells  # candidate masks of empty cells, 0 for filled ones
+        self.where = [0] * num_cells       # position of each empty cell in self.empties
+        self.empties = []
+        self.trail = []  # cells assigned by the search, in order, for undo
+        self.stack = []  # [cell, untried candidate mask, trail length before the guess]
+        self._unit_masks = tuple(
+            (unit, used, index % size)
+            for index, (unit, used) in enumerate(
+                zip(self.units, (self.rows,) * size + (self.cols,) * size + (self.boxes,) * size)
+            )
+        )
+
+        self.count = 0
+        self.solution = None
+        self.nodes = 0
+        self.finished = True
+        self._fresh = False
+
+    def solve(self, values, limit=2, max_nodes=None):
+        """Count solutions up to limit.
+
+        Args:
+            values (list): Flat board, 0 for empty cells
+            limit (int): Stop counting once this many solutions are found
+            max_nodes (int): Optional budget of guesses; SearchLimitReached is
+                raised when it runs out
+
+        Returns:
+            tuple: (count, solution) where solution is the first solution found
+            as a flat list, or None if the board has no solution
+        """
+        self.load(values)
+        if not self.run(limit, max_nodes):
+            raise SearchLimitReached(f"Search exceeded {max_nodes} nodes")
+        return self.count, self.solution
+
+    def has_unique_solution(self, values):
+        """Check if the flat board has exactly one solution."""
+        return self.solve(values, 2)[0] == 1
+
+    def fill(self, values, rng=None, max_nodes=None):
+        """Complete the board with a random solution. Returns None if impossible."""
+        self.load(values)
+        if not self.run(1, max_nodes, rng or random):
+            raise SearchLimitReached(f"Search exceeded {max_nodes} nodes")
+        return self.solution
+
+    def is_forced(self, values, cell, value):
+        """Check if the other givens force value into the empty cell by a naked or hidden single.
+
+        Removing a clue that is forced this way does not change the board's
+        solutions, so no search is needed to see that the board stays unique.
+        """
+        bit = 1 << (value - 1)
+        used = 0
+        for peer in self.peers[cell]:
+            if values[peer]:
+                used |= 1 << (values[peer] - 1)
+        if used & bit:
+            return False
+        if used | bit == self.full_mask:
+            return True
+        peers = self.peers
+        for unit in self.cell_units[cell]:
+            for other in unit:
+                if other != cell and not values[other] and not any(values[peer] == value for peer in peers[other]):
+                    break
+            else:
+                return True
+        return False
+
+    def load(self, values):
+        """Reset the search state to a new board.
+
+        Returns:
+            bool: False if the givens already conflict (the search is then finished
+            with no solutions)
+        """
+        size = self.size
+        rows, cols, boxes = self.rows, self.cols, self.boxes
+        cell_row, cell_col, cell_box = self.cell_row, self.cell_col, self.cell_box
+        grid, where, empties = self.grid, self.where, self.empties
+
+        rows[:] = cols[:] = boxes[:] = [0] * size
+        grid[:] = values
+        self.candidates[:] = [0] * len(grid)
+        empties.clear()
+        self.trail.clear()
+        self.stack.clear()
+        self.count = 0
+        self.solution = None
+        self.nodes = 0
+        self.finished = True
+        self._fresh = False
+
+        for cell, value in enumerate(grid):
+            if not value:
+                where[cell] = len(empties)
+                empties.append(cell)
+                continue
+            if value < 0 or value > size:
+                return False
+            bit = 1 << (value - 1)
+            r, c, b = cell_row[cell], cell_col[cell], cell_box[cell]
+            if (rows[r] | cols[c] | boxes[b]) & bit:
+                return False
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+
+        self.finished = False
+        self._fresh = True
+        return True
+
+    def run(self, limit=2, max_nodes=None, rng=None):
+        """Continue the search until `limit` solutions are found or it is exhausted.
+
+        Args:
+            limit (int): Stop once this many solutions are found
+            max_nodes (int): Guesses allowed in this call; None for no budget
+            rng: Random source for the order candidates are tried in, or None
+                to try them in ascending order
+
+        Returns:
+            bool: True if the search finished, False if the budget ran out first
+            (call run again to resume)
+        """
+        if self.finished:
+            return True
+
+        size = self.size
+        full = self.full_mask
+        cell_row, cell_col, cell_box = self.cell_row, self.cell_col, self.cell_box
+        rows, cols, boxes = self.rows, self.cols, self.boxes
+        grid, candidates, where = self.grid, self.candidates, self.where
+        empties, trail, stack = self.empties, self.trail, self.stack
+        unit_masks = self._unit_masks
+
+        def place(cell, bit):
+            r, c, b = cell_row[cell], cell_col[cell], cell_box[cell]
+            if grid[cell] or (rows[r] | cols[c] | boxes[b]) & bit:
+                return False
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+            grid[cell] = bit.bit_length()
+            candidates[cell] = 0
+            last = empties.pop()
+            if last != cell:
+                pos = where[cell]
+                empties[pos] = last
+                where[last] = pos
+            trail.append(cell)
+            return True
+
+        def undo(mark):
+            while len(trail) > mark:
+                cell = trail.pop()
+                bit = ~(1 << (grid[cell] - 1))
+                rows[cell_row[cell]] &= bit
+                cols[cell_col[cell]] &= bit
+                boxes[cell_box[cell]] &= bit
+                grid[cell] = 0
+                where[cell] = len(empties)
+                empties.append(cell)
+
+        def propagate():
+            """Apply naked and hidden singles until stuck.
+
+            Returns None on a contradiction, otherwise (cell, mask) of the empty
+            cell with the fewest candidates, or (-1, 0) if the board is full.
+            """
+            while True:
+                singles = []
+                best_cell = -1
+                best_mask = 0
+                best_count = size + 1
+                for cell in empties:
+                    mask = full & ~(rows[cell_row[cell]] | cols[cell_col[cell]] | boxes[cell_box[cell]])
+                    if not mask:
+                        return None
+                    if not mask & (mask - 1):
+                        singles.append((cell, mask))
+                    elif not singles:
+                        candidates[cell] = mask
+                        options = mask.bit_count()
+                        if options < best_count:
+                            best_count = options
+                            best_cell = cell
+                            best_mask = mask
+
+                if singles:
+                    for cell, bit in singles:
+                        if not place(cell, bit):
+                            return None
+                    continue
+                if best_cell < 0:
+                    return -1, 0
+
+                # Hidden singles: a symbol with exactly one possible cell in a unit
+                hidden = []
+                for unit, used, index in unit_masks:
+                    once = twice = 0
+                    for cell in unit:
+                        mask = candidates[cell]
+                        twice |= once & mask
+                        once |= mask
+                    if (once | used[index]) != full:
+                        return None
+                    once &= ~twice
+                    while once:
+                        bit = once & -once
+                        once ^= bit
+                        for cell in unit:
+                            if candidates[cell] & bit:
+                                hidden.append((cell, bit))
+                                break
+
+                if not hidden:
+                    return best_cell, best_mask
+                for cell, bit in hidden:
+                    if grid[cell] and grid[cell] == bit.bit_length():
+                        continue
+                    if not place(cell, bit):
+                        return None
+
+        nodes = self.nodes
+        stop_at = None if max_nodes is None else nodes + max_nodes
+        state = None  # A resumed search always continues by backtracking
+        if self._fresh:
+            self._fresh = False
+            state = propagate()
+
+        while True:
+            if state is not None:
+                cell, mask = state
+                if cell < 0:
+                    self.count += 1
+                    if self.solution is None:
+                        self.solution = grid[:]
+                    if self.count >= limit:
+                        self.finished = True
+                        break
+                else:
+                    stack.append([cell, mask, len(trail)])
+
+            if stop_at is not None and nodes >= stop_at:
+                break
+
+            # Undo the guess on top of the stack and try its next candidate
+            state = None
+            while stack:
+                frame = stack[-1]
+                cell, mask, mark = frame
+                undo(mark)
+                if not mask:
+                    stack.pop()
+                    continue
+                if rng is None:
+                    bit = mask & -mask
+                else:
+                    bit = rng.choice([1 << v for v in range(size) if mask >> v & 1])
+                frame[1] = mask ^ bit
+                nodes += 1
+                place(cell, bit)
+                state = propagate()
+                break
+            else:
+                self.finished = True
+                break
+
+        self.nodes = nodes
+        return self.finished
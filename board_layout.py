@@ -0,0 +1,29 @@
+"""Layout of a printed board, shared by the PDF books and the SVG previews.
+
+Sizes are in millimetres, font sizes in points. Nothing here depends on
+FPDF, so the web previews can use it without importing the PDF stack.
+"""
+from line_format import SYMBOL_CHARS
+
+# Cell sizes optimized for e-ink displays
+CELL_SIZES = {
+    4: 18,   # Larger cells for better visibility on 4x4
+    9: 12,   # Optimized for 9x9 standard
+    16: 8,   # Adjusted for 16x16 readability
+    25: 7    # Fits 25x25 within the A4 width
+}
+
+# Font of the cell values, and its size (design system body size)
+CELL_FONT = 'Helvetica'
+CELL_FONT_SIZES = {4: 14, 9: 14, 16: 10, 25: 8}
+
+# Cell borders, and the bold lines around every box
+CELL_LINE_WIDTH = 0.3
+BOX_LINE_WIDTH = 2.0
+
+
+def format_cell_value(value):
+    """Text of a cell: '' for empty, letters for values above 9, which may already be letters."""
+    if isinstance(value, str):
+        return value
+    return SYMBOL_CHARS[value - 1] if value else ''
@@ -0,0 +1,258 @@
+"""Interactive play: a board whose candidates, conflicts and solvability follow every move."""
+from collections import OrderedDict
+
+from bitmask_solver import BitmaskSolver, SearchLimitReached, SUPPORTED_SIZES, lookup_tables
+from line_format import format_line, parse_line
+
+# Solutions of recently seen puzzles by their givens line, least recently used evicted first
+SOLUTION_CACHE_SIZE = 1024
+
+# Guesses allowed when searching a board, by grid size, so that a nonsense board cannot
+# stall a request; each is about a second of search, as a guess costs more on larger grids
+MAX_SEARCH_NODES = {4: 1000, 9: 20000, 16: 5000, 25: 2500}
+
+_solutions = OrderedDict()
+
+# Solvers and the (row, column, box) unit indices of every cell, by grid size
+_solvers = {}
+_cell_units = {}
+
+
+def _search(size, values, limit):
+    solver = _solvers.get(size)
+    if solver is None:
+        solver = _solvers[size] = BitmaskSolver(size)
+    try:
+        return solver.solve(values, limit, max_nodes=MAX_SEARCH_NODES[size])
+    except SearchLimitReached:
+        raise ValueError("Board is too open to check in reasonable time") from None
+
+
+def solve_givens(size, givens):
+    """Return the unique solution of the givens, or None if they have none or several."""
+    line = format_line(givens)
+    if line in _solutions:
+        _solutions.move_to_end(line)
+        return _solutions[line]
+    count, solution = _search(size, givens, 2)
+    _solutions[line] = tuple(solution) if count == 1 else None
+    if len(_solutions) > SOLUTION_CACHE_SIZE:
+        _solutions.popitem(last=False)
+    return _solutions[line]
+
+
+class BoardSession:
+    """A puzzle being played: givens plus the player's entries.
+
+    Every unit keeps a count of each value in it, a mask of the values it
+    holds, and every empty cell a candidate mask of the values none of its
+    units holds. Placing or erasing a value only updates the cell's three
+    units and its peers, so conflicts, hints and solvability never rescan
+    the whole board.
+
+    Solvability of a puzzle with a unique solution is tracked as the number
+    of entries that differ from it; other puzzles fall back to a search.
+    """
+
+    def __init__(self, size, givens, entries=None):
+        """Start a session.
+
+        Args:
+            size (int): Size of the grid (4, 9, 16, or 25)
+            givens (list): Flat puzzle, 0 for empty cells
+            entries (list): Flat values placed by the player, 0 elsewhere
+        """
+        if size not in SUPPORTED_SIZES:
+            raise ValueError(f"Grid size must be one of {', '.join(map(str, SUPPORTED_SIZES))}")
+        num_cells = size * size
+        entries = list(entries) if entries is not None else [0] * num_cells
+        if len(givens) != num_cells or len(entries) != num_cells:
+            raise ValueError(f"A {size}x{size} board has {num_cells} cells")
+        if any(given and entry for given, entry in zip(givens, entries)):
+            raise ValueError("Entries cannot overwrite givens")
+
+        self.size = size
+        self.full_mask = (1 << size) - 1
+        cell_row, cell_col, cell_box, self.units, _, self.peers = lookup_tables(size)
+        # Indices into self.units of the row, column and box of every cell
+        self.cell_units = _cell_units.get(size)
+        if self.cell_units is None:
+            self.cell_units = _cell_units[size] = tuple(
+                (cell_row[cell], size + cell_col[cell], 2 * size + cell_box[cell]) for cell in range(num_cells)
+            )
+
+        self.givens = tuple(givens)
+        self.values = [0] * num_cells
+        self.counts = [[0] * (size + 1) for _ in self.units]
+        self.masks = [0] * len(self.units)
+        self.candidates = [0] * num_cells
+        self.overfull = set()  # (unit, value) pairs held by more than one cell of the unit
+        self.solution = solve_givens(size, self.givens)
+        self.wrong = 0  # entries that differ from the solution
+        for cell, value in enumerate(self.givens):
+            if value:
+                self._set(cell, value)
+        for cell in range(num_cells):
+            if not self.values[cell]:
+                self.candidates[cell] = self._free(cell)
+        for cell, value in enumerate(entries):
+            if value:
+                self.place(cell, value)
+
+    @classmethod
+    def from_state(cls, state):
+        """Restore a session from the string returned by state()."""
+        givens_line, separator, entries_line = state.partition(':')
+        if not separator:
+            raise ValueError("Session state must be 'givens:entries'")
+        size, givens = parse_line(givens_line)
+        entries_size, entries = parse_line(entries_line)
+        if entries_size != size:
+            raise ValueError("Session givens and entries differ in size")
+        return cls(size, givens, entries)
+
+    def state(self):
+        """Compact state to hand to a client: the givens and entries lines joined by ':'."""
+        entries = [0 if given else value for given, value in zip(self.givens, self.values)]
+        return f"{format_line(self.givens)}:{format_line(entries)}"
+
+    def place(self, cell, value):
+        """Place value (1..size) in cell, replacing the player's previous entry there."""
+        if not 1 <= value <= self.size:
+            raise ValueError(f"Value must be between 1 and {self.size}")
+        self._check_cell(cell)
+        if self.values[cell]:
+            self.erase(cell)
+        self._set(cell, value)
+        self.candidates[cell] = 0
+        bit = 1 << (value - 1)
+        for peer in self.peers[cell]:
+            self.candidates[peer] &= ~bit
+        if self.solution is not None and self.solution[cell] != value:
+            self.wrong += 1
+
+    def erase(self, cell):
+        """Clear the player's entry from cell."""
+        self._check_cell(cell)
+        value = self.values[cell]
+        if not value:
+            return
+        if self.solution is not None and self.solution[cell] != value:
+            self.wrong -= 1
+        self._unset(cell, value)
+        self.candidates[cell] = self._free(cell)
+        bit = 1 << (value - 1)
+        masks = self.masks
+        for peer in self.peers[cell]:
+            if not self.values[peer]:
+                row, col, box = self.cell_units[peer]
+                if not (masks[row] | masks[col] | masks[box]) & bit:
+                    self.candidates[peer] |= bit
+
+    def conflicts(self):
+        """Cells holding the same value as another cell of one of their units, in board order."""
+        cells = set()
+        for unit, value in self.overfull:
+            cells.update(cell for cell in self.units[unit] if self.values[cell] == value)
+        return sorted(cells)
+
+    def is_complete(self):
+        """Check if every cell is filled without conflicts."""
+        return not self.overfull and all(self.values)
+
+    def is_solvable(self):
+        """Check if the board can still be completed to a solution of the puzzle.
+
+        Raises:
+            ValueError: If the puzzle has no unique solution and the search runs out of budget
+        """
+        if self.overfull:
+            return False
+        if self.solution is not None:
+            return not self.wrong
+        if any(not value and not candidates for value, candidates in zip(self.values, self.candidates)):
+            return False
+        return _search(self.size, self.values, 1)[0] > 0
+
+    def next_step(self):
+        """Suggest the next value to place.
+
+        Singles are only looked for on boards that can still be solved, so a
+        hint never builds on a mistake.
+
+        Returns:
+            dict: {'cell', 'value', 'technique'} where technique is
+            'wrong_entry' with value 0 for an entry that differs from the
+            puzzle's solution and should be erased, 'naked_single' or
+            'hidden_single' when the board forces the value, or 'solution'
+            for a value taken from the puzzle's solution when neither
+            applies; None if the board has conflicts or cannot be solved,
+            or there is no solution to take a value from
+
+        Raises:
+            ValueError: If the puzzle has no unique solution and the search runs out of budget
+        """
+        if self.overfull:
+            return None
+        if self.wrong:
+            cell = next(cell for cell, (value, right) in enumerate(zip(self.values, self.solution))
+                        if value != right and not self.givens[cell] and value)
+            return {'cell': cell, 'value': 0, 'technique': 'wrong_entry'}
+        if self.solution is None and not self.is_solvable():
+            return None
+        candidates = self.candidates
+        for cell, mask in enumerate(candidates):
+            if not mask and not self.values[cell]:
+                return None
+            if mask and not mask & (mask - 1):
+                return {'cell': cell, 'value': mask.bit_length(), 'technique': 'naked_single'}
+        for unit in self.units:
+            once = twice = 0
+            for cell in unit:
+                mask = candidates[cell]
+                twice |= once & mask
+                once |= mask
+            once &= ~twice
+            if once:
+                bit = once & -once
+                cell = next(cell for cell in unit if candidates[cell] & bit)
+                return {'cell': cell, 'value': bit.bit_length(), 'technique': 'hidden_single'}
+        if self.solution is None:
+            return None
+        # Reveal the most constrained empty cell
+        cell = min((cell for cell, value in enumerate(self.values) if not value),
+                   key=lambda cell: bin(candidates[cell]).count('1'), default=None)
+        if cell is None:
+            return None
+        return {'cell': cell, 'value': self.solution[cell], 'technique': 'solution'}
+
+    def _check_cell(self, cell):
+        if not 0 <= cell < len(self.values):
+            raise ValueError(f"Cell must be between 0 and {len(self.values) - 1}")
+        if self.givens[cell]:
+            raise ValueError("Givens cannot be changed")
+
+    def _free(self, cell):
+        """Candidate mask of an empty cell from the unit counts."""
+        row, col, box = self.cell_units[cell]
+        return self.full_mask & ~(self.masks[row] | self.masks[col] | self.masks[box])
+
+    def _set(self, cell, value):
+        self.values[cell] = value
+        for unit in self.cell_units[cell]:
+            counts = self.counts[unit]
+            counts[value] += 1
+            if counts[value] == 1:
+                self.masks[unit] |= 1 << (value - 1)
+            elif counts[value] == 2:
+                self.overfull.add((unit, value))
+
+    def _unset(self, cell, value):
+        self.values[cell] = 0
+        for unit in self.cell_units[cell]:
+            counts = self.counts[unit]
+            counts[value] -= 1
+            if counts[value] == 0:
+                self.masks[unit] &= ~(1 << (value - 1))
+            elif counts[value] == 1:
+                self.overfull.discard((unit, value))
@@ -0,0 +1,149 @@
+"""Disk cache of generated puzzle batches and their PDFs, for downloading a book again."""
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+from puzzle_record import PuzzleRecord
+
+
+class BookCache:
+    """Size-bounded LRU cache of books on local disk, keyed by a hash of their puzzles.
+
+    A book is stored as its batch, a small file holding the grid size,
+    difficulty and packed PuzzleRecords, and the PDFs rendered from it,
+    written on first request. The PDFs can always be rendered again from
+    the batch without generating any puzzle, so when the cache is over
+    max_bytes the least recently used PDFs are evicted first and batches
+    only after every PDF is gone.
+
+    Files are written atomically and recency is the file's modification
+    time, so several server processes can share one directory.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        """Open or create a cache directory.
+
+        Args:
+            directory (str): Where the files are kept
+            max_bytes (int): Total size the cache is trimmed to after every write
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def put(self, records, difficulty):
+        """Store a batch of records of one grid size.
+
+        Returns:
+            str: The book id, the same for the same puzzles
+        """
+        size = records[0].size
+        header = json.dumps({'size': size, 'difficulty': difficulty, 'count': len(records)}).encode() + b'\n'
+        data = header + b''.join(record.data for record in records)
+        book_id = hashlib.sha1(data).hexdigest()
+        path = self._path(book_id, '.batch')
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            self._write(path, data)
+        return book_id
+
+    def records(self, book_id):
+        """Read a batch back, or None if it is not cached.
+
+        Returns:
+            tuple: (difficulty, records)
+        """
+        path = self._path(book_id, '.batch')
+        try:
+            with open(path, 'rb') as f:
+                meta = json.loads(f.readline())
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        size = meta['size']
+        length = 2 * size * size
+        records = [PuzzleRecord(size, data[start:start + length], meta['difficulty'])
+                   for start in range(0, meta['count'] * length, length)]
+        return meta['difficulty'], records
+
+    def pdf(self, book_id, answers=False):
+        """Path of the book's PDF, or its answers PDF, rendering it from the batch if needed.
+
+        Returns:
+            str: Path to the PDF, or None if the book is not cached
+        """
+        path = self._path(book_id, '_answers.pdf' if answers else '.pdf')
+        if os.path.exists(path):
+            os.utime(path)
+            return path
+        data = self._render(book_id, answers)
+        if data is None:
+            return None
+        self._write(path, data)
+        return path
+
+    def open(self, book_id, answers=False):
+        """Open the book's PDF, or its answers PDF, for reading, rendering it from the batch if needed.
+
+        Unlike a path, an open file stays readable when another process
+        evicts the PDF meanwhile.
+
+        Returns:
+            A binary file object, or None if the book is not cached
+        """
+        path = self._path(book_id, '_answers.pdf' if answers else '.pdf')
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            data = self._render(book_id, answers)
+            if data is None:
+                return None
+            self._write(path, data)
+            return io.BytesIO(data)
+        os.utime(f.fileno())
+        return f
+
+    def _render(self, book_id, answers):
+        batch = self.records(book_id)
+        if batch is None:
+            return None
+        from pdf_generator import PDFGenerator
+
+        difficulty, records = batch
+        generator = PDFGenerator(grid_size=records[0].size)
+        generator.generate_puzzles_pdf(records, difficulty, is_answer=answers)
+        return generator.pdf.output(dest='S').encode('latin-1')
+
+    def _path(self, book_id, suffix):
+        if len(book_id) != 40 or not all(char in '0123456789abcdef' for char in book_id):
+            raise ValueError(f"Invalid book id {book_id!r}")
+        return os.path.join(self.directory, book_id + suffix)
+
+    def _write(self, path, data):
+        """Write a file atomically, then trim the cache back to max_bytes."""
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        self._evict(keep=path)
+
+    def _evict(self, keep):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(('.pdf', '.batch')) and entry.path != keep:
+                stat = entry.stat()
+                entries.append((entry.name.endswith('.batch'), stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, _, size, _ in entries) + os.path.getsize(keep)
+        # PDFs before batches, least recently used first
+        for _, _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
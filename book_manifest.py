@@ -0,0 +1,90 @@
+"""Book manifests: describe many books, each with its own grid size and puzzles, for one run.
+
+A manifest is a JSON or TOML file (chosen by its extension) with a list of
+books. Every book takes the same settings as one sudoku.py invocation:
+
+    [[books]]
+    output = "easy-9x9.pdf"
+    size = 9
+    config = ["easy:20", "medium:10:35"]
+
+    [[books]]
+    output = "giant.pdf"
+    size = 16
+    config = ["hard:4"]
+    symmetry = "mirror"
+    grade = false
+    timeout = 120
+    gen_answers = true
+
+The JSON form is {"books": [{"output": ..., "size": ..., "config": [...]}, ...]}.
+"""
+import json
+import os
+import tomllib
+
+# Optional book settings and their defaults, matching the sudoku.py options
+BOOK_DEFAULTS = {
+    'size': 9,
+    'symmetry': False,
+    'grade': False,
+    'timeout': 60,
+    'gen_answers': False,
+}
+
+SYMMETRY_CHOICES = (False, True, 'rotational', 'mirror', 'diagonal')
+
+
+def load_manifest(path):
+    """Read a manifest file and return its books.
+
+    Args:
+        path (str): .json or .toml file
+
+    Returns:
+        list: One dict per book with 'output', 'config' and every key of BOOK_DEFAULTS
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.toml':
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    elif extension == '.json':
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        raise ValueError(f"Manifest must be a .json or .toml file, got {path!r}")
+    return parse_manifest(data)
+
+
+def parse_manifest(data):
+    """Validate a decoded manifest and fill in the defaults of every book."""
+    books = data.get('books') if isinstance(data, dict) else None
+    if not books or not isinstance(books, list):
+        raise ValueError("Manifest must contain a non-empty list of books")
+
+    parsed = []
+    outputs = set()
+    for number, book in enumerate(books, start=1):
+        if not isinstance(book, dict):
+            raise ValueError(f"Book {number} must be a table of settings")
+        unknown = set(book) - set(BOOK_DEFAULTS) - {'output', 'config'}
+        if unknown:
+            raise ValueError(f"Book {number} has unknown settings: {', '.join(sorted(unknown))}")
+        if not isinstance(book.get('output'), str) or not book['output']:
+            raise ValueError(f"Book {number} needs an output file name")
+        if book['output'] in outputs:
+            raise ValueError(f"Book {number} writes to {book['output']!r} like an earlier book")
+        config = book.get('config')
+        if not config or not isinstance(config, list) or not all(isinstance(entry, str) for entry in config):
+            raise ValueError(f"Book {number} needs a list of puzzle configs like \"easy:20\"")
+
+        settings = dict(BOOK_DEFAULTS, **book)
+        if settings['size'] not in (4, 9, 16, 25):
+            raise ValueError(f"Book {number}: grid size must be 4, 9, 16 or 25")
+        if settings['symmetry'] not in SYMMETRY_CHOICES:
+            raise ValueError(f"Book {number}: symmetry must be rotational, mirror, diagonal or false")
+        if not isinstance(settings['timeout'], (int, float)) or settings['timeout'] <= 0:
+            raise ValueError(f"Book {number}: timeout must be a positive number of seconds")
+        outputs.add(book['output'])
+        parsed.append(settings)
+    return parsed
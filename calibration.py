@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Measured cost of generating puzzles, and the clue counts chosen from it.
+
+calibration.json records, per grid size and clue count, how many of a
+number of generation runs finished within the measurement timeout, their
+mean time, and how the DifficultyGrader rated the finished puzzles. From
+that table:
+
+- check_clues rejects clue counts that cannot be reached in the time given,
+  before any CPU is spent on them;
+- choose_clues picks the clue count of a difficulty: the fixed target of
+  CLUE_TARGETS, or for graded puzzles the count with the lowest expected
+  time per accepted puzzle.
+
+Refresh the table on representative hardware with, for example:
+
+    python calibration.py -size 16 -clues 80 100 120 150 200 -runs 3 -timeout 60
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+# Clue counts of each difficulty when puzzles are not graded
+CLUE_TARGETS = {
+    4: {'easy': 8, 'medium': 6, 'hard': 4},
+    9: {'easy': 40, 'medium': 35, 'hard': 30},
+    16: {'easy': 200, 'medium': 150, 'hard': 120},
+    25: {'easy': 450, 'medium': 400, 'hard': 350},
+}
+
+CALIBRATION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'calibration.json')
+
+_table = None
+
+
+def load_table(path=CALIBRATION_FILE):
+    """Read a calibration file.
+
+    Returns:
+        dict: Measurements by (size, clues), each a dict with 'runs',
+        'successes', 'seconds' (mean per run), 'timeout' and 'ratings'
+        (finished puzzles per DifficultyGrader rating)
+    """
+    with open(path, encoding='utf-8') as f:
+        entries = json.load(f)['entries']
+    return {(entry['size'], entry['clues']): entry for entry in entries}
+
+
+def save_table(table, path=CALIBRATION_FILE):
+    entries = ',\n'.join(json.dumps(table[key]) for key in sorted(table))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'{{"entries": [\n{entries}\n]}}\n')
+
+
+def _get_table():
+    global _table
+    if _table is None:
+        _table = load_table()
+    return _table
+
+
+def _measurement(size, clues):
+    """The measurement that bounds the cost of clues: the nearest calibrated count at or below it.
+
+    Fewer clues never make a puzzle cheaper to dig, so this errs on the
+    expensive side. None below the lowest calibrated count.
+    """
+    counts = [count for table_size, count in _get_table() if table_size == size and count <= clues]
+    return _get_table()[size, max(counts)] if counts else None
+
+
+def expected_seconds(size, clues, difficulty=None):
+    """Expected generation time per puzzle, infinite if no calibrated run succeeded.
+
+    Args:
+        difficulty (str): Also count only puzzles the grader rates this
+            difficulty, as generation with grading does
+    """
+    entry = _measurement(size, clues)
+    if entry is None:
+        return math.inf
+    accepted = entry['successes']
+    if difficulty is not None:
+        accepted = entry['ratings'].get(difficulty, 0)
+        if difficulty == 'hard':
+            accepted += entry['ratings'].get('expert', 0)
+    return entry['seconds'] * entry['runs'] / accepted if accepted else math.inf
+
+
+def feasible_clues(size, timeout):
+    """Lowest calibrated clue count whose expected generation time fits in timeout, None if none does."""
+    counts = sorted(count for table_size, count in _get_table() if table_size == size)
+    return next((count for count in counts if expected_seconds(size, count) <= timeout), None)
+
+
+def check_clues(size, clues, timeout):
+    """Reject a clue count that cannot be generated within timeout seconds.
+
+    Raises:
+        ValueError: With the lowest feasible count, if clues is below it
+    """
+    if clues > size * size:
+        raise ValueError(f"A {size}x{size} puzzle has at most {size * size} clues, got {clues}")
+    lowest = feasible_clues(size, timeout)
+    if lowest is None or clues < lowest:
+        raise ValueError(
+            f"{clues} clues on a {size}x{size} grid cannot be generated reliably within {timeout} seconds; "
+            + (f"use at least {lowest} clues or a longer timeout" if lowest is not None else "use a longer timeout")
+        )
+
+
+def choose_clues(size, difficulty, timeout, grade=False):
+    """Clue count to generate a difficulty with.
+
+    Ungraded puzzles use CLUE_TARGETS. Graded ones use the calibrated count
+    with the lowest expected time per puzzle of that rating, if that fits in
+    timeout; the target otherwise.
+    """
+    target = CLUE_TARGETS[size][difficulty]
+    if not grade:
+        return target
+    counts = [count for table_size, count in _get_table() if table_size == size]
+    best = min(counts, key=lambda count: (expected_seconds(size, count, difficulty), -count), default=None)
+    if best is None or expected_seconds(size, best, difficulty) > timeout:
+        return target
+    return best
+
+
+def measure(size, clues, runs, timeout):
+    """Generate runs puzzles with clues clues and record how it went.
+
+    Returns:
+        dict: A calibration entry, see load_table
+    """
+    from advanced_sudoku_generator import AdvancedSudokuGenerator
+
+    generator = AdvancedSudokuGenerator(size)
+    successes = 0
+    ratings = {}
+    start = time.monotonic()
+    for _ in range(runs):
+        try:
+            puzzle, _ = generator.generate_professional_sudoku(min_clues=clues, timeout=timeout)
+        except (TimeoutError, RuntimeError):
+            continue
+        successes += 1
+        rating = generator.grader.rate(generator._to_values(puzzle))
+        ratings[rating] = ratings.get(rating, 0) + 1
+    seconds = (time.monotonic() - start) / runs
+    return {'size': size, 'clues': clues, 'runs': runs, 'successes': successes,
+            'seconds': round(seconds, 4), 'timeout': timeout, 'ratings': ratings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure generation cost and update calibration.json.")
+    parser.add_argument('-size', type=int, required=True, choices=sorted(CLUE_TARGETS))
+    parser.add_argument('-clues', type=int, nargs='+', required=True)
+    parser.add_argument('-runs', type=int, default=5)
+    parser.add_argument('-timeout', type=float, default=60)
+    parser.add_argument('-file', default=CALIBRATION_FILE)
+    args = parser.parse_args()
+
+    table = load_table(args.file) if os.path.exists(args.file) else {}
+    for clues in args.clues:
+        entry = measure(args.size, clues, args.runs, args.timeout)
+        print(f"{args.size}x{args.size} {clues:4} clues: {entry['successes']}/{entry['runs']} in "
+              f"{entry['seconds']:.3f}s per run, ratings {entry['ratings']}")
+        table[args.size, clues] = entry
+        save_table(table, args.file)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
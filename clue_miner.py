@@ -0,0 +1,190 @@
+import random
+
+from bitmask_solver import BitmaskSolver
+from deadline import Deadline
+
+
+class ClueMiner:
+    """Search-based minimizer that digs puzzles down to low clue counts.
+
+    A single shuffled pass stops at the first minimal puzzle it meets (one
+    where every remaining clue is needed), usually well above the target
+    for hard puzzles. The miner continues from there with a local search
+    over clue sets: put one removed clue back, then try to take out others.
+    Removing two or more is progress, removing one is a sideways move to a
+    different minimal puzzle, and removing none is undone. Clues can also be
+    mined in fixed groups, which keeps symmetric puzzles symmetric. After too many
+    moves without progress the search restarts from the original puzzle
+    with a new removal order, keeping the best result. Every removal is
+    checked for uniqueness, so every intermediate puzzle stays valid.
+
+    Mining stops when the target is reached or its time budget runs out,
+    returning the best puzzle so far; the caller's deadline still raises.
+    """
+
+    def __init__(self, size=9, solver=None, rng=None, time_budget=2.0, max_stall=40, max_restarts=None,
+                 transpositions=None):
+        """Initialize the miner.
+
+        Args:
+            size (int): Size of the grid (4, 9, 16, or 25)
+            solver (BitmaskSolver): Search engine to reuse, a new one by default
+            rng: Random source (random module or random.Random instance)
+            time_budget (float): Seconds one reduce() call may spend mining
+            max_stall (int): Moves without progress before a restart
+            max_restarts (int): Restarts allowed, None to keep going until the time budget runs out
+            transpositions (TranspositionTable): Cache of boards already checked, None for no caching
+        """
+        self.size = size
+        self.solver = solver or BitmaskSolver(size)
+        self.rng = rng or random
+        self.time_budget = time_budget
+        self.max_stall = max_stall
+        self.max_restarts = max_restarts
+        self.transpositions = transpositions
+        self.max_nodes = 2 * size * size if size > 16 else None
+        self.nodes_per_check = 256
+
+    def is_unique(self, values, deadline=None, removed=None):
+        """Uniqueness oracle; searches that exhaust the node budget count as not unique.
+
+        Args:
+            removed (tuple): (cell, value) of a clue just removed from a board
+                recorded as unique, see PuzzleGenerator._is_unique
+        """
+        table = self.transpositions
+        if table is not None:
+            key = table.key(values)
+            known = table.get(key)
+            if known is not None:
+                return known == 1
+            if removed is not None:
+                cell, value = removed
+                if table.get(table.toggle(key, cell, value)) == 1 and self.solver.is_forced(values, cell, value):
+                    table.put(key, 1)
+                    return True
+        solver = self.solver
+        if not solver.load(values):
+            return False
+        while not solver.run(2, self.nodes_per_check):
+            if deadline is not None:
+                deadline.check("Clue mining")
+            if self.max_nodes is not None and solver.nodes >= self.max_nodes:
+                return False
+        if table is not None:
+            table.put(key, solver.count)
+        return solver.count == 1
+
+    def reduce(self, values, target, solution=None, deadline=None, groups=None):
+        """Remove clues from a uniquely solvable puzzle until `target` clues remain.
+
+        Args:
+            values (list): Flat puzzle with a unique solution, 0 for empty cells
+            target (int): Number of clues to reach
+            solution (list): Flat solution of the puzzle, solved for if omitted
+            deadline (Deadline): Time limit and cancellation token
+            groups (list): Tuples of cells that are only ever removed or put back
+                together, e.g. symmetric pairs. They must partition the grid and
+                the puzzle must fill each group completely or not at all. One
+                group per cell by default.
+
+        Returns:
+            list: Flat puzzle with a unique solution and as few clues as were
+            reached, never fewer than target. It has exactly target clues if
+            the search succeeded within its budget.
+        """
+        deadline = deadline or Deadline()
+        budget = Deadline(self.time_budget)
+        if solution is None:
+            solution = self.solver.solve(values, limit=1)[1]
+        self._record_unique(values)
+        if groups is None:
+            groups = [(cell,) for cell in range(len(values))]
+
+        best = list(values)
+        restarts = 0
+        while self._clue_count(best) > target and not budget.expired():
+            candidate = self._dig(list(values), solution, target, deadline, budget, groups)
+            candidate = self._local_search(candidate, solution, target, deadline, budget, groups)
+            if self._clue_count(candidate) < self._clue_count(best):
+                best = candidate
+            restarts += 1
+            if self.max_restarts is not None and restarts > self.max_restarts:
+                break
+        return best
+
+    def _clue_count(self, values):
+        return sum(1 for value in values if value)
+
+    def _record_unique(self, values):
+        """Note a board known to be uniquely solvable in the transposition table."""
+        if self.transpositions is not None:
+            self.transpositions.put(self.transpositions.key(values), 1)
+
+    def _try_remove(self, values, solution, group, deadline):
+        """Blank a group of cells, keeping the removal only if the solution stays unique."""
+        deadline.check("Clue mining")
+        for cell in group:
+            values[cell] = 0
+        removed = (group[0], solution[group[0]]) if len(group) == 1 else None
+        if self.is_unique(values, deadline, removed):
+            return True
+        for cell in group:
+            values[cell] = solution[cell]
+        return False
+
+    def _dig(self, values, solution, target, deadline, budget, groups):
+        """One shuffled pass removing every group whose removal keeps the solution unique."""
+        clues = [group for group in groups if values[group[0]]]
+        count = self._clue_count(values)
+        self.rng.shuffle(clues)
+        for group in clues:
+            if count <= target or budget.expired():
+                break
+            if count - len(group) < target:
+                continue
+            if self._try_remove(values, solution, group, deadline):
+                count -= len(group)
+        return values
+
+    def _local_search(self, values, solution, target, deadline, budget, groups):
+        """Swap groups in and out until target is reached, progress stalls or the budget runs out."""
+        rng = self.rng
+        clues = [group for group in groups if values[group[0]]]
+        holes = [group for group in groups if not values[group[0]]]
+        count = self._clue_count(values)
+        stall = 0
+        while count > target and stall < self.max_stall and holes and not budget.expired():
+            # Put one removed group back; the puzzle stays uniquely solvable
+            hole = holes.pop(rng.randrange(len(holes)))
+            for cell in hole:
+                values[cell] = solution[cell]
+            count += len(hole)
+            self._record_unique(values)
+
+            removed = []
+            for group in rng.sample(clues, len(clues)):
+                if count <= target or budget.expired():
+                    break
+                if count - len(group) < target:
+                    continue
+                if self._try_remove(values, solution, group, deadline):
+                    removed.append(group)
+                    count -= len(group)
+
+            if not removed:
+                for cell in hole:
+                    values[cell] = 0
+                count -= len(hole)
+                holes.append(hole)
+                stall += 1
+                continue
+
+            # Fewer clues than before the swap is progress, anything else a sideways move
+            gained = sum(len(group) for group in removed) - len(hole)
+            stall = 0 if gained > 0 else stall + 1
+            removed_set = set(removed)
+            clues = [group for group in clues if group not in removed_set]
+            clues.append(hole)
+            holes.extend(removed)
+        return values
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+
+
+class SearchCancelled(TimeoutError):
+    """Raised when work is cancelled through its Deadline before it finished."""
+
+
+class Deadline:
+    """Shared time limit and cancellation flag for puzzle generation.
+
+    One Deadline is created per task and passed down through the generator
+    methods and into the search, which calls check() once every few hundred
+    nodes rather than reading the clock on every step. Any thread can stop
+    the work early with cancel(); pass a multiprocessing Event to cancel
+    work running in other processes.
+    """
+
+    def __init__(self, timeout=None, event=None):
+        """Start the clock.
+
+        Args:
+            timeout (float): Seconds until the deadline expires, None for no limit
+            event: Object with set()/is_set() used as the cancellation flag,
+                e.g. a multiprocessing Event. A threading.Event by default.
+        """
+        self.timeout = timeout
+        self.expires_at = None if timeout is None else time.monotonic() + timeout
+        self.event = event if event is not None else threading.Event()
+
+    @classmethod
+    def from_start(cls, start_time, timeout):
+        """Build a deadline from a time.time() start and a timeout in seconds."""
+        if not timeout or not start_time:
+            return cls()
+        deadline = cls(timeout)
+        deadline.expires_at -= time.time() - start_time
+        return deadline
+
+    def cancel(self):
+        """Stop all work sharing this deadline at its next check."""
+        self.event.set()
+
+    @property
+    def cancelled(self):
+        return self.event.is_set()
+
+    def remaining(self):
+        """Seconds left, or None if there is no time limit."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.cancelled or (self.expires_at is not None and time.monotonic() >= self.expires_at)
+
+    def check(self, what="Puzzle generation"):
+        """Raise SearchCancelled or TimeoutError if the work should stop."""
+        if self.event.is_set():
+            raise SearchCancelled(f"{what} was cancelled")
+        if self.expires_at is not None and time.monotonic() >= self.expires_at:
+            raise TimeoutError(f"{what} timed out after {self.timeout} seconds")
+
+
+class FileFlag:
+    """Cancellation flag kept as a file, usable as the event of a Deadline.
+
+    Processes that share no memory, such as the workers of a web server,
+    see the same flag as long as they share the filesystem. Reading it is
+    one stat call, cheap at the rate Deadline.check is called.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def set(self):
+        with open(self.path, 'a'):
+            pass
+
+    def is_set(self):
+        return os.path.exists(self.path)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def as_deadline(deadline=None, start_time=None, timeout=None):
+    """Return the given deadline, or one built from legacy start_time/timeout arguments."""
+    if deadline is not None:
+        return deadline
+    return Deadline.from_start(start_time, timeout)
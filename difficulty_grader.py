@@ -0,0 +1,305 @@
+"""Human-style logical solver that rates puzzles by the techniques they need."""
+import math
+from itertools import combinations
+
+from bitmask_solver import lookup_tables
+
+# (name, rating, weight), tried in this order; a puzzle is rated by the
+# hardest technique it needs and scored by the weights of every step
+TECHNIQUES = (
+    ('naked_single', 'easy', 1),
+    ('hidden_single', 'easy', 2),
+    ('locked_candidates', 'medium', 5),  # pointing and claiming
+    ('naked_pair', 'medium', 6),
+    ('hidden_pair', 'medium', 8),
+    ('naked_triple', 'hard', 12),
+    ('hidden_triple', 'hard', 14),
+    ('x_wing', 'hard', 16),
+    ('swordfish', 'hard', 20),
+)
+
+# 'expert' puzzles cannot be finished with the techniques above
+RATINGS = ('easy', 'medium', 'hard', 'expert')
+
+# Box/line segments by grid size, built once and shared like the solver's lookup tables
+_segments = {}
+
+
+class DifficultyGrader:
+    """Rate puzzles by solving them the way a person would.
+
+    The grader keeps a candidate bitmask per cell and repeatedly applies the
+    simplest technique that makes progress, restarting from singles after
+    every step. Puzzles are expected to have a unique solution.
+    """
+
+    def __init__(self, size=9):
+        """Initialize unit and peer tables for a given grid size.
+
+        Args:
+            size (int): Size of the grid (4, 9, 16, or 25)
+        """
+        self.size = size
+        self.box_size = math.isqrt(size)
+        self.full_mask = (1 << size) - 1
+        _, _, _, self.units, _, self.peers = lookup_tables(size)
+        self.rows, self.cols = self.units[:size], self.units[size:2 * size]
+        self.segments = _segments.get(size)
+        if self.segments is None:
+            self.segments = _segments[size] = self._build_segments()
+
+        self.steps = tuple(
+            (getattr(self, '_' + name), RATINGS.index(rating), weight) for name, rating, weight in TECHNIQUES
+        )
+
+    def _build_segments(self):
+        """Box/line intersections with the rest of the line and the rest of the box."""
+        size = self.size
+        segments = []
+        for box_cells in self.units[2 * size:]:
+            for line in {self.rows[cell // size] for cell in box_cells} | {self.cols[cell % size] for cell in box_cells}:
+                segment = tuple(cell for cell in line if cell in box_cells)
+                segments.append((
+                    segment,
+                    tuple(cell for cell in line if cell not in segment),
+                    tuple(cell for cell in box_cells if cell not in segment),
+                ))
+        return tuple(segments)
+
+    def grade(self, values, max_rating=None):
+        """Solve the flat puzzle logically and rate it.
+
+        Args:
+            values (list): Flat puzzle, 0 for empty cells
+            max_rating (str): Early exit: stop as soon as a technique rated
+                above this is needed
+
+        Returns:
+            tuple: (rating, score). rating is one of RATINGS, or with early exit
+            the first rating found above max_rating; score sums the technique
+            weights of every step taken.
+        """
+        limit = len(RATINGS) if max_rating is None else RATINGS.index(max_rating)
+        self._load(values)
+
+        hardest = 0
+        score = 0
+        while self.unsolved:
+            if self.broken:
+                raise ValueError("Puzzle has no solution")
+            for step, level, weight in self.steps:
+                if level > limit:
+                    return RATINGS[level], score
+                progress = step()
+                if progress:
+                    hardest = max(hardest, level)
+                    score += weight * progress
+                    break
+            else:
+                return 'expert', score
+        if self.broken:
+            raise ValueError("Puzzle has no solution")
+        return RATINGS[hardest], score
+
+    def rate(self, values):
+        """Return the rating of a flat puzzle."""
+        return self.grade(values)[0]
+
+    def accepts(self, values, difficulty):
+        """Check if the puzzle's rating is `difficulty`, stopping early once it is exceeded.
+
+        'hard' is the top requested difficulty, so it also accepts 'expert' puzzles.
+        """
+        rating = self.grade(values, max_rating=difficulty)[0]
+        return rating == difficulty or (difficulty == 'hard' and rating == 'expert')
+
+    def _load(self, values):
+        size = self.size
+        self.values = list(values)
+        self.candidates = [0] * (size * size)
+        self.unsolved = 0
+        self.broken = False
+        used = [0] * (size * size)
+        for cell, value in enumerate(self.values):
+            if value:
+                bit = 1 << (value - 1)
+                for peer in self.peers[cell]:
+                    used[peer] |= bit
+        for cell, value in enumerate(self.values):
+            if not value:
+                self.candidates[cell] = self.full_mask & ~used[cell]
+                self.unsolved += 1
+                if not self.candidates[cell]:
+                    self.broken = True
+
+    def _place(self, cell, bit):
+        values, candidates = self.values, self.candidates
+        if values[cell]:
+            return False
+        if not candidates[cell] & bit:
+            self.broken = True
+            return False
+        values[cell] = bit.bit_length()
+        candidates[cell] = 0
+        self.unsolved -= 1
+        clear = ~bit
+        for peer in self.peers[cell]:
+            if candidates[peer] & bit:
+                candidates[peer] &= clear
+                if not candidates[peer]:
+                    self.broken = True
+        return True
+
+    def _eliminate(self, cells, mask):
+        """Remove candidate bits from cells, returning how many cells changed."""
+        candidates = self.candidates
+        changed = 0
+        for cell in cells:
+            if candidates[cell] & mask:
+                candidates[cell] &= ~mask
+                changed += 1
+                if not candidates[cell]:
+                    self.broken = True
+        return changed
+
+    def _naked_single(self):
+        placed = 0
+        candidates = self.candidates
+        for cell, mask in enumerate(candidates):
+            if mask and not mask & (mask - 1) and self._place(cell, mask):
+                placed += 1
+        return placed
+
+    def _hidden_single(self):
+        placed = 0
+        candidates = self.candidates
+        for unit in self.units:
+            once = twice = 0
+            for cell in unit:
+                mask = candidates[cell]
+                twice |= once & mask
+                once |= mask
+            once &= ~twice
+            while once:
+                bit = once & -once
+                once ^= bit
+                for cell in unit:
+                    if candidates[cell] & bit:
+                        placed += self._place(cell, bit)
+                        break
+        return placed
+
+    def _locked_candidates(self):
+        candidates = self.candidates
+        changed = 0
+        for segment, line_rest, box_rest in self.segments:
+            in_segment = 0
+            for cell in segment:
+                in_segment |= candidates[cell]
+            if not in_segment:
+                continue
+            in_line = in_box = 0
+            for cell in line_rest:
+                in_line |= candidates[cell]
+            for cell in box_rest:
+                in_box |= candidates[cell]
+            pointing = in_segment & ~in_box & in_line
+            claiming = in_segment & ~in_line & in_box
+            if pointing:
+                changed += self._eliminate(line_rest, pointing)
+            if claiming:
+                changed += self._eliminate(box_rest, claiming)
+        return changed
+
+    def _naked_subset(self, k):
+        candidates = self.candidates
+        changed = 0
+        for unit in self.units:
+            small = [cell for cell in unit if candidates[cell] and candidates[cell].bit_count() <= k]
+            if len(small) < k:
+                continue
+            for group in combinations(small, k):
+                union = 0
+                for cell in group:
+                    union |= candidates[cell]
+                if union.bit_count() == k:
+                    changed += self._eliminate([cell for cell in unit if cell not in group], union)
+        return changed
+
+    def _hidden_subset(self, k):
+        candidates = self.candidates
+        changed = 0
+        for unit in self.units:
+            places = {}
+            for index, cell in enumerate(unit):
+                mask = candidates[cell]
+                while mask:
+                    bit = mask & -mask
+                    mask ^= bit
+                    places[bit] = places.get(bit, 0) | (1 << index)
+            few = [bit for bit, where in places.items() if where.bit_count() <= k]
+            if len(few) < k:
+                continue
+            for digits in combinations(few, k):
+                where = 0
+                keep = 0
+                for bit in digits:
+                    where |= places[bit]
+                    keep |= bit
+                if where.bit_count() != k:
+                    continue
+                for index, cell in enumerate(unit):
+                    if where >> index & 1 and candidates[cell] & ~keep:
+                        candidates[cell] &= keep
+                        changed += 1
+        return changed
+
+    def _fish(self, k):
+        candidates = self.candidates
+        size = self.size
+        changed = 0
+        for lines, crosses in ((self.rows, self.cols), (self.cols, self.rows)):
+            for value in range(size):
+                bit = 1 << value
+                spots = []
+                for line_index, line in enumerate(lines):
+                    where = 0
+                    for index, cell in enumerate(line):
+                        if candidates[cell] & bit:
+                            where |= 1 << index
+                    if 2 <= where.bit_count() <= k:
+                        spots.append((line_index, where))
+                if len(spots) < k:
+                    continue
+                for group in combinations(spots, k):
+                    where = 0
+                    for _, line_where in group:
+                        where |= line_where
+                    if where.bit_count() != k:
+                        continue
+                    chosen = {line_index for line_index, _ in group}
+                    for index in range(size):
+                        if where >> index & 1:
+                            changed += self._eliminate(
+                                [cell for line_index, cell in enumerate(crosses[index]) if line_index not in chosen],
+                                bit,
+                            )
+        return changed
+
+    def _naked_pair(self):
+        return self._naked_subset(2)
+
+    def _hidden_pair(self):
+        return self._hidden_subset(2)
+
+    def _naked_triple(self):
+        return self._naked_subset(3)
+
+    def _hidden_triple(self):
+        return self._hidden_subset(3)
+
+    def _x_wing(self):
+        return self._fish(2)
+
+    def _swordfish(self):
+        return self._fish(3)
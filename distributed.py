@@ -0,0 +1,247 @@
+"""Coordinator/worker protocol for spreading generation tasks over several machines.
+
+Messages are JSON objects, one per line, over TCP:
+
+  worker -> coordinator
+    {"type": "hello", "name": ...}             once, after connecting
+    {"type": "ready"}                          asks for a task
+    {"type": "heartbeat"}                      while a task runs
+    {"type": "result", "id": ..., "data": ...} base64 of the task's bytes
+    {"type": "error", "id": ..., "message": ...}
+
+  coordinator -> worker
+    {"type": "task", "id": ..., "task": [...], "seed": ...}
+    {"type": "wait", "seconds": ...}           nothing to hand out right now
+    {"type": "done"}                           every task has a result
+
+A worker that sends nothing for heartbeat_timeout seconds, or whose
+connection drops, is considered dead and its tasks go back to the front
+of the queue. A task can therefore run more than once (at-least-once);
+results are deduplicated by task id and the first one is kept. Every
+task carries a fixed seed, so a rerun starts from the same random state.
+"""
+import base64
+import itertools
+import json
+import random
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+
+
+def parse_address(text):
+    """Parse 'host:port' into a (host, port) tuple."""
+    host, _, port = text.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f"Address must look like host:port, got {text!r}")
+    return host, int(port)
+
+
+def _send(wfile, lock, message):
+    data = (json.dumps(message) + '\n').encode()
+    with lock:
+        wfile.write(data)
+        wfile.flush()
+
+
+def _receive(rfile):
+    line = rfile.readline()
+    if not line:
+        raise ConnectionError("Connection closed")
+    return json.loads(line)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Serves one worker connection until it finishes, fails or goes silent."""
+
+    def handle(self):
+        coordinator = self.server.coordinator
+        self.request.settimeout(coordinator.heartbeat_timeout)
+        worker = next(coordinator.worker_ids)
+        lock = threading.Lock()
+        try:
+            while True:
+                message = _receive(self.rfile)
+                kind = message.get('type')
+                if kind == 'ready':
+                    reply = coordinator._next_task(worker)
+                    _send(self.wfile, lock, reply)
+                    if reply['type'] == 'done':
+                        return
+                elif kind == 'result':
+                    coordinator._complete(worker, message['id'], base64.b64decode(message['data']))
+                elif kind == 'error':
+                    coordinator._fail(worker, message['id'], message.get('message', ''))
+                # hello and heartbeat only keep the connection alive
+        except (OSError, ValueError, KeyError):
+            pass
+        finally:
+            coordinator._worker_lost(worker)
+
+
+class Coordinator:
+    """Hands out generation tasks to workers connecting over TCP and collects their results."""
+
+    def __init__(self, tasks, address=('127.0.0.1', 0), heartbeat_timeout=10.0, max_failures=3, seed=None):
+        """Start listening.
+
+        Args:
+            tasks (list): JSON-serializable task tuples, identified by their index
+            address (tuple): (host, port) to listen on, port 0 for any free port
+            heartbeat_timeout (float): Seconds of silence after which a worker is considered dead
+            max_failures (int): Errors reported for a task before the whole run fails
+            seed: Seed for the per-task seeds, random by default
+        """
+        rng = random.Random(seed)
+        self.tasks = list(tasks)
+        self.seeds = [rng.getrandbits(63) for _ in self.tasks]
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_failures = max_failures
+        self.pending = deque(range(len(self.tasks)))
+        self.assigned = {}
+        self.results = {}
+        self.failures = {}
+        self.error = None
+        self.worker_ids = itertools.count()
+        self.lock = threading.Condition()
+        self.server = _Server(address, _Handler)
+        self.server.coordinator = self
+        self.address = self.server.server_address
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def wait(self, timeout=None):
+        """Block until every task has a result.
+
+        Returns:
+            list: Result bytes in task order
+
+        Raises:
+            TimeoutError: If timeout seconds pass first
+            RuntimeError: If a task failed max_failures times
+        """
+        expires_at = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            while len(self.results) < len(self.tasks) and self.error is None:
+                remaining = None if expires_at is None else expires_at - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"{len(self.tasks) - len(self.results)} tasks unfinished after {timeout} seconds")
+                self.lock.wait(remaining)
+            if self.error is not None:
+                raise RuntimeError(self.error)
+            return [self.results[task_id] for task_id in range(len(self.tasks))]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _next_task(self, worker):
+        with self.lock:
+            if len(self.results) == len(self.tasks) or self.error is not None:
+                return {'type': 'done'}
+            while self.pending:
+                task_id = self.pending.popleft()
+                if task_id not in self.results:
+                    self.assigned.setdefault(worker, set()).add(task_id)
+                    return {'type': 'task', 'id': task_id, 'task': self.tasks[task_id], 'seed': self.seeds[task_id]}
+            return {'type': 'wait', 'seconds': min(1.0, self.heartbeat_timeout / 4)}
+
+    def _complete(self, worker, task_id, data):
+        with self.lock:
+            self.assigned.get(worker, set()).discard(task_id)
+            # At-least-once delivery: keep the first result of a reassigned task
+            if task_id not in self.results:
+                self.results[task_id] = data
+                self.lock.notify_all()
+
+    def _fail(self, worker, task_id, message):
+        with self.lock:
+            self.assigned.get(worker, set()).discard(task_id)
+            if task_id in self.results:
+                return
+            self.failures[task_id] = self.failures.get(task_id, 0) + 1
+            if self.failures[task_id] >= self.max_failures:
+                self.error = f"Task {task_id} failed {self.failures[task_id]} times: {message}"
+                self.lock.notify_all()
+            else:
+                self.pending.append(task_id)
+
+    def _worker_lost(self, worker):
+        """Put the unfinished tasks of a dead or disconnected worker back at the front of the queue."""
+        with self.lock:
+            lost = [task_id for task_id in self.assigned.pop(worker, ()) if task_id not in self.results]
+            self.pending.extendleft(sorted(lost, reverse=True))
+
+
+def run_worker(address, func, name=None, heartbeat_interval=2.0):
+    """Connect to a coordinator and run its tasks until every task is done.
+
+    Args:
+        address (tuple): (host, port) of the coordinator
+        func: Called as func(task) with the random module seeded for the task;
+            returns bytes. TimeoutError, RuntimeError and ValueError are
+            reported to the coordinator as task errors.
+        name (str): Worker name for the coordinator, the host name by default
+        heartbeat_interval (float): Seconds between heartbeats while a task runs
+
+    Returns:
+        int: Number of tasks this worker completed
+    """
+    completed = 0
+    with socket.create_connection(address) as sock:
+        rfile = sock.makefile('rb')
+        wfile = sock.makefile('wb')
+        lock = threading.Lock()
+        _send(wfile, lock, {'type': 'hello', 'name': name or socket.gethostname()})
+        while True:
+            try:
+                _send(wfile, lock, {'type': 'ready'})
+                message = _receive(rfile)
+            except (ConnectionError, BrokenPipeError):
+                # The coordinator shut down after the last result came in
+                return completed
+            if message['type'] == 'done':
+                return completed
+            if message['type'] == 'wait':
+                time.sleep(message['seconds'])
+                continue
+
+            stop = threading.Event()
+            heartbeat = threading.Thread(target=_heartbeat, args=(wfile, lock, stop, heartbeat_interval), daemon=True)
+            heartbeat.start()
+            try:
+                random.seed(message['seed'])
+                data = func(tuple(message['task']))
+                reply = {'type': 'result', 'id': message['id'], 'data': base64.b64encode(data).decode('ascii')}
+            except (TimeoutError, RuntimeError, ValueError) as e:
+                reply = {'type': 'error', 'id': message['id'], 'message': str(e)}
+            finally:
+                stop.set()
+                heartbeat.join()
+            try:
+                _send(wfile, lock, reply)
+            except (ConnectionError, BrokenPipeError):
+                # Given up on as dead; the task was handed to another worker
+                return completed
+            completed += reply['type'] == 'result'
+
+
+def _heartbeat(wfile, lock, stop, interval):
+    while not stop.wait(interval):
+        try:
+            _send(wfile, lock, {'type': 'heartbeat'})
+        except OSError:
+            return
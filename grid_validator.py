@@ -0,0 +1,87 @@
+"""Vectorized NumPy checks of Sudoku constraints over whole batches of boards."""
+import math
+import numpy as np
+
+UNIT_KINDS = ('row', 'column', 'box')
+
+
+def box_view(grids):
+    """Rearrange a (B, N, N) batch so that axis 1 indexes boxes instead of rows."""
+    batch, size = grids.shape[0], grids.shape[1]
+    box = math.isqrt(size)
+    return grids.reshape(batch, box, box, box, box).transpose(0, 1, 3, 2, 4).reshape(batch, size, size)
+
+
+def unit_masks(grids):
+    """Return (or_masks, sum_masks) of symbol bits for every row, column and box.
+
+    Both arrays have shape (B, 3N): rows first, then columns, then boxes.
+    Empty and out-of-range cells contribute no bit. A unit contains a
+    duplicate exactly when its sum and OR differ.
+    """
+    size = grids.shape[1]
+    in_range = (grids > 0) & (grids <= size)
+    bits = np.where(in_range, np.left_shift(1, np.clip(grids, 1, size) - 1, dtype=np.int32), 0)
+    units = np.concatenate([bits, bits.transpose(0, 2, 1), box_view(bits)], axis=1)
+    return np.bitwise_or.reduce(units, axis=2), units.sum(axis=2, dtype=np.int64)
+
+
+def _as_batch(grids):
+    grids = np.asarray(grids)
+    if grids.ndim == 2:
+        grids = grids[np.newaxis]
+    if grids.ndim != 3 or grids.shape[1] != grids.shape[2] or math.isqrt(grids.shape[1]) ** 2 != grids.shape[1]:
+        raise ValueError(f"Expected a batch of square Sudoku boards, got shape {grids.shape}")
+    return grids
+
+
+def validate_grids(grids):
+    """Check a batch of boards at once.
+
+    Args:
+        grids: Integer array-like of shape (B, N, N) or (N, N), 0 for empty cells
+
+    Returns:
+        tuple: (valid, complete) boolean arrays of shape (B,). A board is valid
+        when all symbols are in range and no row, column or box repeats one.
+    """
+    grids = _as_batch(grids)
+    size = grids.shape[1]
+    in_range = ((grids >= 0) & (grids <= size)).all(axis=(1, 2))
+    or_masks, sum_masks = unit_masks(grids)
+    valid = in_range & (or_masks == sum_masks).all(axis=1)
+    complete = (grids != 0).all(axis=(1, 2))
+    return valid, complete
+
+
+def find_violations(grids, chunk_size=16384):
+    """Audit a batch of completed grids, checking every unit of every grid at once.
+
+    A row, column or box passes when it holds each symbol 1..N exactly once,
+    so empty cells, out-of-range symbols and duplicates are all violations.
+
+    Args:
+        grids: Integer array-like of shape (B, N, N) or (N, N)
+        chunk_size (int): Grids processed per vectorized step, bounding memory use
+
+    Returns:
+        tuple: (ok, violations) where ok is a boolean array of shape (B,) and
+        violations is an int array of shape (K, 3) holding
+        (grid index, unit kind, unit index) rows, kinds indexing UNIT_KINDS
+    """
+    grids = _as_batch(grids)
+    size = grids.shape[1]
+    full = (1 << size) - 1
+
+    ok = np.ones(grids.shape[0], dtype=bool)
+    violations = [np.empty((0, 3), dtype=np.int64)]
+    for start in range(0, grids.shape[0], chunk_size):
+        or_masks, _ = unit_masks(grids[start:start + chunk_size])
+        unit_ok = or_masks == full
+        ok[start:start + len(unit_ok)] = unit_ok.all(axis=1)
+
+        grid_index, unit = np.nonzero(~unit_ok)
+        if len(grid_index):
+            violations.append(np.column_stack([grid_index + start, unit // size, unit % size]))
+
+    return ok, np.concatenate(violations)
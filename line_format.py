@@ -0,0 +1,70 @@
+"""Single-line puzzle format: one board per line, row-major, '.' or '0' for empty cells."""
+import math
+
+SYMBOL_CHARS = "123456789ABCDEFGHIJKLMNOP"
+EMPTY_CHARS = ".0"
+
+_CHAR_VALUES = {char: value for value, char in enumerate(SYMBOL_CHARS, start=1)}
+_CHAR_VALUES.update({char.lower(): value for char, value in list(_CHAR_VALUES.items())})
+_CHAR_VALUES.update({char: 0 for char in EMPTY_CHARS})
+
+
+def is_puzzle_line(line):
+    """Check whether a raw input line holds a board (not blank and not a # comment)."""
+    stripped = line.strip()
+    return bool(stripped) and not stripped.startswith('#')
+
+
+def parse_line(line):
+    """Parse a board line.
+
+    Args:
+        line (str): Board in line format, e.g. 81 characters for 9x9
+
+    Returns:
+        tuple: (size, values) where values is a flat list of ints (0 = empty)
+    """
+    text = line.strip()
+    size = math.isqrt(len(text))
+    if size * size != len(text) or math.isqrt(size) ** 2 != size or size < 4:
+        raise ValueError(f"Line of length {len(text)} is not a square Sudoku board")
+
+    try:
+        values = [_CHAR_VALUES[char] for char in text]
+    except KeyError as e:
+        raise ValueError(f"Invalid symbol {e.args[0]!r} in board line") from None
+    if max(values) > size:
+        raise ValueError(f"Symbol out of range for a {size}x{size} board")
+    return size, values
+
+
+def format_line(values):
+    """Format a flat list of ints (0 = empty) as a board line."""
+    return ''.join(SYMBOL_CHARS[value - 1] if value else '.' for value in values)
+
+
+def parse_rows(rows):
+    """Parse a board given as a list of rows of ints or symbol characters.
+
+    Returns:
+        tuple: (size, values) where values is a flat list of ints (0 = empty)
+    """
+    size = len(rows) if isinstance(rows, list) else 0
+    if size < 4 or math.isqrt(size) ** 2 != size:
+        raise ValueError("Board must be a square list of rows (4x4, 9x9, ...)")
+
+    values = []
+    for row in rows:
+        if not isinstance(row, list) or len(row) != size:
+            raise ValueError(f"Every row of a {size}x{size} board must have {size} cells")
+        for item in row:
+            if isinstance(item, int) and not isinstance(item, bool):
+                value = item
+            elif isinstance(item, str) and item in _CHAR_VALUES:
+                value = _CHAR_VALUES[item]
+            else:
+                raise ValueError(f"Invalid cell value {item!r}")
+            if not 0 <= value <= size:
+                raise ValueError(f"Symbol out of range for a {size}x{size} board")
+            values.append(value)
+    return size, values
@@ -0,0 +1,178 @@
+"""Speculative parallel uniqueness checks for digging a single puzzle.
+
+The sequential removal pass tries one clue at a time against the current
+board. SpeculativeRemover checks a window of candidate clues at once in a
+worker pool, each against the same committed board, and then walks the
+results in candidate order:
+
+  * A rejected removal is final. Removing clues never makes a board more
+    constrained, so a clue that cannot go now can never go later.
+  * The first accepted removal is committed.
+  * Later acceptances were checked against a board that no longer exists,
+    so they go back to the front of the queue to be checked again.
+
+This is exactly what the sequential pass decides for the same candidate
+order, so both produce the same puzzle; the parallel one needs fewer
+rounds of waiting when most expensive checks are rejections, which is
+the case for large grids near their target clue count.
+
+Workers get the caller's remaining time and, where it can cross processes,
+its cancellation flag, so checks in flight stop with the generation
+instead of holding the pool after it timed out or was cancelled.
+"""
+import os
+import pickle
+import threading
+from collections import deque
+
+from bitmask_solver import BitmaskSolver
+from deadline import Deadline
+
+# Guesses between two deadline checks of a worker's search
+NODES_PER_CHECK = 256
+
+# Search engines of a worker process (or thread of a ThreadPool), by grid size
+_local = threading.local()
+
+
+def check_removal(task):
+    """Pool task: check that a board stays unique with one more clue removed.
+
+    Args:
+        task (tuple): (size, board, cell, max_nodes, timeout, event) where
+            board is the committed board as bytes of solver values, and
+            timeout and event the caller's remaining time and cancellation
+            flag (None if it cannot be read from a worker process)
+
+    Returns:
+        tuple: (cell, unique); searches exceeding max_nodes, or stopped by
+        the deadline, count as not unique
+    """
+    size, board, cell, max_nodes, timeout, event = task
+    solvers = getattr(_local, 'solvers', None)
+    if solvers is None:
+        solvers = _local.solvers = {}
+    solver = solvers.get(size)
+    if solver is None:
+        solver = solvers[size] = BitmaskSolver(size)
+    values = list(board)
+    values[cell] = 0
+    if not solver.load(values):
+        return cell, False
+    deadline = Deadline(timeout, event)
+    while not deadline.expired():
+        budget = NODES_PER_CHECK if max_nodes is None else min(NODES_PER_CHECK, max_nodes - solver.nodes)
+        if budget <= 0:
+            break
+        if solver.run(2, budget):
+            return cell, solver.count == 1
+    return cell, False
+
+
+def _shared_event(deadline):
+    """The deadline's cancellation flag if it can be sent to worker processes, else None.
+
+    FileFlag and racing.RaceFlag can; a threading.Event cannot, and then
+    the workers stop only when the deadline's time runs out.
+    """
+    try:
+        pickle.dumps(deadline.event)
+    except (TypeError, RuntimeError, pickle.PicklingError):
+        return None
+    return deadline.event
+
+
+class SpeculativeRemover:
+    """Dig a board with uniqueness checks spread over a multiprocessing pool."""
+
+    def __init__(self, generator, pool, window=None):
+        """Initialize the remover.
+
+        Args:
+            generator (PuzzleGenerator): Generator whose transposition table and
+                forced-single shortcut settle cheap checks locally
+            pool: multiprocessing Pool (or ThreadPool) running check_removal
+            window (int): Candidates checked per round, the number of CPUs by default
+        """
+        self.generator = generator
+        self.pool = pool
+        self.window = window or os.cpu_count() or 4
+        self.rounds = 0
+        self.checks = 0
+
+    def remove(self, values, cells_to_remove, order, deadline, key=None):
+        """Remove up to cells_to_remove clues from values in place, keeping it unique.
+
+        Args:
+            values (list): Flat board with a unique solution, modified in place
+            cells_to_remove (int): Number of clues to remove
+            order (list): Cells in the order they are tried
+            deadline (Deadline): Time limit and cancellation token
+            key (int): Zobrist hash of values, computed if omitted
+
+        Returns:
+            int: Number of clues removed
+        """
+        generator = self.generator
+        table = generator.transpositions
+        size = generator.size
+        if key is None:
+            key = table.key(values)
+        queue = deque(cell for cell in order if values[cell])
+        removed = 0
+        event = _shared_event(deadline)
+
+        while removed < cells_to_remove and queue:
+            deadline.check("Number removal")
+
+            # Settle forced singles locally until the first real search; after
+            # that every candidate is checked against the same board, in order
+            window = []
+            while queue and len(window) < self.window and removed < cells_to_remove:
+                cell = queue.popleft()
+                value = values[cell]
+                values[cell] = 0
+                child = table.toggle(key, cell, value)
+                if not window and (table.get(child) == 1
+                                   or (table.get(key) == 1 and generator.solver.is_forced(values, cell, value))):
+                    key = child
+                    table.put(key, 1)
+                    removed += 1
+                else:
+                    values[cell] = value
+                    window.append(cell)
+            if not window or removed >= cells_to_remove:
+                queue.extendleft(reversed(window))
+                continue
+
+            board = bytes(values)
+            timeout = deadline.remaining()
+            results = self._run([(size, board, cell, generator.max_unique_nodes, timeout, event) for cell in window],
+                                deadline)
+            self.rounds += 1
+            self.checks += len(window)
+
+            committed = False
+            stale = []
+            for cell, unique in results:
+                if not unique:
+                    continue
+                if committed:
+                    stale.append(cell)
+                    continue
+                key = table.toggle(key, cell, values[cell])
+                values[cell] = 0
+                table.put(key, 1)
+                removed += 1
+                committed = True
+            queue.extendleft(reversed(stale))
+
+        return removed
+
+    def _run(self, tasks, deadline):
+        """Run one round of checks, polling the deadline while they are in flight."""
+        pending = self.pool.map_async(check_removal, tasks)
+        while not pending.ready():
+            deadline.check("Number removal")
+            pending.wait(0.05)
+        return pending.get()
@@ -1,5 +1,7 @@
 from fpdf import FPDF
 
+from board_layout import BOX_LINE_WIDTH, CELL_FONT, CELL_FONT_SIZES, CELL_LINE_WIDTH, CELL_SIZES, format_cell_value
+
 class SudokuPDF(FPDF):
     def footer(self):
         self.set_y(-15)
@@ -9,18 +11,17 @@ class SudokuPDF(FPDF):
 
 class PDFGenerator:
     def __init__(self, grid_size=9):
+        self.grid_size = grid_size
+        self.box_size = int(grid_size ** 0.5)
+        self.cell_size = CELL_SIZES[grid_size]
+        self.reset()
+
+    def reset(self):
+        """Start a new, empty document, so one generator can render several books."""
         self.pdf = SudokuPDF()
         # Reduced margin for better page fit
         self.pdf.set_auto_page_break(auto=True, margin=15)
-        self.grid_size = grid_size
-        self.box_size = int(grid_size ** 0.5)
-        # Optimized cell sizes for e-ink display
-        self.cell_size = {
-            4: 18,   # Larger cells for better visibility on 4x4
-            9: 12,   # Optimized for 9x9 standard
-            16: 8    # Adjusted for 16x16 readability
-        }[grid_size]
-        
+
         # Optimize for e-ink display
         self.pdf.set_fill_color(255, 255, 255)  # Pure white background
         self.pdf.set_text_color(0, 0, 0)        # Pure black text
@@ -69,20 +70,10 @@ class PDFGenerator:
             self.pdf.line(start_x, start_y + i * cell_size,
                          start_x + 3 * cell_size, start_y + i * cell_size)
 
-    def format_cell_value(self, value):
-        """Format cell value, converting to hexadecimal for 16x16 grids if needed."""
-        if value == 0:
-            return ""
-        if self.grid_size == 16 and isinstance(value, str):
-            return value  # Already a letter A-G
-        if self.grid_size == 16 and value > 9:
-            return chr(ord('A') + value - 10)  # Convert 10-16 to A-G
-        return str(value)
-
     def add_sudoku_to_pdf(self, sudoku, puzzle_num, difficulty, offset_y, title_suffix="Zudoku"):
         # Use design system typography scale
         title_font_size = 24 if self.grid_size <= 9 else 20  # h3 size
-        cell_font_size = 14 if self.grid_size <= 9 else 10   # body size
+        cell_font_size = CELL_FONT_SIZES[self.grid_size]
 
         self.pdf.set_font('Helvetica', 'B', title_font_size)
         self.pdf.set_xy(0, offset_y - 15)
@@ -93,16 +84,16 @@ class PDFGenerator:
         offset_x = (210 - grid_width) / 2  # A4 page width is 210mm
 
         # Add cells with optimized styling for e-ink
-        self.pdf.set_font('Helvetica', '', cell_font_size)
+        self.pdf.set_font(CELL_FONT, '', cell_font_size)
         for i in range(self.grid_size):
             for j in range(self.grid_size):
                 self.pdf.set_xy(offset_x + j * self.cell_size, offset_y + i * self.cell_size)
-                value = self.format_cell_value(sudoku[i, j])
-                self.pdf.set_line_width(0.3)
+                value = format_cell_value(sudoku[i, j])
+                self.pdf.set_line_width(CELL_LINE_WIDTH)
                 self.pdf.cell(self.cell_size, self.cell_size, value, border=1, align='C')
 
         # Add bold grid lines optimized for e-ink
-        self.pdf.set_line_width(2.0)  # Increased thickness for better visibility
+        self.pdf.set_line_width(BOX_LINE_WIDTH)
         for i in range(0, self.grid_size + 1, self.box_size):
             # Vertical lines
             self.pdf.line(
@@ -119,59 +110,34 @@ class PDFGenerator:
                 offset_y + i * self.cell_size
             )
 
-    def generate_puzzles_pdf(self, puzzles, difficulty):
+    def generate_puzzles_pdf(self, puzzles, difficulty, is_answer=False):
+        """Add a title page and the puzzles of one difficulty, each page of puzzles followed by their solutions.
+
+        Args:
+            puzzles (list): PuzzleRecord objects
+            is_answer (bool): Add only the solution pages, for a separate answers book
+        """
         self.add_title_page(difficulty)
         total_puzzles = len(puzzles)
         
         # Determine puzzles per page based on grid size
-        puzzles_per_page = 1 if self.grid_size == 16 else 2
-        offset_y = 30  # Top puzzle position
-        offset_y2 = 160  # Bottom puzzle position (increased for better spacing)
+        puzzles_per_page = 1 if self.grid_size >= 16 else 2
 
-        for i in range(0, total_puzzles, puzzles_per_page * 2):  # *2 because we'll put puzzles and solutions together
+        for i in range(0, total_puzzles, puzzles_per_page):
+            page = puzzles[i:i + puzzles_per_page]
             # Add puzzle page
-            self.pdf.add_page()
-            
-            # First puzzle
-            self.add_sudoku_to_pdf(
-                puzzles[i][0],
-                i + 1,
-                difficulty,
-                offset_y=offset_y,
-                title_suffix="Puzzle"
-            )
-            
-            # Second puzzle if exists
-            if i + 1 < total_puzzles and puzzles_per_page == 2:
-                self.add_sudoku_to_pdf(
-                    puzzles[i + 1][0],
-                    i + 2,
-                    difficulty,
-                    offset_y=offset_y2,  # Increased spacing from first puzzle
-                    title_suffix="Puzzle"
-                )
-
+            if not is_answer:
+                self.add_boards_page([record.puzzle for record in page], i, difficulty, "Puzzle")
             # Add solutions page
-            self.pdf.add_page()
-            
-            # First solution
-            self.add_sudoku_to_pdf(
-                puzzles[i][1],
-                i + 1,
-                difficulty,
-                offset_y=offset_y,
-                title_suffix="Solution"
-            )
-            
-            # Second solution if exists
-            if i + 1 < total_puzzles and puzzles_per_page == 2:
-                self.add_sudoku_to_pdf(
-                    puzzles[i + 1][1],
-                    i + 2,
-                    difficulty,
-                    offset_y=offset_y2,  # Increased spacing from first solution
-                    title_suffix="Solution"
-                )
+            self.add_boards_page([record.solution for record in page], i, difficulty, "Solution")
+
+    def add_boards_page(self, boards, first_index, difficulty, title_suffix):
+        """Add a page with one or two boards, numbered from first_index + 1."""
+        self.pdf.add_page()
+        offset_y = 30  # Top puzzle position
+        offset_y2 = 160  # Bottom puzzle position (increased for better spacing)
+        for number, (board, y) in enumerate(zip(boards, (offset_y, offset_y2)), start=first_index + 1):
+            self.add_sudoku_to_pdf(board, number, difficulty, offset_y=y, title_suffix=title_suffix)
 
     def save_pdf(self, output_file):
         self.pdf.output(output_file)
@@ -1,26 +1,36 @@
+import math
 import random
 import numpy as np
-import time
 
-def generate_puzzle(grid_size=9, difficulty='medium'):
+from bitmask_solver import BitmaskSolver
+from calibration import CLUE_TARGETS, check_clues, choose_clues
+from clue_miner import ClueMiner
+from deadline import Deadline, as_deadline
+from parallel_removal import SpeculativeRemover
+from solved_grid_generator import SolvedGridGenerator
+from transposition_table import TranspositionTable
+
+# 'fixed': batches of 8 (16 on 25x25), checking the cells of a failed batch one
+# by one; 'adaptive': batch size follows the success rate and failed batches
+# are bisected
+REMOVAL_POLICIES = ('fixed', 'adaptive')
+
+def generate_puzzle(grid_size=9, difficulty='medium', deadline=None, pool=None):
     """Generate a Sudoku puzzle with the specified grid size and difficulty.
     
     Args:
-        grid_size (int): Size of the grid (4, 9, or 16)
+        grid_size (int): Size of the grid (4, 9, 16, or 25)
         difficulty (str): Difficulty level ('easy', 'medium', 'hard')
+        deadline (Deadline): Optional shared time limit and cancellation token
+        pool: Optional multiprocessing Pool for speculative parallel removal checks
     
     Returns:
         tuple: (puzzle, solution) where both are numpy arrays
     """
-    # Map difficulty to minimum clues
-    min_clues = {
-        'easy': {4: 8, 9: 40, 16: 170},
-        'medium': {4: 6, 9: 30, 16: 130},
-        'hard': {4: 4, 9: 17, 16: 80}
-    }[difficulty][grid_size]
+    min_clues = CLUE_TARGETS[grid_size][difficulty]
     
     generator = PuzzleGenerator(grid_size)
-    puzzle, solution = generator.generate_sudoku(min_clues=min_clues)
+    puzzle, solution = generator.generate_sudoku(min_clues=min_clues, deadline=deadline, pool=pool)
     return puzzle, solution
 
 class PuzzleGenerator:
@@ -28,13 +38,30 @@ class PuzzleGenerator:
         """Initialize the puzzle generator with a given grid size.
         
         Args:
-            size (int): Size of the grid (4, 9, or 16)
+            size (int): Size of the grid (4, 9, 16, or 25)
         """
-        if size not in [4, 9, 16]:
-            raise ValueError("Grid size must be 4, 9, or 16")
+        if size not in [4, 9, 16, 25]:
+            raise ValueError("Grid size must be 4, 9, 16, or 25")
         self.size = size
-        self.box_size = int(size ** 0.5)  # 2 for 4x4, 3 for 9x9, 4 for 16x16
+        self.box_size = int(size ** 0.5)  # 2 for 4x4, 3 for 9x9, 4 for 16x16, 5 for 25x25
         self.symbols = self._get_symbols()
+        self._symbol_values = {symbol: value for value, symbol in enumerate(self.symbols, start=1)}
+        # Solution counts of boards met while digging the current puzzle
+        self.transpositions = TranspositionTable(size)
+        # Iterative search engine shared by grid filling and solution counting
+        self.solver = BitmaskSolver(size)
+        # Source of random complete grids for the fill stage
+        self.grid_source = SolvedGridGenerator(size, solver=self.solver)
+        # Continues digging when a single removal pass stops above the target
+        self.miner = ClueMiner(size, solver=self.solver, transpositions=self.transpositions)
+        # Guesses allowed per uniqueness check, None for no limit
+        self.max_unique_nodes = 2 * size * size if size > 16 else None
+        # Guesses between deadline checks during a search
+        self.nodes_per_check = 256
+        # Batch policy of number removal on 16x16 and 25x25, one of REMOVAL_POLICIES
+        self.removal_policy = 'adaptive'
+        # Largest batch the adaptive policy grows to
+        self.max_removal_batch = 64
 
     def _get_symbols(self):
         """Get the symbols to use for the grid based on size."""
@@ -42,9 +69,35 @@ class PuzzleGenerator:
             return list(range(1, 5))
         elif self.size == 9:
             return list(range(1, 10))
-        else:  # 16x16
-            # Use 1-9 and A-G for 16x16 grid
-            return list(range(1, 10)) + ['A', 'B', 'C', 'D', 'E', 'F', 'G']
+        else:  # 16x16 and 25x25
+            # Use 1-9 followed by letters: A-G for 16x16, A-P for 25x25
+            return list(range(1, 10)) + [chr(ord('A') + i) for i in range(self.size - 9)]
+
+    def _to_values(self, grid):
+        """Convert a grid of symbols to a flat list of solver values (0 = empty)."""
+        return [self._symbol_values.get(symbol, 0) for symbol in grid.flat]
+
+    def _from_values(self, grid, values):
+        """Write a flat list of solver values back into a grid of symbols."""
+        grid.flat[:] = [self.symbols[value - 1] if value else 0 for value in values]
+
+    def pack_puzzles(self, puzzles):
+        """Pack (puzzle, solution) pairs into one compact buffer.
+
+        Every board is stored as size * size bytes of solver values, which
+        is far cheaper to send between processes than pickled numpy arrays.
+        """
+        values = []
+        for puzzle, solution in puzzles:
+            values.extend(self._to_values(puzzle))
+            values.extend(self._to_values(solution))
+        return np.array(values, dtype=np.uint8).tobytes()
+
+    def unpack_puzzles(self, buffer):
+        """Unpack a buffer from pack_puzzles into (puzzle, solution) grids of symbols."""
+        lookup = np.array([0] + self.symbols, dtype=object if self.size >= 16 else int)
+        boards = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, 2, self.size, self.size)
+        return [(lookup[puzzle], lookup[solution]) for puzzle, solution in boards]
 
     def is_valid(self, board, row, col, num):
         """Check whether a number/symbol can be placed in a given cell."""
@@ -62,72 +115,64 @@ class PuzzleGenerator:
                     return False
         return True
 
-    def fill_grid(self, grid, start_time=None, timeout=None):
-        """Fill the grid using size-appropriate strategy."""
+    def fill_grid(self, grid, start_time=None, timeout=None, deadline=None):
+        """Fill the grid using size-appropriate strategy.
+
+        Empty grids are filled from the solved-grid source; partially filled
+        ones are completed by search.
+        """
+        deadline = as_deadline(deadline, start_time, timeout)
+        if not np.count_nonzero(grid):
+            self._from_values(grid, self.grid_source.generate(deadline))
+            return True
         if self.size <= 9:
-            return self._fill_grid_small(grid, start_time, timeout)
-        return self._fill_grid_large(grid, start_time, timeout)
+            return self._fill_grid_small(grid, deadline=deadline)
+        return self._fill_grid_large(grid, deadline=deadline)
 
-    def _fill_grid_small(self, grid, start_time=None, timeout=None):
-        """Original recursive backtracking for 4x4 and 9x9 grids."""
-        if timeout and start_time and time.time() - start_time > timeout:
-            raise TimeoutError(f"Grid filling timed out after {timeout} seconds")
+    def _fill_grid_small(self, grid, start_time=None, timeout=None, deadline=None):
+        """Randomized search for 4x4 and 9x9 grids, run to completion."""
+        if not self.solver.load(self._to_values(grid)):
+            return False
+        self._run_search(1, as_deadline(deadline, start_time, timeout), rng=random)
+        return self._store_solution(grid)
 
-        empty = self._find_empty(grid)
-        if not empty:
-            return True
-        
-        row, col = empty
-        for symbol in random.sample(self.symbols, len(self.symbols)):
-            if self.is_valid(grid, row, col, symbol):
-                grid[row][col] = symbol
-                if self._fill_grid_small(grid, start_time, timeout):
-                    return True
-                grid[row][col] = 0
-        return False
-
-    def _fill_grid_large(self, grid, start_time=None, timeout=None):
-        """Optimized filling for 16x16 grids using improved backtracking."""
-        if timeout and start_time and time.time() - start_time > timeout:
-            raise TimeoutError(f"Grid filling timed out after {timeout} seconds")
-
-        empty = self._find_empty(grid)
-        if not empty:
-            return True
+    def _fill_grid_large(self, grid, start_time=None, timeout=None, deadline=None):
+        """Randomized search with restarts for 16x16 and 25x25 grids.
 
-        row, col = empty
-        
-        # Precompute used values for row, column and box
-        used = set()
-        
-        # Row values
-        used.update(grid[row])
-        
-        # Column values
-        used.update(grid[i][col] for i in range(self.size))
-        
-        # Box values
-        box_row = row - row % self.box_size
-        box_col = col - col % self.box_size
-        for i in range(self.box_size):
-            for j in range(self.box_size):
-                used.add(grid[box_row + i][box_col + j])
-        
-        # Get available values
-        available = [s for s in self.symbols if s not in used]
-        
-        if not available:
+        Each attempt gets a node budget; runs that wander into a dead region
+        are abandoned and restarted rather than backtracked out of.
+        """
+        solution = self.grid_source.search_grid(self._to_values(grid), as_deadline(deadline, start_time, timeout))
+        if solution is None:
             return False
+        self._from_values(grid, solution)
+        return True
+
+    def _store_solution(self, grid):
+        """Copy the engine's first solution into the grid, if it found one."""
+        if self.solver.solution is None:
+            return False
+        self._from_values(grid, self.solver.solution)
+        return True
+
+    def _run_search(self, limit, deadline=None, rng=None, max_nodes=None):
+        """Drive the shared search engine, checking the deadline every nodes_per_check guesses.
 
-        # Try available values in random order
-        for symbol in random.sample(available, len(available)):
-            grid[row][col] = symbol
-            if self._fill_grid_large(grid, start_time, timeout):
+        Returns:
+            bool: True if the search finished, False if max_nodes ran out first
+        """
+        while True:
+            budget = None
+            if deadline is not None:
+                deadline.check("Search")
+                budget = self.nodes_per_check
+            if max_nodes is not None:
+                remaining = max_nodes - self.solver.nodes
+                if remaining <= 0:
+                    return False
+                budget = remaining if budget is None else min(budget, remaining)
+            if self.solver.run(limit, budget, rng):
                 return True
-            grid[row][col] = 0
-        
-        # If we get here, we need to backtrack
-        return False
 
     def _find_empty(self, grid):
         """Find an empty cell with the fewest possible values."""
@@ -145,63 +190,95 @@ class PuzzleGenerator:
                             return best_cell
         return best_cell
 
-    def count_solutions(self, grid, limit=2):
+    def count_solutions(self, grid, limit=2, deadline=None):
         """Count solutions up to limit. Returns early if more than one solution found."""
-        empty = self._find_empty(grid)
-        if not empty:
-            return 1
-
-        total = 0
-        row, col = empty
-        for symbol in self.symbols:
-            if total >= limit:
-                break
-            if self.is_valid(grid, row, col, symbol):
-                grid[row][col] = symbol
-                if not self._find_empty(grid):
-                    total += 1
-                else:
-                    total += self.count_solutions(grid, limit - total)
-                grid[row][col] = 0
-        return total
+        values = self._to_values(grid)
+        key = self.transpositions.key(values)
+        known = self.transpositions.get(key)
+        if known is not None and (known < 2 or limit <= 2):
+            return min(known, limit)
+        if not self.solver.load(values):
+            count = 0
+        else:
+            self._run_search(limit, deadline)
+            count = self.solver.count
+        if count < limit or limit >= 2:
+            self.transpositions.put(key, count)
+        return count
 
-    def has_unique_solution(self, grid):
+    def has_unique_solution(self, grid, deadline=None):
         """Check if the puzzle has exactly one solution."""
-        return self.count_solutions(grid.copy(), limit=2) == 1
+        return self._is_unique(self._to_values(grid), deadline)
 
-    def generate_sudoku(self, min_clues=None, max_attempts=5, timeout=120):
-        """Generate a full Sudoku grid with retries and timeout."""
-        start_time = time.time()
+    def _is_unique(self, values, deadline=None, key=None, removed=None):
+        """Uniqueness check of a flat board through the transposition table.
 
-        if min_clues is None:
-            min_clues = {
-                4: 4,    # 4x4 minimum clues
-                9: 17,   # 9x9 minimum clues (mathematically proven)
-                16: 80   # 16x16 adjusted minimum for better performance
-            }[self.size]
+        Args:
+            values (list): Flat board, 0 for empty cells
+            key (int): Zobrist hash of the board if the caller keeps it up to date
+            removed (tuple): (cell, value) of the clue just removed from the board.
+                If the clue is forced back by a single the board leads straight
+                back to the one it was removed from, and that board's entry applies.
+        """
+        table = self.transpositions
+        if key is None:
+            key = table.key(values)
+        known = table.get(key)
+        if known is not None:
+            return known == 1
+        if removed is not None:
+            cell, value = removed
+            if table.get(table.toggle(key, cell, value)) == 1 and self.solver.is_forced(values, cell, value):
+                table.put(key, 1)
+                return True
+        if not self.solver.load(values):
+            self.transpositions.put(key, 0)
+            return False
+        # Searches that exhaust the node budget count as not unique
+        if not self._run_search(2, deadline, max_nodes=self.max_unique_nodes):
+            return False
+        self.transpositions.put(key, self.solver.count)
+        return self.solver.count == 1
+
+    def generate_sudoku(self, min_clues=None, max_attempts=5, timeout=120, deadline=None, pool=None):
+        """Generate a full Sudoku grid with retries and timeout.
+
+        A shared deadline, if given, replaces the timeout and lets another
+        thread cancel generation. With a pool, number removal runs its
+        uniqueness checks speculatively in parallel (see SpeculativeRemover).
 
-        # For 16x16, adjust clue counts to be more reasonable
-        if self.size == 16:
-            min_clues = max(min_clues, 80)  # Ensure at least 80 clues for 16x16
+        min_clues defaults to the calibrated count of a hard puzzle; a given
+        count is rejected with ValueError if calibration.check_clues finds it
+        cannot be generated in the time left.
+        """
+        if deadline is None:
+            deadline = Deadline(timeout)
+        deadline.check()
+        remaining = deadline.remaining()
+        if remaining is None:
+            remaining = math.inf
 
-        # Validate clue count
-        if min_clues > self.size * self.size:
-            raise ValueError(f"Cannot generate puzzle with {min_clues} clues in a {self.size}x{self.size} grid")
+        if min_clues is None:
+            min_clues = choose_clues(self.size, 'hard', remaining)
+        else:
+            check_clues(self.size, min_clues, remaining)
 
-        dtype = object if self.size == 16 else int
+        dtype = object if self.size >= 16 else int
         grid = np.zeros((self.size, self.size), dtype=dtype)
         attempt = 0
 
         while attempt < max_attempts:
-            if time.time() - start_time > timeout:
-                raise TimeoutError(f"Puzzle generation timed out after {timeout} seconds")
+            deadline.check()
 
             attempt += 1
             grid = np.zeros((self.size, self.size), dtype=dtype)
             
-            if self.fill_grid(grid, start_time, timeout):
+            if self.fill_grid(grid, deadline=deadline):
+                # Boards dug from the previous solution will not come up again
+                self.transpositions.clear()
                 try:
-                    puzzle = self.remove_numbers_exact_clues(grid.copy(), num_clues=min_clues, start_time=start_time, timeout=timeout)
+                    puzzle = self.remove_numbers_exact_clues(grid.copy(), num_clues=min_clues, deadline=deadline,
+                                                             pool=pool)
                     return puzzle, grid
                 except Exception as e:
                     if isinstance(e, TimeoutError):
@@ -212,75 +289,187 @@ class PuzzleGenerator:
 
         raise RuntimeError(f"Failed to generate valid grid after {max_attempts} attempts")
 
-    def remove_numbers_exact_clues(self, grid, num_clues, start_time=None, timeout=None):
-        """Optimized number removal with batched uniqueness checks."""
-        if timeout and start_time and time.time() - start_time > timeout:
-            raise TimeoutError(f"Number removal timed out after {timeout} seconds")
+    def remove_numbers_exact_clues(self, grid, num_clues, start_time=None, timeout=None, deadline=None, pool=None):
+        """Optimized number removal with batched uniqueness checks.
 
-        total_cells = self.size * self.size
+        With a multiprocessing pool, candidate removals are checked several
+        at a time instead (see SpeculativeRemover). If the removal pass gets
+        stuck above num_clues, the clue miner keeps searching for removals
+        that preserve uniqueness within its time budget.
+        """
+        deadline = as_deadline(deadline, start_time, timeout)
+        deadline.check("Number removal")
+        # The grid is mirrored in a flat list with its Zobrist hash, so each
+        # check neither converts the grid nor rehashes the board
+        values = self._to_values(grid)
+        key = self.transpositions.key(values)
+        solution = None
+        if all(values) and self.solver.load(values):
+            # A complete valid grid is its own unique solution
+            solution = list(values)
+            self.transpositions.put(key, 1)
+        size = self.size
+
+        total_cells = size * size
         cells_to_remove = total_cells - num_clues
         removed = 0
 
+        if pool is not None:
+            order = list(range(total_cells))
+            random.shuffle(order)
+            removed = SpeculativeRemover(self, pool).remove(values, cells_to_remove, order, deadline, key)
         # For large grids, remove numbers in batches to reduce uniqueness checks
-        if self.size > 9:
-            # Adjust batch size based on grid size
-            batch_size = 8 if self.size == 16 else 4
-            all_cells = [(r, c) for r in range(self.size) for c in range(self.size)]
+        elif size > 9:
+            if self.removal_policy not in REMOVAL_POLICIES:
+                raise ValueError(f"Unknown removal policy: {self.removal_policy}")
+            all_cells = list(range(total_cells))
             random.shuffle(all_cells)
-            
-            while removed < cells_to_remove and all_cells:
-                if timeout and start_time and time.time() - start_time > timeout:
-                    raise TimeoutError(f"Number removal timed out after {timeout} seconds")
-
-                batch = []
-                batch_cells = []
-                
-                # Try to remove a batch of numbers
-                for _ in range(min(batch_size, cells_to_remove - removed)):
-                    if not all_cells:
-                        break
-                    row, col = all_cells.pop()
-                    if grid[row][col] != 0:
-                        batch.append((row, col, grid[row][col]))
-                        batch_cells.append((row, col))
-                        grid[row][col] = 0
-
-                # Check uniqueness after removing the batch
-                if self.has_unique_solution(grid):
-                    removed += len(batch)
-                else:
-                    # Restore the batch if solution is not unique
-                    for row, col, value in batch:
-                        grid[row][col] = value
-                    
-                    # If batch failed, try removing cells individually
-                    for row, col, value in batch:
-                        grid[row][col] = 0
-                        if self.has_unique_solution(grid):
-                            removed += 1
-                        else:
-                            grid[row][col] = value
+            if self.removal_policy == 'fixed':
+                removed, key = self._remove_fixed_batches(values, key, all_cells, cells_to_remove, deadline)
+            else:
+                removed, key = self._remove_adaptive_batches(values, key, all_cells, cells_to_remove, deadline)
         else:
             # Original logic for smaller grids
-            all_cells = [(r, c) for r in range(self.size) for c in range(self.size)]
+            all_cells = list(range(total_cells))
             random.shuffle(all_cells)
 
-            for row, col in all_cells:
-                if timeout and start_time and time.time() - start_time > timeout:
-                    raise TimeoutError(f"Number removal timed out after {timeout} seconds")
+            for cell in all_cells:
+                deadline.check("Number removal")
 
                 if removed >= cells_to_remove:
                     break
 
-                if grid[row][col] == 0:
+                value = values[cell]
+                if not value:
                     continue
 
-                backup = grid[row][col]
-                grid[row][col] = 0
+                values[cell] = 0
+                key = self.transpositions.toggle(key, cell, value)
 
-                if self.has_unique_solution(grid):
+                if self._is_unique(values, deadline, key, (cell, value)):
                     removed += 1
                 else:
-                    grid[row][col] = backup
+                    values[cell] = value
+                    key = self.transpositions.toggle(key, cell, value)
 
+        self._from_values(grid, values)
+        if removed < cells_to_remove:
+            self.mine_clues(grid, num_clues, solution, deadline)
         return grid
+
+    def _remove_fixed_batches(self, values, key, all_cells, cells_to_remove, deadline):
+        """Remove fixed-size batches, checking a failed batch's cells one by one.
+
+        Returns:
+            tuple: (clues removed, Zobrist hash of values)
+        """
+        # Adjust batch size based on grid size
+        batch_size = 16 if self.size == 25 else 8
+        removed = 0
+        while removed < cells_to_remove and all_cells:
+            deadline.check("Number removal")
+
+            batch = []
+
+            # Try to remove a batch of numbers
+            for _ in range(min(batch_size, cells_to_remove - removed)):
+                if not all_cells:
+                    break
+                cell = all_cells.pop()
+                if values[cell]:
+                    batch.append((cell, values[cell]))
+                    key = self.transpositions.toggle(key, cell, values[cell])
+                    values[cell] = 0
+
+            # Check uniqueness after removing the batch
+            if self._is_unique(values, deadline, key):
+                removed += len(batch)
+                continue
+
+            # Restore the batch if solution is not unique
+            for cell, value in batch:
+                key = self.transpositions.toggle(key, cell, value)
+                values[cell] = value
+
+            # If batch failed, try removing cells individually
+            for cell, value in batch:
+                key = self.transpositions.toggle(key, cell, value)
+                values[cell] = 0
+                if self._is_unique(values, deadline, key, (cell, value)):
+                    removed += 1
+                else:
+                    key = self.transpositions.toggle(key, cell, value)
+                    values[cell] = value
+        return removed, key
+
+    def _remove_adaptive_batches(self, values, key, all_cells, cells_to_remove, deadline):
+        """Remove batches whose size adapts to how often they succeed.
+
+        A batch that keeps the solution unique doubles the next batch size, a
+        failed one halves it and is bisected (see _remove_group), so the
+        clues it cannot lose are found in logarithmically many checks.
+
+        Returns:
+            tuple: (clues removed, Zobrist hash of values)
+        """
+        batch_size = 16 if self.size == 25 else 8
+        removed = 0
+        while removed < cells_to_remove and all_cells:
+            deadline.check("Number removal")
+            batch = []
+            while all_cells and len(batch) < min(batch_size, cells_to_remove - removed):
+                cell = all_cells.pop()
+                if values[cell]:
+                    batch.append((cell, values[cell]))
+            if not batch:
+                break
+            batch_removed, key = self._remove_group(values, key, batch, deadline)
+            removed += batch_removed
+            if batch_removed == len(batch):
+                batch_size = min(batch_size * 2, self.max_removal_batch)
+            else:
+                batch_size = max(batch_size // 2, 1)
+        return removed, key
+
+    def _remove_group(self, values, key, group, deadline, failed=False):
+        """Remove as many clues of a group as uniqueness allows, bisecting on failure.
+
+        Args:
+            group (list): (cell, value) clues to remove
+            failed (bool): The group is already known not to be removable as a whole
+
+        Returns:
+            tuple: (clues removed, Zobrist hash of values)
+        """
+        table = self.transpositions
+        if not failed:
+            for cell, value in group:
+                key = table.toggle(key, cell, value)
+                values[cell] = 0
+            removed = group[0] if len(group) == 1 else None
+            if self._is_unique(values, deadline, key, removed):
+                return len(group), key
+            for cell, value in group:
+                key = table.toggle(key, cell, value)
+                values[cell] = value
+        if len(group) == 1:
+            # Final: removing more clues later never makes this one removable
+            return 0, key
+        half = len(group) // 2
+        first, key = self._remove_group(values, key, group[:half], deadline)
+        # With the whole first half gone, removing the second half is the failed group again
+        second, key = self._remove_group(values, key, group[half:], deadline, failed=first == half)
+        return first + second, key
+
+    def mine_clues(self, grid, num_clues, solution=None, deadline=None, groups=None):
+        """Dig a uniquely solvable grid further towards num_clues, in place.
+
+        Args:
+            groups (list): Tuples of flat cell indices removed together, see ClueMiner.reduce
+
+        Returns:
+            bool: True if exactly num_clues clues remain
+        """
+        values = self.miner.reduce(self._to_values(grid), num_clues, solution, deadline, groups)
+        self._from_values(grid, values)
+        return sum(1 for value in values if value) == num_clues
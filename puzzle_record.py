@@ -0,0 +1,67 @@
+"""Compact in-memory form of a generated puzzle and its solution."""
+import numpy as np
+
+from line_format import SYMBOL_CHARS
+
+
+def _value(symbol):
+    """Solver value of a board symbol: ints stay as they are, letters A-P become 10-25."""
+    return symbol if not isinstance(symbol, str) else SYMBOL_CHARS.index(symbol.upper()) + 1
+
+
+class PuzzleRecord:
+    """A puzzle, its solution and how it was made, in a few hundred bytes.
+
+    Both boards live in one bytes object of 2 * size * size solver values
+    (puzzle first, 0 for empty cells), the layout of a pair packed by
+    PuzzleGenerator.pack_puzzles. The numpy views used for rendering are
+    only made when first asked for. Values above 9 stay numbers; the
+    renderers show them as letters.
+    """
+
+    __slots__ = ('size', 'data', 'difficulty', 'clues', 'seed', 'stats', '_boards')
+
+    def __init__(self, size, data, difficulty=None, seed=None, stats=None):
+        """Wrap a packed pair.
+
+        Args:
+            size (int): Size of the grid (4, 9, 16, or 25)
+            data (bytes): Puzzle then solution, one byte per cell
+            difficulty (str): Requested difficulty, if known
+            seed (int): Random seed the puzzle was generated from, if known
+            stats (dict): Generation statistics, such as the seconds taken
+        """
+        if len(data) != 2 * size * size:
+            raise ValueError(f"A {size}x{size} puzzle record takes {2 * size * size} bytes, got {len(data)}")
+        self.size = size
+        self.data = bytes(data)
+        self.difficulty = difficulty
+        self.clues = size * size - self.data.count(0, 0, size * size)
+        self.seed = seed
+        self.stats = stats
+        self._boards = None
+
+    @classmethod
+    def from_pair(cls, puzzle, solution, difficulty=None, seed=None, stats=None):
+        """Pack a (puzzle, solution) pair of symbol grids, ints or letters, into a record."""
+        size = len(puzzle)
+        values = [_value(symbol) for board in (puzzle, solution) for row in board for symbol in row]
+        return cls(size, np.array(values, dtype=np.uint8).tobytes(), difficulty, seed, stats)
+
+    @property
+    def boards(self):
+        """Read-only uint8 array of shape (2, size, size) over the record's bytes."""
+        if self._boards is None:
+            self._boards = np.frombuffer(self.data, dtype=np.uint8).reshape(2, self.size, self.size)
+        return self._boards
+
+    @property
+    def puzzle(self):
+        return self.boards[0]
+
+    @property
+    def solution(self):
+        return self.boards[1]
+
+    def __repr__(self):
+        return f"PuzzleRecord(size={self.size}, difficulty={self.difficulty!r}, clues={self.clues})"
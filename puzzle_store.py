@@ -0,0 +1,92 @@
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from puzzle_record import PuzzleRecord
+
+
+class SharedPuzzleStore:
+    """Preallocated shared-memory array of (puzzle, solution) boards, indexed by puzzle number.
+
+    The parent process creates the store and hands its handle() to the
+    workers, which attach to it and copy finished puzzles straight into
+    their slots. Each board is size * size bytes of solver values (0 for
+    empty cells), and the parent reads them in place as numpy views
+    without unpickling or copying anything.
+
+    Views returned by pairs() point into the shared memory, so they must
+    be dropped before the store is closed.
+    """
+
+    def __init__(self, size, capacity, name=None, lock=None):
+        """Create a store, or attach to an existing one by name.
+
+        Args:
+            size (int): Size of the grid (4, 9, 16, or 25)
+            capacity (int): Number of (puzzle, solution) pairs held
+            name (str): Name of the shared memory block to attach to, None to create one
+            lock: Lock shared by every process writing to the store
+        """
+        self.size = size
+        self.capacity = capacity
+        self.owner = name is None
+        nbytes = max(1, capacity * 2 * size * size)
+        self.memory = SharedMemory(name=name, create=self.owner, size=nbytes if self.owner else 0)
+        self.lock = lock if lock is not None else multiprocessing.Lock()
+        self.boards = np.ndarray((capacity, 2, size, size), dtype=np.uint8, buffer=self.memory.buf)
+
+    def handle(self):
+        """Picklable description of the store for attach() in another process."""
+        return self.size, self.capacity, self.memory.name, self.lock
+
+    @classmethod
+    def attach(cls, handle):
+        """Attach to the store described by handle()."""
+        size, capacity, name, lock = handle
+        return cls(size, capacity, name=name, lock=lock)
+
+    def write(self, index, buffer, deadline=None):
+        """Copy packed (puzzle, solution) pairs into the slots from index on.
+
+        Args:
+            index (int): Slot of the first pair
+            buffer (bytes): Pairs packed by PuzzleGenerator.pack_puzzles
+            deadline (Deadline): Deadline of a racing attempt. Only the first
+                attempt of a race to get here writes; it cancels the others,
+                which raise SearchCancelled instead of overwriting its result.
+        """
+        size = self.size
+        pairs = np.frombuffer(buffer, dtype=np.uint8).reshape(-1, 2, size, size)
+        if index + len(pairs) > self.capacity:
+            raise ValueError(f"Slots {index}..{index + len(pairs) - 1} are beyond the store's capacity")
+        if deadline is None:
+            self.boards[index:index + len(pairs)] = pairs
+            return
+        with self.lock:
+            deadline.check("Storing puzzles")
+            self.boards[index:index + len(pairs)] = pairs
+            deadline.cancel()
+
+    def pairs(self, start=0, count=None):
+        """Return (puzzle, solution) views of count slots from start on, without copying."""
+        stop = self.capacity if count is None else start + count
+        return [(self.boards[index, 0], self.boards[index, 1]) for index in range(start, stop)]
+
+    def records(self, start=0, count=None, difficulty=None):
+        """Copy count slots from start on into PuzzleRecord objects, which outlive the store."""
+        stop = self.capacity if count is None else start + count
+        return [PuzzleRecord(self.size, self.boards[index].tobytes(), difficulty) for index in range(start, stop)]
+
+    def close(self):
+        """Detach from the shared memory, freeing it if this process created it."""
+        self.boards = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,358 @@
+"""Racing restarts: run several independently seeded attempts of a task, keep the first.
+
+Generation time is heavy-tailed: most attempts finish quickly, a few run
+until their timeout. Starting K copies of the same task with different
+random seeds and taking whichever finishes first cuts that tail, at the
+cost of up to K times the work. RacePolicy picks K per kind of task from
+the latencies observed so far, starting from a single attempt, so
+light-tailed tasks are not raced at all.
+"""
+import multiprocessing
+import queue
+import random
+import signal
+import threading
+import time
+from collections import deque
+from multiprocessing import Pool
+
+from deadline import Deadline, SearchCancelled
+
+# Cancellation flags of the races, one per slot, shared with the workers
+_flags = None
+
+
+def _init_worker(flags, initializer, initargs):
+    global _flags
+    _flags = flags
+    # Forked workers inherit the parent's signal handlers, e.g. a gunicorn
+    # worker's, which would keep them running when the pool is terminated
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if initializer is not None:
+        initializer(*initargs)
+
+
+class RaceFlag:
+    """Cancellation flag of one race slot, usable as the event of a Deadline.
+
+    Only the slot number is pickled; reading the flag is a plain memory read
+    of the array shared with the pool's workers.
+    """
+
+    def __init__(self, slot):
+        self.slot = slot
+
+    def set(self):
+        _flags[self.slot] = 1
+
+    def is_set(self):
+        return _flags[self.slot] != 0
+
+
+def _attempt(job):
+    """Pool task: run one seeded attempt under the race's deadline.
+
+    Returns:
+        tuple: (finished, result or exception, seconds taken)
+    """
+    slot, seed, func, args, timeout = job
+    random.seed(seed)
+    start = time.monotonic()
+    try:
+        result = func(*args, deadline=Deadline(timeout, event=RaceFlag(slot)))
+    except (TimeoutError, RuntimeError, ValueError) as e:
+        return False, e, time.monotonic() - start
+    return True, result, time.monotonic() - start
+
+
+class RacePolicy:
+    """Choose how many attempts to race from observed attempt latencies.
+
+    Every race of K attempts that finishes at time t is one finished
+    attempt and K - 1 attempts known to take longer than t; a race where
+    every attempt failed or timed out gives K attempts longer than t. A
+    Kaplan-Meier estimate over these gives the survival function S(t) of
+    a single attempt, and the first of K attempts is still running at t
+    with probability S(t) ** K. The policy races the smallest K whose
+    predicted `quantile` latency is within `tail_ratio` times the median
+    of a single attempt, capped at max_k.
+
+    Races of K attempts cut every attempt off at the first finish, so they
+    never show how far the tail of fewer attempts reaches: from races of
+    K > 1 alone the policy could not tell that K - 1 would do. Every
+    `explore_every`-th race of a kind whose smaller K is beyond the data
+    therefore races one attempt fewer, which fills that tail in.
+    """
+
+    def __init__(self, max_k=4, initial_k=1, quantile=0.99, tail_ratio=3.0, window=200, min_samples=20,
+                 explore_every=10):
+        """Initialize the policy.
+
+        Args:
+            max_k (int): Most attempts raced at once
+            initial_k (int): Attempts raced until min_samples races were observed
+            quantile (float): Latency quantile to keep down, p99 by default
+            tail_ratio (float): Accepted ratio of that quantile to the median attempt
+            window (int): Races remembered per kind of task
+            min_samples (int): Races observed before K adapts
+            explore_every (int): How often a race tries one attempt fewer than
+                the data supports, 0 never to
+        """
+        self.max_k = max_k
+        self.initial_k = initial_k
+        self.quantile = quantile
+        self.tail_ratio = tail_ratio
+        self.min_samples = min_samples
+        self.window = window
+        self.explore_every = explore_every
+        self.samples = {}
+        self.decisions = {}
+        self.lock = threading.Lock()
+
+    def observe(self, key, k, elapsed, finished=True):
+        """Record a race of k attempts that ended after elapsed seconds.
+
+        Args:
+            key: Kind of task, e.g. (grid_size, difficulty)
+            k (int): Attempts raced
+            elapsed (float): Seconds until the first attempt finished or the race gave up
+            finished (bool): Whether an attempt succeeded
+        """
+        with self.lock:
+            samples = self.samples.setdefault(key, deque(maxlen=self.window))
+            samples.append((elapsed, k, finished))
+
+    def survival(self, key):
+        """Kaplan-Meier estimate of a single attempt's latency.
+
+        Returns:
+            list: (t, S(t)) steps at every finishing time, S(t) being the
+            probability that one attempt is still running after t seconds
+        """
+        with self.lock:
+            samples = sorted(self.samples.get(key, ()))
+        at_risk = sum(k for _, k, _ in samples)
+        steps = []
+        survival = 1.0
+        for elapsed, k, finished in samples:
+            if finished:
+                survival *= 1.0 - 1.0 / at_risk
+                steps.append((elapsed, survival))
+            at_risk -= k
+        return steps
+
+    def k(self, key):
+        """Number of attempts to race for the next task of this kind."""
+        with self.lock:
+            observed = len(self.samples.get(key, ()))
+            decision = self.decisions[key] = self.decisions.get(key, 0) + 1
+        if observed < self.min_samples:
+            return min(self.initial_k, self.max_k)
+        steps = self.survival(key)
+        median = self._quantile(steps, 0.5, 1)
+        if median is None:
+            return self.max_k
+        tails = {k: self._quantile(steps, self.quantile, k) for k in range(1, self.max_k + 1)}
+        k = next((k for k, tail in tails.items() if tail is not None and tail <= self.tail_ratio * median),
+                 self.max_k)
+        if k > 1 and tails[k - 1] is None and self.explore_every and decision % self.explore_every == 0:
+            return k - 1
+        return k
+
+    @staticmethod
+    def _quantile(steps, q, k):
+        """Time by which the first of k attempts finished with probability q, None if beyond the data."""
+        threshold = (1.0 - q) ** (1.0 / k)
+        for elapsed, survival in steps:
+            if survival <= threshold:
+                return elapsed
+        return None
+
+
+class Race:
+    """Handle of one running race, filled in by the pool's result thread."""
+
+    def __init__(self, executor, key, slot, k, on_done=None):
+        self.executor = executor
+        self.on_done = on_done
+        self.key = key
+        self.slot = slot
+        self.k = k
+        self.pending = k
+        self.won = False
+        self.value = None
+        self.error = None
+        self.elapsed = 0.0
+        self.done = threading.Event()
+
+    def cancel(self):
+        """Stop the attempts still running at their next deadline check."""
+        self.executor.flags[self.slot] = 1
+
+    def result(self, deadline=None):
+        """Wait for the first attempt to succeed.
+
+        Args:
+            deadline (Deadline): Caller's time limit; when it expires or is
+                cancelled the race is cancelled too
+
+        Returns:
+            The winning attempt's result
+
+        Raises:
+            The last attempt's error if none succeeded, or the caller's
+            deadline error
+        """
+        while not self.done.wait(0.05):
+            if deadline is not None and deadline.expired():
+                self.cancel()
+                deadline.check()
+        if not self.won:
+            raise self.error
+        return self.value
+
+    def _on_attempt(self, outcome):
+        finished, value, elapsed = outcome
+        executor = self.executor
+        with executor.lock:
+            self.pending -= 1
+            self.elapsed = max(self.elapsed, elapsed)
+            if finished and not self.won:
+                self.won = True
+                self.value = value
+                self.elapsed = elapsed
+                executor.flags[self.slot] = 1
+                executor.policy.observe(self.key, self.k, elapsed)
+                self._finish()
+            elif not finished and not isinstance(value, SearchCancelled):
+                self.error = value
+            if self.pending == 0:
+                if not self.won:
+                    if self.error is None:
+                        self.error = value
+                    executor.policy.observe(self.key, self.k, self.elapsed, finished=False)
+                    self._finish()
+                executor._release(self.slot)
+
+    def _finish(self):
+        self.done.set()
+        if self.on_done is not None:
+            self.on_done(self)
+
+    def _on_error(self, error):
+        self._on_attempt((False, error, 0.0))
+
+
+class RacingExecutor:
+    """Process pool that runs each task as a race of independently seeded attempts.
+
+    Tasks are called as func(*args, deadline=deadline), where the deadline
+    carries the attempt's timeout and is cancelled as soon as another
+    attempt of the same race succeeds. Attempts that raise TimeoutError,
+    RuntimeError or ValueError count as failed.
+    """
+
+    def __init__(self, processes=None, policy=None, max_races=None, initializer=None, initargs=()):
+        """Start the worker pool.
+
+        Args:
+            processes (int): Worker processes, the number of CPUs by default
+            policy (RacePolicy): Chooses the attempts per race, capped at the pool size
+            max_races (int): Races in flight at once; submit() waits for a free slot
+            initializer: Called as initializer(*initargs) once in every worker,
+                e.g. to build generators the tasks reuse
+        """
+        self.processes = processes or multiprocessing.cpu_count()
+        self.policy = policy or RacePolicy(max_k=self.processes)
+        self.policy.max_k = min(self.policy.max_k, self.processes)
+        max_races = max_races or 4 * self.processes
+        self.flags = multiprocessing.Array('b', max_races, lock=False)
+        self.free = list(range(max_races))
+        self.lock = threading.Condition()
+        self.rng = random.Random()
+        self.pool = Pool(self.processes, initializer=_init_worker,
+                         initargs=(self.flags, initializer, initargs))
+
+    def submit(self, func, args=(), key=None, timeout=None, k=None, on_done=None):
+        """Start a race of attempts at func(*args).
+
+        Args:
+            key: Kind of task whose latencies choose K, func by default
+            timeout (float): Seconds each attempt may run, None for no limit
+            k (int): Attempts to race, chosen by the policy by default
+            on_done: Called with the race from the pool's result thread once
+                it has a winner or every attempt failed
+
+        Returns:
+            Race: Handle whose result() waits for the winner
+        """
+        key = func if key is None else key
+        k = k or self.policy.k(key)
+        with self.lock:
+            while not self.free:
+                self.lock.wait()
+            slot = self.free.pop()
+            self.flags[slot] = 0
+            race = Race(self, key, slot, k, on_done)
+            seeds = [self.rng.getrandbits(64) for _ in range(k)]
+        for seed in seeds:
+            self.pool.apply_async(_attempt, ((slot, seed, func, args, timeout),),
+                                  callback=race._on_attempt, error_callback=race._on_error)
+        return race
+
+    def run(self, func, args=(), key=None, timeout=None, deadline=None):
+        """Race func(*args) and return the first result."""
+        return self.submit(func, args, key, timeout).result(deadline)
+
+    def map(self, func, args_list, key=None, timeout=None):
+        """Race func over every argument tuple, returning results in order."""
+        args_list = list(args_list)
+        results = [None] * len(args_list)
+        for index, result in self.imap_unordered(func, args_list, key, timeout):
+            results[index] = result
+        return results
+
+    def imap_unordered(self, func, args_list, key=None, timeout=None):
+        """Race func over every argument tuple, yielding (index, result) as races finish.
+
+        Races are submitted in order as earlier ones finish, with at most
+        one attempt per worker in flight, so K for later tasks follows what
+        the earlier ones showed.
+
+        Args:
+            key: Function of an argument tuple giving its kind of task,
+                func for every task by default
+        """
+        args_list = list(args_list)
+        finished = queue.Queue()
+        in_flight = {}
+        index = 0
+        attempts = 0
+        while index < len(args_list) or in_flight:
+            while index < len(args_list):
+                args = args_list[index]
+                task_key = func if key is None else key(args)
+                k = self.policy.k(task_key)
+                if in_flight and attempts + k > self.processes:
+                    break
+                in_flight[self.submit(func, args, task_key, timeout, k, on_done=finished.put)] = index
+                attempts += k
+                index += 1
+            race = finished.get()
+            attempts -= race.k
+            yield in_flight.pop(race), race.result()
+
+    def _release(self, slot):
+        """Free a race slot once all of its attempts have returned (called holding the lock)."""
+        self.free.append(slot)
+        self.lock.notify()
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bulk Sudoku solver with multiprocessing support to use all cores
+Description: Streams puzzles in line format from a file or stdin, checks and solves them
+in parallel and writes one result line per puzzle, in input order. A result line is the
+solution for uniquely solvable puzzles, or one of 'unsolvable', 'multiple' or 'invalid'.
+"""
+
+import sys
+import time
+from collections import deque
+from multiprocessing import Pool, cpu_count
+
+from argument_parser import SolverArgumentParser
+from bitmask_solver import BitmaskSolver
+from line_format import format_line, is_puzzle_line, parse_line
+
+STATUSES = ('solved', 'multiple', 'unsolvable', 'invalid')
+
+# Solvers are cached per process so lookup tables are built once per worker
+_solvers = {}
+
+
+def solve_line(line):
+    """Solve one board line.
+
+    Returns:
+        tuple: (status, result_line)
+    """
+    try:
+        size, values = parse_line(line)
+    except ValueError:
+        return 'invalid', 'invalid'
+
+    solver = _solvers.get(size)
+    if solver is None:
+        solver = _solvers[size] = BitmaskSolver(size)
+
+    count, solution = solver.solve(values, limit=2)
+    if count == 0:
+        return 'unsolvable', 'unsolvable'
+    if count > 1:
+        return 'multiple', 'multiple'
+    return 'solved', format_line(solution)
+
+
+# Helper function for multiprocessing
+def solve_chunk(lines):
+    return [solve_line(line) for line in lines]
+
+
+def read_chunks(stream, chunk_size):
+    """Yield lists of up to chunk_size puzzle lines, skipping blanks and comments."""
+    chunk = []
+    for line in stream:
+        if not is_puzzle_line(line):
+            continue
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def solve_stream(chunks, workers):
+    """Solve chunks of lines and yield result lists in input order.
+
+    Only a bounded number of chunks is in flight at once, so arbitrarily
+    large inputs are streamed rather than read into memory.
+    """
+    if workers == 1:
+        for chunk in chunks:
+            yield solve_chunk(chunk)
+        return
+
+    with Pool(processes=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(solve_chunk, (chunk,)))
+            if len(pending) >= workers * 4:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def main():
+    args = SolverArgumentParser().parse()
+    workers = args.workers or cpu_count()
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    target = sys.stdout if args.output == '-' else open(args.output, 'w')
+
+    counts = dict.fromkeys(STATUSES, 0)
+    index = 0
+    start_time = time.perf_counter()
+    try:
+        for results in solve_stream(read_chunks(source, args.chunk_size), workers):
+            for status, result_line in results:
+                index += 1
+                counts[status] += 1
+                if status != 'solved':
+                    print(f"Puzzle #{index}: {status}", file=sys.stderr)
+                target.write(result_line + '\n')
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+    elapsed = time.perf_counter() - start_time
+    rate = index / elapsed if elapsed > 0 else 0.0
+    summary = ', '.join(f"{counts[status]} {status}" for status in STATUSES)
+    print(f"Processed {index} puzzles in {elapsed:.2f}s ({rate:.0f}/s) using {workers} workers: {summary}",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import random
+import numpy as np
+
+from bitmask_solver import BitmaskSolver
+from deadline import Deadline
+
+
+class SolvedGridGenerator:
+    """Fast source of random complete grids, used as the fill stage of the generators.
+
+    Base grids come from a randomized bitmask search with restarts (a Las
+    Vegas algorithm: every attempt gets a node budget and is abandoned if it
+    runs out). Each grid handed out is a base grid passed through a random
+    validity-preserving transform: symbol relabelling, row shuffles within
+    bands, band shuffles, the same for columns and stacks, and an optional
+    transpose.
+
+    The last `pool_size` base grids are kept. A fresh one is searched until
+    the pool is full and then with probability `fresh_ratio` per grid, so
+    the expensive search is amortized over many cheap transforms while new
+    bases keep entering the pool.
+
+    Every base is itself a fresh search result, but grids transformed from
+    the same base share all transform-invariant properties, so many grids
+    drawn in a row are fewer independent samples than their number (about
+    one base per seven grids with the defaults). Raise fresh_ratio where
+    that matters more than speed.
+    """
+
+    def __init__(self, size=9, solver=None, rng=None, pool_size=16, fresh_ratio=0.1, max_nodes=None):
+        """Initialize the generator.
+
+        Args:
+            size (int): Size of the grid (4, 9, 16, or 25)
+            solver (BitmaskSolver): Search engine to reuse, a new one by default
+            rng: Random source (random module or random.Random instance)
+            pool_size (int): Number of base grids kept for transforming
+            fresh_ratio (float): Probability of searching a new base once the pool is full
+            max_nodes (int): Guesses per search attempt before restarting
+        """
+        self.size = size
+        self.solver = solver or BitmaskSolver(size)
+        self.box_size = self.solver.box_size
+        self.rng = rng or random
+        self.pool_size = pool_size
+        self.fresh_ratio = fresh_ratio
+        self.max_nodes = max_nodes or 2 * size * size
+        self.nodes_per_check = 256
+        self.pool = []
+
+    def generate(self, deadline=None):
+        """Return a random complete grid as a flat list of values 1..size."""
+        if len(self.pool) < self.pool_size or self.rng.random() < self.fresh_ratio:
+            base = np.array(self.search_grid(deadline=deadline)).reshape(self.size, self.size)
+            if len(self.pool) < self.pool_size:
+                self.pool.append(base)
+            else:
+                self.pool[self.rng.randrange(self.pool_size)] = base
+        else:
+            base = self.pool[self.rng.randrange(len(self.pool))]
+        return self.transform(base).ravel().tolist()
+
+    def search_grid(self, values=None, deadline=None):
+        """Complete a board by randomized search, restarting attempts that run out of nodes.
+
+        Args:
+            values (list): Flat board to complete, an empty board by default
+
+        Returns:
+            list: Flat solution, or None if the board cannot be completed
+        """
+        deadline = deadline or Deadline()
+        if values is None:
+            values = [0] * (self.size * self.size)
+        solver = self.solver
+        while True:
+            if not solver.load(values):
+                return None
+            while True:
+                deadline.check("Grid filling")
+                budget = min(self.nodes_per_check, self.max_nodes - solver.nodes)
+                if budget <= 0 or solver.run(1, budget, self.rng):
+                    break
+            if solver.finished:
+                return solver.solution
+
+    def transform(self, grid):
+        """Apply a random validity-preserving transform to an (N, N) grid of values."""
+        rng = self.rng
+        box = self.box_size
+        if rng.random() < 0.5:
+            grid = grid.T
+        rows = [band * box + row for band in rng.sample(range(box), box) for row in rng.sample(range(box), box)]
+        cols = [stack * box + col for stack in rng.sample(range(box), box) for col in rng.sample(range(box), box)]
+        relabel = np.array([0] + rng.sample(range(1, self.size + 1), self.size))
+        return relabel[grid[np.ix_(rows, cols)]]
@@ -10,77 +10,222 @@ with optional minimum clues for each difficulty level, and optionally generates
 Supports parallel processing to utilize all CPU cores for generating puzzles concurrently.
 """
 
-from multiprocessing import Pool, cpu_count
-from advanced_sudoku_generator import AdvancedSudokuGenerator
-from pdf_generator import PDFGenerator
+import math
 from argument_parser import ArgumentParser
+from book_manifest import load_manifest
+from calibration import check_clues, choose_clues
+from deadline import Deadline
+
+# The generator stack (numpy), fpdf, multiprocessing and the networking
+# modules are imported by the functions that use them, so that --help,
+# argument errors and sudoku_worker.py start without loading them
+
+# Puzzles generated per task at most; small grids are batched so that
+# workers spend their time searching rather than exchanging messages
+BATCH_SIZES = {4: 50, 9: 10, 16: 1, 25: 1}
+
+# Generators of a worker process, by grid size, built once by init_worker
+_generators = {}
+
+# Shared-memory stores the worker writes its puzzles into, by grid size
+_stores = {}
+
+def init_worker(store_handles):
+    """Build a generator and its lookup tables once per worker process and grid size, and attach to the stores.
+
+    Args:
+        store_handles (dict): SharedPuzzleStore.handle() of the store for every grid size
+    """
+    from advanced_sudoku_generator import AdvancedSudokuGenerator
+    from puzzle_store import SharedPuzzleStore
+
+    for grid_size, handle in store_handles.items():
+        _generators[grid_size] = AdvancedSudokuGenerator(size=grid_size)
+        _stores[grid_size] = SharedPuzzleStore.attach(handle)
+
+def generate_batch(task, deadline=None):
+    """Generate a batch of puzzles with the worker's generator.
+
+    Every puzzle gets its own timeout; the deadline only cancels the batch.
+
+    Returns:
+        bytes: The (puzzle, solution) pairs packed by PuzzleGenerator.pack_puzzles
+    """
+    min_clues, difficulty, use_symmetry, grid_size, timeout, grade, count, start = task
+    generator = _generators.get(grid_size)
+    if generator is None:
+        from advanced_sudoku_generator import AdvancedSudokuGenerator
+        generator = _generators[grid_size] = AdvancedSudokuGenerator(size=grid_size)
+    cancel = deadline.event if deadline is not None else None
+    puzzles = [
+        generator.generate_professional_sudoku(min_clues=min_clues, symmetry=use_symmetry,
+                                               required_difficulty=difficulty,
+                                               deadline=Deadline(timeout, event=cancel), grade=grade)
+        for _ in range(count)
+    ]
+    return generator.pack_puzzles(puzzles)
 
 # Helper function for multiprocessing
-def generate_puzzle_task(task):
-    min_clues, difficulty, use_symmetry, grid_size = task
-    generator = AdvancedSudokuGenerator(size=grid_size)
-    return generator.generate_professional_sudoku(min_clues=min_clues, symmetry=use_symmetry, required_difficulty=difficulty)
-
-def get_min_clues_threshold(grid_size):
-    """Get the minimum required clues based on grid size."""
-    return {
-        4: 4,    # 4x4 minimum clues
-        9: 17,   # 9x9 minimum clues (mathematically proven)
-        16: 40   # 16x16 reasonable minimum
-    }[grid_size]
-
-# Main Function
-def main():
-    # Use the ArgumentParser class to parse arguments
-    args_parser = ArgumentParser()
-    args = args_parser.parse()
-
-    pdf_generator = PDFGenerator(grid_size=args.size)
-
-    # Get minimum clues threshold for validation
-    min_clues_threshold = get_min_clues_threshold(args.size)
-
+def generate_puzzle_task(task, deadline=None):
+    """Generate a batch of puzzles and write them into the grid size's shared store from slot `start` on.
+
+    Returns:
+        int: Number of puzzles written
+    """
+    buffer = generate_batch(task, deadline)
+    _stores[task[3]].write(task[-1], buffer, deadline)
+    return task[-2]
+
+def task_kind(args):
+    """Tasks with the same settings share latency statistics when racing."""
+    min_clues, difficulty, use_symmetry, grid_size, timeout, grade, count, start = args[0]
+    return grid_size, difficulty, min_clues, use_symmetry, grade, count
+
+def batch_sizes(count, grid_size, num_cores):
+    """Split count puzzles into batches, keeping at least one batch per core where possible."""
+    batch = max(1, min(BATCH_SIZES[grid_size], math.ceil(count / num_cores)))
+    return [min(batch, count - start) for start in range(0, count, batch)]
+
+def parse_puzzle_config(configs, grid_size, timeout=60, grade=False):
+    """Parse "difficulty:count[:clues]" entries into counts and clue targets per difficulty.
+
+    Clue counts left out are chosen by calibration.choose_clues; given ones
+    are rejected up front if they cannot be generated within the timeout.
+    """
     # Parse puzzle configurations
     puzzle_config = {'easy': [], 'medium': [], 'hard': []}
 
     # Handle the config to extract difficulty, count, and optional min_clues
-    for config in args.config:
+    for config in configs:
         parts = config.split(':')
         difficulty = parts[0]
         count = int(parts[1])
-        min_clues = int(parts[2]) if len(parts) == 3 else get_default_min_clues(difficulty, args.size)
-
-        # Validate minimum clues based on grid size
-        if min_clues < min_clues_threshold:
-            raise ValueError(
-                f"Error: For {args.size}x{args.size} grid, minimum clues must be at least {min_clues_threshold}. "
-                f"You provided {min_clues} for {difficulty}."
-            )
+        if difficulty not in puzzle_config:
+            raise ValueError(f"Unknown difficulty level: {difficulty}")
+        if len(parts) == 3:
+            min_clues = int(parts[2])
+            check_clues(grid_size, min_clues, timeout)
+        else:
+            min_clues = choose_clues(grid_size, difficulty, timeout, grade)
 
         puzzle_config[difficulty].append({'count': count, 'min_clues': min_clues})
+    return puzzle_config
 
-    # Prepare tasks for multiprocessing
-    tasks = []
-    for difficulty in ['easy', 'medium', 'hard']:
-        for config in puzzle_config[difficulty]:
-            for _ in range(config['count']):
-                tasks.append((config['min_clues'], difficulty, args.use_symmetry, args.size))
+# Main Function
+def main():
+    # Use the ArgumentParser class to parse arguments
+    args_parser = ArgumentParser()
+    args = args_parser.parse()
+
+    try:
+        if args.manifest:
+            books = load_manifest(args.manifest)
+        else:
+            books = [{'output': args.output, 'size': args.size, 'config': args.config,
+                      'symmetry': args.symmetry or args.use_symmetry, 'grade': args.grade,
+                      'timeout': args.timeout, 'gen_answers': args.gen_answers}]
+        # Reject infeasible clue counts before any worker starts
+        for book in books:
+            parse_puzzle_config(book['config'], book['size'], book['timeout'], book['grade'])
+    except ValueError as e:
+        args_parser.parser.error(str(e))
+    generate_books(books, coordinator=args.coordinator)
+
+def generate_books(books, coordinator=None, num_cores=None):
+    """Generate every book's puzzles through one shared worker pool and render each book once it is complete.
+
+    Args:
+        books (list): Book settings as returned by book_manifest.load_manifest
+        coordinator (str): HOST:PORT to serve the tasks to sudoku_worker.py
+            processes on instead of generating them locally
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from contextlib import ExitStack
+    from multiprocessing import cpu_count
+    from distributed import Coordinator, parse_address
+    from puzzle_store import SharedPuzzleStore
+    from racing import RacingExecutor
+
+    for book in books:
+        book['puzzle_config'] = parse_puzzle_config(book['config'], book['size'], book['timeout'], book['grade'])
 
     # Use multiprocessing to generate puzzles in parallel
-    num_cores = cpu_count()  # Get the number of CPU cores available
+    num_cores = num_cores or cpu_count()  # Get the number of CPU cores available
     print(f"Generating puzzles using {num_cores} CPU cores...")
 
+    # Prepare batched tasks for multiprocessing, each writing to its own slots
+    # of the store for its grid size
+    tasks = []
+    owners = []
+    capacity = {}
+    for number, book in enumerate(books):
+        size = book['size']
+        book['start'] = capacity.get(size, 0)
+        start = book['start']
+        for difficulty in ['easy', 'medium', 'hard']:
+            for config in book['puzzle_config'][difficulty]:
+                for count in batch_sizes(config['count'], size, num_cores):
+                    tasks.append((config['min_clues'], difficulty, book['symmetry'], size, book['timeout'],
+                                  book['grade'], count, start))
+                    owners.append(number)
+                    start += count
+        capacity[size] = start
+    remaining = [owners.count(number) for number in range(len(books))]
+
     # Check multiprocessing setup
     print(f"Number of tasks to process: {len(tasks)}")
-    with Pool(processes=num_cores) as pool:
-        puzzles_generated_flat = pool.map(generate_puzzle_task, tasks)
+    pdf_generators = {}
+    # Workers write puzzles straight into shared memory; only counts come back.
+    # Each task races independently seeded attempts, keeping the first to finish
+    with ExitStack() as stack:
+        stores = {size: stack.enter_context(SharedPuzzleStore(size, count)) for size, count in capacity.items()}
+        if coordinator:
+            # Hand the tasks to sudoku_worker.py processes instead, possibly on other machines
+            with Coordinator(tasks, parse_address(coordinator)) as server:
+                host, port = server.address
+                print(f"Waiting for workers on {host}:{port} (python sudoku_worker.py -coordinator HOST:{port})")
+                for task, buffer in zip(tasks, server.wait()):
+                    stores[task[3]].write(task[-1], buffer)
+            for book in books:
+                write_pdfs(book, pdf_generators, stores[book['size']])
+        else:
+            handles = {size: store.handle() for size, store in stores.items()}
+            # Books render on their own thread, so races keep being submitted meanwhile
+            renderer = stack.enter_context(ThreadPoolExecutor(max_workers=1))
+            renders = []
+            with RacingExecutor(processes=num_cores, initializer=init_worker, initargs=(handles,)) as racer:
+                for index, _ in racer.imap_unordered(generate_puzzle_task, [(task,) for task in tasks],
+                                                     key=task_kind):
+                    # Render each book as soon as its last task is in
+                    number = owners[index]
+                    remaining[number] -= 1
+                    if not remaining[number]:
+                        renders.append(renderer.submit(write_pdfs, books[number], pdf_generators,
+                                                       stores[books[number]['size']]))
+            for render in renders:
+                render.result()
+
+def write_pdfs(book, pdf_generators, store):
+    """Render a book's puzzles, copied out of shared memory as compact PuzzleRecords.
+
+    Args:
+        pdf_generators (dict): PDFGenerator per grid size, reused from book to book
+            and for the answers of each book
+    """
+    from pdf_generator import PDFGenerator
+
+    size = book['size']
+    pdf_generator = pdf_generators.get(size)
+    if pdf_generator is None:
+        pdf_generator = pdf_generators[size] = PDFGenerator(grid_size=size)
+    pdf_generator.reset()
 
     # Restructure the puzzles back into their difficulty groups
     puzzles_generated = {'easy': [], 'medium': [], 'hard': []}
-    index = 0
+    index = book['start']
     for difficulty in ['easy', 'medium', 'hard']:
-        for config in puzzle_config[difficulty]:
-            puzzles_generated[difficulty].extend(puzzles_generated_flat[index:index + config['count']])
+        for config in book['puzzle_config'][difficulty]:
+            puzzles_generated[difficulty].extend(store.records(index, config['count'], difficulty))
             index += config['count']
 
     # Generate and save puzzle PDFs
@@ -88,42 +233,15 @@ def main():
         if len(puzzles_generated[difficulty]) > 0:
             pdf_generator.generate_puzzles_pdf(puzzles_generated[difficulty], difficulty)
 
-    pdf_generator.save_pdf(args.output)
+    pdf_generator.save_pdf(book['output'])
 
-    # Generate answers PDF if requested
-    if args.gen_answers:
-        answers_pdf_generator = PDFGenerator(grid_size=args.size)
+    # Generate answers PDF if requested, with the same generator on a new document
+    if book.get('gen_answers'):
+        pdf_generator.reset()
         for difficulty in ['easy', 'medium', 'hard']:
             if len(puzzles_generated[difficulty]) > 0:
-                answers_pdf_generator.generate_puzzles_pdf(puzzles_generated[difficulty], difficulty, is_answer=True)
-        answers_pdf_generator.save_pdf(args.output.replace('.pdf', '_answers.pdf'))
-
-# --- Default Min Clues Based on Difficulty ---
-def get_default_min_clues(difficulty, grid_size):
-    """Get the default minimum clues for a given difficulty based on grid size."""
-    # Default clue counts for different grid sizes and difficulties
-    clue_counts = {
-        4: {  # 4x4 grid
-            'easy': 8,
-            'medium': 6,
-            'hard': 4
-        },
-        9: {  # 9x9 grid (traditional)
-            'easy': 40,
-            'medium': 35,
-            'hard': 30
-        },
-        16: {  # 16x16 grid
-            'easy': 170,
-            'medium': 140,
-            'hard': 40  # Minimum required for uniqueness
-        }
-    }
-
-    if difficulty not in ['easy', 'medium', 'hard']:
-        raise ValueError(f"Unknown difficulty level: {difficulty}")
-
-    return clue_counts[grid_size][difficulty]
+                pdf_generator.generate_puzzles_pdf(puzzles_generated[difficulty], difficulty, is_answer=True)
+        pdf_generator.save_pdf(book['output'].replace('.pdf', '_answers.pdf'))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Generation worker for multi-machine runs
+Description: Connects to a sudoku.py run started with -coordinator, generates the puzzle
+batches it hands out and streams them back. Several worker processes can run per machine;
+tasks of workers that die are handed to the others.
+"""
+
+import sys
+from multiprocessing import Process, cpu_count
+
+from argument_parser import WorkerArgumentParser
+from distributed import parse_address, run_worker
+from sudoku import generate_batch
+
+
+def worker_process(address, heartbeat):
+    completed = run_worker(address, generate_batch, heartbeat_interval=heartbeat)
+    print(f"Worker finished after {completed} tasks", file=sys.stderr)
+
+
+def main():
+    args = WorkerArgumentParser().parse()
+    address = parse_address(args.coordinator)
+    processes = [Process(target=worker_process, args=(address, args.heartbeat))
+                 for _ in range(args.processes or cpu_count())]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return 0 if all(process.exitcode == 0 for process in processes) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""SVG previews of single boards, laid out like PDFGenerator.add_sudoku_to_pdf without going through FPDF."""
+import hashlib
+
+from board_layout import BOX_LINE_WIDTH, CELL_FONT, CELL_FONT_SIZES, CELL_LINE_WIDTH, CELL_SIZES, format_cell_value
+from line_format import format_line
+
+# Millimetres per typographic point, for the PDF font sizes
+MM_PER_POINT = 25.4 / 72
+
+
+class SVGRenderer:
+    """Render boards as SVG with the cell sizes, fonts and line widths of the PDF books.
+
+    Everything but the digits is the same for every board of a grid size, so
+    the frame is built once per renderer and a board only adds its text.
+    """
+
+    def __init__(self, grid_size=9):
+        """Build the static frame for a given grid size.
+
+        Args:
+            grid_size (int): Size of the grid (4, 9, 16, or 25)
+        """
+        if grid_size not in (4, 9, 16, 25):
+            raise ValueError("Grid size must be 4, 9, 16, or 25")
+        self.grid_size = grid_size
+        self.box_size = int(grid_size ** 0.5)
+        self.cell_size = CELL_SIZES[grid_size]
+        self.cell_font_size = CELL_FONT_SIZES[grid_size]
+
+        width = grid_size * self.cell_size
+        # The bold box lines are centred on the grid's edge
+        margin = BOX_LINE_WIDTH / 2
+        thin = ''.join(f'M{i * self.cell_size} 0V{width}M0 {i * self.cell_size}H{width}'
+                       for i in range(grid_size + 1))
+        bold = ''.join(f'M{i * self.cell_size} 0V{width}M0 {i * self.cell_size}H{width}'
+                       for i in range(0, grid_size + 1, self.box_size))
+        self._head = (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width + 2 * margin:g}mm" height="{width + 2 * margin:g}mm" '
+            f'viewBox="{-margin:g} {-margin:g} {width + 2 * margin:g} {width + 2 * margin:g}">'
+            f'<rect x="0" y="0" width="{width}" height="{width}" fill="#fff"/>'
+            f'<path d="{thin}" stroke="#000" stroke-width="{CELL_LINE_WIDTH:g}" fill="none"/>'
+            f'<path d="{bold}" stroke="#000" stroke-width="{BOX_LINE_WIDTH:g}" fill="none" stroke-linecap="square"/>'
+            f'<g font-family="{CELL_FONT}, Arial, sans-serif" font-size="{self.cell_font_size * MM_PER_POINT:.3f}" '
+            f'text-anchor="middle" dominant-baseline="central">'
+        )
+        self._tail = '</g></svg>'
+        # Opening tag of the text of every cell, centred like FPDF's align='C'
+        half = self.cell_size / 2
+        self._cells = tuple(
+            f'<text x="{j * self.cell_size + half:g}" y="{i * self.cell_size + half:g}">'
+            for i in range(grid_size) for j in range(grid_size)
+        )
+
+    def render(self, board):
+        """Render a board as an SVG document.
+
+        Args:
+            board: 2D numpy array or list of rows, 0 for empty cells; values
+                above 9 may be ints or their letters
+
+        Returns:
+            str: The SVG document
+        """
+        parts = [self._head]
+        cells = iter(self._cells)
+        for row in board:
+            for value in row:
+                text = format_cell_value(value)
+                tag = next(cells)
+                if text:
+                    parts.append(f'{tag}{text}</text>')
+        parts.append(self._tail)
+        return ''.join(parts)
+
+
+def board_hash(values):
+    """Content hash of a flat board (0 = empty), the same for every spelling of it."""
+    return hashlib.sha1(format_line(values).encode('ascii')).hexdigest()
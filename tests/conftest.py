@@ -56,3 +56,16 @@ def partially_filled_9x9_grid():
         [0, 0, 0, 4, 1, 9, 0, 0, 5],
         [0, 0, 0, 0, 8, 0, 0, 7, 9]
     ])
+
+@pytest.fixture
+def open_25x25_line():
+    """Random 25x25 givens without conflicts that a search cannot settle quickly"""
+    return (
+        '.I.A.1...8...7..2.M...EK....MON......P.........I.8...53...D.......PJ.....67.7...H.J...L......51.....'
+        '....L.4...H....G.....B......N7.....M......1......K.81.......G..C.F...K4N....G...A7...1B..PL.........'
+        '.A.3.....B.7.2DI....8G5..........P.................P3..4M....EA.......I...........N...G.M.......1...'
+        '..B.NJ..K....I..5E.M.LH79.4......2.....O......8.5...8..........4..6G.9.3..A.D..1C....4...6..8.....A.'
+        '...I......E..9.6.O.....DJ...GC..O..........K...........P...1...L.....D...8..2...F..I..J.....N..1....'
+        '..........7.............L8...6.......1....MG.J......K...2........4IF.B....N........H..NM...D........'
+        '...E.........J.....O.....'
+    )
@@ -1,3 +1,5 @@
+from multiprocessing.pool import ThreadPool
+
 import pytest
 import numpy as np
 from advanced_sudoku_generator import AdvancedSudokuGenerator
@@ -80,6 +82,7 @@ class TestAdvancedSudokuGenerator:
         
         # Verify exact clue count
         assert np.count_nonzero(result) == exact_clues
+        assert advanced_generator_9x9.has_unique_solution(result)
 
     def test_generate_professional_sudoku_timeout(self, advanced_generator_9x9):
         """Test timeout handling in professional generation."""
@@ -141,3 +144,49 @@ class TestAdvancedSudokuGenerator:
         
         # Verify clue count
         assert np.count_nonzero(result) == 30
+
+    @pytest.mark.parametrize("mode,mirror", [
+        ("rotational", lambda r, c: (8 - r, 8 - c)),
+        ("mirror", lambda r, c: (r, 8 - c)),
+        ("diagonal", lambda r, c: (c, r)),
+    ])
+    def test_symmetric_generation_exact_and_unique(self, advanced_generator_9x9, mode, mirror):
+        """Test that every symmetry mode hits the exact clue count with a unique solution."""
+        puzzle, solution = advanced_generator_9x9.generate_professional_sudoku(min_clues=27, symmetry=mode)
+
+        assert np.count_nonzero(puzzle) == 27
+        assert advanced_generator_9x9.has_unique_solution(puzzle)
+        for r in range(9):
+            for c in range(9):
+                assert (puzzle[r][c] != 0) == (puzzle[mirror(r, c)] != 0)
+                assert puzzle[r][c] in (0, solution[r][c])
+
+    def test_symmetric_clue_count_parity(self):
+        """Test that impossible symmetric clue counts fail fast."""
+        generator = AdvancedSudokuGenerator(size=16)
+        with pytest.raises(ValueError):
+            generator.generate_professional_sudoku(min_clues=121, symmetry="rotational")
+        with pytest.raises(ValueError):
+            generator.generate_professional_sudoku(min_clues=120, symmetry="spiral")
+
+    def test_enforce_exact_clue_count_symmetric(self, advanced_generator_9x9, valid_9x9_grid):
+        """Test that symmetric enforcement keeps symmetry and uniqueness."""
+        advanced_generator_9x9.solution = valid_9x9_grid.copy()
+        result = advanced_generator_9x9.enforce_exact_clue_count(valid_9x9_grid.copy(), 31, symmetry=True)
+
+        assert np.count_nonzero(result) == 31
+        assert advanced_generator_9x9.has_unique_solution(result)
+        assert ((result != 0) == (result[::-1, ::-1] != 0)).all()
+
+    @pytest.mark.parametrize("threads", [0, 2])
+    def test_generate_sudoku(self, advanced_generator_9x9, threads):
+        """Test the base class generate_sudoku through the override, with and without a pool."""
+        if threads:
+            with ThreadPool(threads) as pool:
+                puzzle, solution = advanced_generator_9x9.generate_sudoku(min_clues=30, pool=pool)
+        else:
+            puzzle, solution = advanced_generator_9x9.generate_sudoku(min_clues=30)
+
+        assert np.count_nonzero(puzzle) == 30
+        assert advanced_generator_9x9.has_unique_solution(puzzle)
+        assert ((puzzle == 0) | (puzzle == solution)).all()
@@ -0,0 +1,111 @@
+import pytest
+import numpy as np
+from bitmask_solver import BitmaskSolver, SearchLimitReached
+from line_format import parse_line, format_line
+
+
+class TestBitmaskSolver:
+    def test_initialization_invalid_size(self):
+        """Test that unsupported grid sizes raise ValueError."""
+        with pytest.raises(ValueError):
+            BitmaskSolver(size=6)
+
+    def test_lookup_tables_shared(self):
+        """Test that solvers of one grid size share their lookup tables."""
+        first, second = BitmaskSolver(16), BitmaskSolver(16)
+        assert first.peers is second.peers
+        assert first.units is second.units
+        assert len(first.peers[0]) == 3 * 15 - 6
+
+    def test_solve_unique(self, partially_filled_9x9_grid, valid_9x9_grid):
+        """Test solving a puzzle with a unique solution."""
+        solver = BitmaskSolver(9)
+        count, solution = solver.solve(partially_filled_9x9_grid.flatten().tolist())
+        assert count == 1
+        assert solution == valid_9x9_grid.flatten().tolist()
+
+    def test_solve_multiple(self):
+        """Test that an almost empty board stops counting at the limit."""
+        values = [0] * 81
+        values[0] = 1
+        count, solution = BitmaskSolver(9).solve(values, limit=2)
+        assert count == 2
+        assert solution[0] == 1
+
+    def test_solve_conflicting_givens(self):
+        """Test that boards with duplicate givens are reported unsolvable."""
+        values = [0] * 81
+        values[0] = values[1] = 5
+        assert BitmaskSolver(9).solve(values) == (0, None)
+
+    def test_solve_unsolvable_without_direct_conflict(self):
+        """Test a board whose givens agree but leave two cells needing the same symbol."""
+        _, values = parse_line("12.." "..3." "...3" "....")
+        assert BitmaskSolver(4).solve(values) == (0, None)
+
+    @pytest.mark.parametrize("size", [4, 9, 16, 25])
+    def test_fill_produces_valid_grid(self, size):
+        """Test random filling for all supported sizes."""
+        solver = BitmaskSolver(size)
+        grid = np.array(solver.fill([0] * size * size)).reshape(size, size)
+        box = solver.box_size
+        expected = set(range(1, size + 1))
+        for i in range(size):
+            assert set(grid[i, :]) == expected
+            assert set(grid[:, i]) == expected
+            r, c = (i // box) * box, (i % box) * box
+            assert set(grid[r:r + box, c:c + box].flatten()) == expected
+
+    def test_run_is_resumable(self):
+        """Test that a search run in small node slices matches a single run."""
+        _, values = parse_line("8........" "..36....." ".7..9.2.." ".5...7..." "....457.."
+                               "...1...3." "..1....68" "..85...1." ".9....4..")
+        solver = BitmaskSolver(9)
+        expected = solver.solve(values)
+
+        assert solver.load(values)
+        slices = 1
+        while not solver.run(limit=2, max_nodes=5):
+            slices += 1
+        assert slices > 1
+        assert (solver.count, solver.solution) == expected
+
+    def test_node_budget(self):
+        """Test that exceeding the node budget raises SearchLimitReached."""
+        with pytest.raises(SearchLimitReached):
+            BitmaskSolver(9).solve([0] * 81, limit=2, max_nodes=0)
+
+    def test_is_forced(self, valid_9x9_grid):
+        """Test detecting clues forced back by naked and hidden singles."""
+        solver = BitmaskSolver(9)
+        values = valid_9x9_grid.flatten().tolist()
+        values[0] = 0
+        assert solver.is_forced(values, 0, 5)  # naked single
+        assert not solver.is_forced([0] * 81, 0, 5)
+        # Hidden single: the 5s block every other cell of row 0, not cell 0 itself
+        hidden = [0] * 81
+        for row, col in ((3, 1), (6, 2), (1, 4), (2, 7)):
+            hidden[row * 9 + col] = 5
+        assert solver.is_forced(hidden, 0, 5)
+
+
+class TestLineFormat:
+    def test_round_trip(self, partially_filled_9x9_grid):
+        """Test that formatting and parsing a board line are inverses."""
+        values = partially_filled_9x9_grid.flatten().tolist()
+        line = format_line(values)
+        assert len(line) == 81
+        assert parse_line(line) == (9, values)
+
+    def test_parse_accepts_zero_and_letters(self):
+        """Test empty-cell and letter symbols for 16x16 boards."""
+        size, values = parse_line("0" * 255 + "g")
+        assert size == 16
+        assert values[-1] == 16
+        assert values[0] == 0
+
+    @pytest.mark.parametrize("line", ["123", "1" * 80, "x" * 81, "G" * 81])
+    def test_parse_rejects_bad_lines(self, line):
+        """Test that malformed lines raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_line(line)
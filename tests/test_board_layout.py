@@ -0,0 +1,20 @@
+import numpy as np
+
+from board_layout import CELL_SIZES, format_cell_value
+from pdf_generator import PDFGenerator
+from svg_renderer import SVGRenderer
+
+
+class TestBoardLayout:
+    def test_format_cell_value(self):
+        """Test that empty cells are blank and values above 9 are letters, whichever way they are given."""
+        assert format_cell_value(0) == ''
+        assert format_cell_value(7) == '7'
+        assert format_cell_value(np.uint8(10)) == 'A'
+        assert format_cell_value(25) == 'P'
+        assert format_cell_value('G') == 'G'
+
+    def test_renderers_share_layout(self):
+        """Test that the PDF books and the SVG previews use the same cell sizes."""
+        for size, cell_size in CELL_SIZES.items():
+            assert PDFGenerator(size).cell_size == SVGRenderer(size).cell_size == cell_size
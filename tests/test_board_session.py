@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+from board_session import BoardSession
+from line_format import format_line, parse_line
+
+
+@pytest.fixture
+def session(partially_filled_9x9_grid):
+    return BoardSession(9, partially_filled_9x9_grid.flatten().tolist())
+
+
+class TestBoardSession:
+    def test_candidates_follow_moves(self, session):
+        """Test that placing and erasing a value updates the candidates of its peers."""
+        assert session.candidates[2] == 0b000001011  # 1, 2 or 4
+        session.place(2, 4)
+        assert not session.candidates[10] & 0b1000
+        session.erase(2)
+        assert session.candidates[2] == 0b000001011
+        assert session.candidates[10] & 0b1000
+
+    def test_conflicts(self, session):
+        """Test that duplicates are reported in every unit until one of them is erased."""
+        session.place(2, 5)  # 5 is given in the same row and box
+        assert session.conflicts() == [0, 2]
+        assert not session.is_solvable()
+        session.place(2, 4)
+        assert session.conflicts() == []
+        assert session.is_solvable()
+
+    def test_wrong_entry_is_not_solvable(self, session, valid_9x9_grid):
+        """Test that an entry without conflicts that differs from the solution makes the board unsolvable."""
+        session.place(2, 1)
+        assert valid_9x9_grid[0, 2] == 4
+        assert not session.conflicts()
+        assert not session.is_solvable()
+
+    def test_hints_solve_the_puzzle(self, session, valid_9x9_grid):
+        """Test that following the hints fills in the solution."""
+        while not session.is_complete():
+            step = session.next_step()
+            assert step['technique'] in ('naked_single', 'hidden_single', 'solution')
+            session.place(step['cell'], step['value'])
+        assert session.values == valid_9x9_grid.flatten().tolist()
+        assert session.next_step() is None
+
+    def test_hint_points_at_wrong_entry(self, session, valid_9x9_grid):
+        """Test that a wrong entry without conflicts gets a hint to erase it rather than one building on it."""
+        cell = next(cell for cell, value in enumerate(session.values) if not value)
+        wrong = next(value for value in range(1, 10)
+                     if session.candidates[cell] & 1 << (value - 1) and value != valid_9x9_grid.flat[cell])
+        session.place(cell, wrong)
+        assert not session.conflicts()
+        assert session.next_step() == {'cell': cell, 'value': 0, 'technique': 'wrong_entry'}
+        session.erase(cell)
+        step = session.next_step()
+        assert step['value'] == valid_9x9_grid.flat[step['cell']]
+
+    def test_no_hint_on_unsolvable_board(self):
+        """Test that a board without a unique solution gets no single once its entries rule out every solution."""
+        session = BoardSession(4, [0] * 16)
+        for cell, value in ((0, 4), (4, 1), (10, 1), (13, 3)):
+            session.place(cell, value)
+        assert not session.conflicts()
+        assert any(mask and not mask & (mask - 1) for mask in session.candidates)  # a naked single
+        assert not session.is_solvable()
+        assert session.next_step() is None
+
+    def test_state_round_trip(self, session):
+        """Test that a session restored from its state has the same givens and entries."""
+        session.place(2, 4)
+        session.place(3, 6)
+        restored = BoardSession.from_state(session.state())
+        assert restored.values == session.values
+        assert restored.givens == session.givens
+        assert restored.candidates == session.candidates
+
+    def test_givens_cannot_change(self, session):
+        """Test that givens cannot be overwritten or erased."""
+        with pytest.raises(ValueError):
+            session.place(0, 1)
+        with pytest.raises(ValueError):
+            session.erase(0)
+        with pytest.raises(ValueError):
+            BoardSession.from_state(format_line(session.givens))
+
+    def test_puzzle_without_unique_solution(self):
+        """Test that solvability falls back to a search when the puzzle has several solutions."""
+        session = BoardSession(4, [0] * 16)
+        session.place(0, 1)
+        session.place(5, 1)  # same box
+        assert not session.is_solvable()
+        session.erase(5)
+        session.place(5, 3)
+        assert session.is_solvable()
+        assert session.next_step() is None  # no single and no unique solution to take a value from
+
+    def test_open_board_is_rejected_quickly(self, open_25x25_line):
+        """Test that the node budget of a 25x25 board stops the search well within a request."""
+        start = time.perf_counter()
+        with pytest.raises(ValueError, match="too open"):
+            BoardSession(*parse_line(open_25x25_line))
+        assert time.perf_counter() - start < 10
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from book_cache import BookCache
+from puzzle_record import PuzzleRecord
+
+
+@pytest.fixture
+def records(partially_filled_9x9_grid, valid_9x9_grid):
+    return [PuzzleRecord.from_pair(partially_filled_9x9_grid, valid_9x9_grid),
+            PuzzleRecord.from_pair(valid_9x9_grid, valid_9x9_grid)]
+
+
+class TestBookCache:
+    def test_put_and_read_back(self, tmp_path, records):
+        """Test that a batch is keyed by its contents and read back as records."""
+        cache = BookCache(str(tmp_path))
+        book_id = cache.put(records, 'easy')
+        assert cache.put(records, 'easy') == book_id
+        assert cache.put(records[:1], 'easy') != book_id
+        difficulty, restored = cache.records(book_id)
+        assert difficulty == 'easy'
+        assert [record.data for record in restored] == [record.data for record in records]
+        assert restored[0].difficulty == 'easy'
+        assert cache.records('0' * 40) is None
+
+    def test_pdfs_rendered_from_batch(self, tmp_path, records):
+        """Test that the book and its answers are rendered once and served from disk afterwards."""
+        cache = BookCache(str(tmp_path))
+        book_id = cache.put(records, 'medium')
+        book = cache.pdf(book_id)
+        answers = cache.pdf(book_id, answers=True)
+        assert open(book, 'rb').read().startswith(b'%PDF')
+        assert os.path.getsize(answers) < os.path.getsize(book)
+        assert cache.pdf(book_id) == book
+        assert cache.pdf('f' * 40) is None
+        with pytest.raises(ValueError):
+            cache.pdf('../../etc/passwd')
+
+    def test_eviction_keeps_batches(self, tmp_path, records):
+        """Test that PDFs are evicted before batches, so books can still be rendered again."""
+        cache = BookCache(str(tmp_path))
+        first = cache.put(records, 'easy')
+        second = cache.put(records[:1], 'easy')
+        cache.pdf(first)
+        cache.max_bytes = os.path.getsize(cache.pdf(first)) + 1000
+        cache.pdf(second)
+        assert not os.path.exists(os.path.join(str(tmp_path), first + '.pdf'))
+        assert cache.records(first) is not None
+        assert cache.pdf(first).endswith(first + '.pdf')
+
+    def test_open_survives_eviction(self, tmp_path, records):
+        """Test that an opened PDF stays readable when evicted, and that a missing one is rendered again."""
+        cache = BookCache(str(tmp_path))
+        book_id = cache.put(records, 'easy')
+        with cache.open(book_id) as f:
+            data = f.read()
+        with cache.open(book_id) as f:
+            os.remove(cache.pdf(book_id))
+            assert f.read() == data
+        with cache.open(book_id) as f:
+            assert f.read() == data
+        assert cache.open('0' * 40) is None
@@ -0,0 +1,108 @@
+import json
+import threading
+
+import pytest
+
+import sudoku
+from book_manifest import load_manifest, parse_manifest
+
+TOML_MANIFEST = """
+[[books]]
+output = "easy.pdf"
+config = ["easy:2"]
+
+[[books]]
+output = "giant.pdf"
+size = 16
+config = ["hard:1"]
+symmetry = "mirror"
+timeout = 120
+"""
+
+
+class TestBookManifest:
+    def test_load_toml(self, tmp_path):
+        """Test that TOML books are read with defaults filled in."""
+        path = tmp_path / "books.toml"
+        path.write_text(TOML_MANIFEST)
+        books = load_manifest(str(path))
+        assert books == [
+            {'output': 'easy.pdf', 'size': 9, 'config': ['easy:2'], 'symmetry': False, 'grade': False, 'timeout': 60,
+             'gen_answers': False},
+            {'output': 'giant.pdf', 'size': 16, 'config': ['hard:1'], 'symmetry': 'mirror', 'grade': False,
+             'timeout': 120, 'gen_answers': False},
+        ]
+
+    def test_load_json(self, tmp_path):
+        """Test that JSON manifests are read the same way."""
+        path = tmp_path / "books.json"
+        path.write_text(json.dumps({'books': [{'output': 'a.pdf', 'size': 4, 'config': ['easy:1'], 'grade': True}]}))
+        assert load_manifest(str(path))[0] == {
+            'output': 'a.pdf', 'size': 4, 'config': ['easy:1'], 'symmetry': False, 'grade': True, 'timeout': 60,
+            'gen_answers': False
+        }
+
+    @pytest.mark.parametrize("books", [
+        [],
+        [{'config': ['easy:1']}],
+        [{'output': 'a.pdf'}],
+        [{'output': 'a.pdf', 'config': ['easy:1'], 'size': 12}],
+        [{'output': 'a.pdf', 'config': ['easy:1'], 'symmetry': 'spiral'}],
+        [{'output': 'a.pdf', 'config': ['easy:1'], 'pages': 3}],
+        [{'output': 'a.pdf', 'config': ['easy:1']}, {'output': 'a.pdf', 'config': ['hard:1']}],
+    ])
+    def test_invalid_manifests(self, books):
+        """Test that malformed books are rejected."""
+        with pytest.raises(ValueError):
+            parse_manifest({'books': books})
+
+    def test_unknown_extension(self, tmp_path):
+        """Test that only .json and .toml manifests are accepted."""
+        with pytest.raises(ValueError):
+            load_manifest(str(tmp_path / "books.yaml"))
+
+    def test_generate_books(self, tmp_path):
+        """Test that books of different sizes are generated in one run and each is written."""
+        books = parse_manifest({'books': [
+            {'output': str(tmp_path / "four.pdf"), 'size': 4, 'config': ['easy:3', 'hard:2'], 'gen_answers': True},
+            {'output': str(tmp_path / "nine.pdf"), 'config': ['easy:2']},
+            {'output': str(tmp_path / "four-again.pdf"), 'size': 4, 'config': ['medium:1']},
+        ]})
+        sudoku.generate_books(books, num_cores=2)
+        for name in ("four.pdf", "four_answers.pdf", "nine.pdf", "four-again.pdf"):
+            assert (tmp_path / name).read_bytes().startswith(b'%PDF')
+        assert not (tmp_path / "nine_answers.pdf").exists()
+        assert (books[0]['start'], books[2]['start']) == (0, 5)
+
+    def test_generators_reused(self, tmp_path, monkeypatch):
+        """Test that one PDFGenerator per grid size renders every book and its answers."""
+        import pdf_generator
+        sizes = []
+
+        class CountingGenerator(pdf_generator.PDFGenerator):
+            def __init__(self, grid_size=9):
+                sizes.append(grid_size)
+                super().__init__(grid_size=grid_size)
+
+        monkeypatch.setattr(pdf_generator, 'PDFGenerator', CountingGenerator)
+        books = parse_manifest({'books': [
+            {'output': str(tmp_path / f"four-{n}.pdf"), 'size': 4, 'config': ['easy:1'], 'gen_answers': True}
+            for n in range(2)
+        ]})
+        sudoku.generate_books(books, num_cores=2)
+        assert sizes == [4]
+        assert (tmp_path / "four-1_answers.pdf").read_bytes() != (tmp_path / "four-1.pdf").read_bytes()
+
+    def test_render_does_not_block_generation(self, tmp_path, monkeypatch):
+        """Test that books render off the thread submitting races, and that render errors still surface."""
+        threads = []
+
+        def failing_write(book, pdf_generators, store):
+            threads.append(threading.current_thread())
+            raise OSError("Disk full")
+
+        monkeypatch.setattr(sudoku, 'write_pdfs', failing_write)
+        books = parse_manifest({'books': [{'output': str(tmp_path / "four.pdf"), 'size': 4, 'config': ['easy:1']}]})
+        with pytest.raises(OSError, match="Disk full"):
+            sudoku.generate_books(books, num_cores=2)
+        assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,65 @@
+import math
+
+import pytest
+
+import calibration
+import sudoku
+from calibration import CLUE_TARGETS, check_clues, choose_clues, expected_seconds, feasible_clues
+
+
+def entry(size, clues, runs, successes, seconds, ratings):
+    return {'size': size, 'clues': clues, 'runs': runs, 'successes': successes, 'seconds': seconds,
+            'timeout': 10, 'ratings': ratings}
+
+
+@pytest.fixture
+def table(monkeypatch):
+    measurements = [
+        entry(9, 17, 4, 0, 10.0, {}),
+        entry(9, 22, 4, 2, 3.0, {'hard': 1, 'expert': 1}),
+        entry(9, 26, 4, 4, 0.5, {'medium': 2, 'hard': 2}),
+        entry(9, 30, 4, 4, 0.1, {'easy': 2, 'medium': 2}),
+    ]
+    monkeypatch.setattr(calibration, '_table', {(item['size'], item['clues']): item for item in measurements})
+
+
+class TestCalibration:
+    def test_expected_seconds(self, table):
+        """Test that costs come from the nearest calibrated count at or below the request."""
+        assert expected_seconds(9, 22) == pytest.approx(6.0)
+        assert expected_seconds(9, 25) == pytest.approx(6.0)
+        assert expected_seconds(9, 17) == math.inf
+        assert expected_seconds(9, 16) == math.inf
+        assert expected_seconds(9, 30, 'easy') == pytest.approx(0.2)
+        assert expected_seconds(9, 22, 'hard') == pytest.approx(6.0)  # expert counts as hard
+
+    def test_check_clues(self, table):
+        """Test that clue counts below the lowest feasible one for the timeout are rejected."""
+        assert feasible_clues(9, 60) == 22
+        assert feasible_clues(9, 1) == 26
+        check_clues(9, 24, 60)
+        with pytest.raises(ValueError, match="at least 26"):
+            check_clues(9, 24, 1)
+        with pytest.raises(ValueError):
+            check_clues(9, 82, 60)
+
+    def test_choose_clues(self, table):
+        """Test that graded difficulties get the cheapest count producing them, ungraded ones the target."""
+        assert choose_clues(9, 'hard', 60) == CLUE_TARGETS[9]['hard']
+        assert choose_clues(9, 'hard', 60, grade=True) == 26
+        assert choose_clues(9, 'easy', 60, grade=True) == 30
+        assert choose_clues(9, 'hard', 0.5, grade=True) == CLUE_TARGETS[9]['hard']
+
+    def test_puzzle_config_rejects_infeasible(self, table):
+        """Test that sudoku.py rejects infeasible clue counts up front and fills in calibrated ones."""
+        with pytest.raises(ValueError):
+            sudoku.parse_puzzle_config(['hard:5:17'], 9)
+        config = sudoku.parse_puzzle_config(['hard:5', 'easy:1:26'], 9, grade=True)
+        assert config['hard'] == [{'count': 5, 'min_clues': 26}]
+        assert config['easy'] == [{'count': 1, 'min_clues': 26}]
+
+    def test_targets_are_feasible(self):
+        """Test that the shipped measurements cover every clue target within the default timeout."""
+        for size, targets in CLUE_TARGETS.items():
+            for clues in targets.values():
+                check_clues(size, clues, 60)
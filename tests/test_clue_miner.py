@@ -0,0 +1,41 @@
+import random
+import pytest
+from bitmask_solver import BitmaskSolver
+from clue_miner import ClueMiner
+from deadline import Deadline
+from solved_grid_generator import SolvedGridGenerator
+
+
+def random_solution(size, seed):
+    return SolvedGridGenerator(size, rng=random.Random(seed)).generate()
+
+
+class TestClueMiner:
+    def test_reduce_reaches_low_target(self):
+        """Test mining a full 9x9 grid down to 24 clues with a unique solution."""
+        solution = random_solution(9, 3)
+        miner = ClueMiner(9, rng=random.Random(3), time_budget=10)
+        puzzle = miner.reduce(solution, 24, solution)
+        assert sum(1 for value in puzzle if value) == 24
+        assert BitmaskSolver(9).solve(puzzle) == (1, solution)
+
+    def test_reduce_never_goes_below_target(self):
+        """Test that the miner stops exactly at the target."""
+        solution = random_solution(9, 5)
+        puzzle = ClueMiner(9, rng=random.Random(5)).reduce(solution, 60)
+        assert sum(1 for value in puzzle if value) == 60
+        assert all(value in (0, solution[cell]) for cell, value in enumerate(puzzle))
+
+    def test_time_budget_returns_best_effort(self):
+        """Test that an unreachable target returns the best unique puzzle found."""
+        solution = random_solution(9, 11)
+        miner = ClueMiner(9, rng=random.Random(11), time_budget=0.2)
+        puzzle = miner.reduce(solution, 10, solution)
+        assert sum(1 for value in puzzle if value) > 10
+        assert BitmaskSolver(9).has_unique_solution(puzzle)
+
+    def test_reduce_honours_deadline(self):
+        """Test that an expired deadline stops mining."""
+        solution = random_solution(9, 1)
+        with pytest.raises(TimeoutError):
+            ClueMiner(9).reduce(solution, 24, solution, deadline=Deadline(0))
@@ -0,0 +1,67 @@
+import threading
+import time
+import pytest
+import numpy as np
+from deadline import Deadline, FileFlag, SearchCancelled, as_deadline
+from puzzle_generator import PuzzleGenerator
+from advanced_sudoku_generator import AdvancedSudokuGenerator
+
+
+class TestDeadline:
+    def test_no_limit(self):
+        """Test that a deadline without timeout never expires on its own."""
+        deadline = Deadline()
+        deadline.check()
+        assert not deadline.expired()
+        assert deadline.remaining() is None
+
+    def test_expires(self):
+        """Test that check raises TimeoutError once the time is up."""
+        deadline = Deadline(0)
+        assert deadline.expired()
+        with pytest.raises(TimeoutError, match="timed out"):
+            deadline.check()
+
+    def test_cancel(self):
+        """Test that cancellation raises SearchCancelled, a TimeoutError."""
+        deadline = Deadline(60)
+        deadline.cancel()
+        with pytest.raises(SearchCancelled):
+            deadline.check()
+        assert issubclass(SearchCancelled, TimeoutError)
+
+    def test_file_flag(self, tmp_path):
+        """Test that a deadline on a file flag is cancelled through another flag on the same file."""
+        path = str(tmp_path / 'job.cancel')
+        deadline = Deadline(60, event=FileFlag(path))
+        deadline.check()
+        FileFlag(path).set()
+        with pytest.raises(SearchCancelled):
+            deadline.check()
+        deadline.event.clear()
+        deadline.event.clear()
+        assert not deadline.cancelled
+
+    def test_as_deadline_from_legacy_arguments(self):
+        """Test conversion of start_time/timeout pairs."""
+        assert as_deadline().remaining() is None
+        assert as_deadline(start_time=time.time() - 10, timeout=5).expired()
+        deadline = Deadline(1)
+        assert as_deadline(deadline, time.time(), 100) is deadline
+
+    def test_cancel_search_from_another_thread(self):
+        """Test that a search which would never finish stops when cancelled."""
+        generator = PuzzleGenerator(size=16)
+        grid = np.zeros((16, 16), dtype=object)
+        deadline = Deadline()
+        threading.Timer(0.2, deadline.cancel).start()
+        with pytest.raises(SearchCancelled):
+            generator.count_solutions(grid, limit=10 ** 9, deadline=deadline)
+
+    def test_professional_generation_honours_deadline(self):
+        """Test that a deadline interrupts filling and removal in the advanced generator."""
+        generator = AdvancedSudokuGenerator(size=25)
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            generator.generate_professional_sudoku(min_clues=350, timeout=0.05)
+        assert time.monotonic() - start < 5
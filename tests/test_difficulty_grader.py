@@ -0,0 +1,67 @@
+import time
+import pytest
+import numpy as np
+from bitmask_solver import BitmaskSolver
+from calibration import choose_clues
+from difficulty_grader import DifficultyGrader
+from line_format import parse_line
+
+PUZZLES = {
+    'easy': '.5964..2..6......1........5..43...7......8.1....459.....1.2...3....14.9.7...8.1..',
+    'medium': '.9.24....7....9....56..792...37...8...........14.35......1.87.3........53.7...4..',
+    'hard': '7..2..8...824.............9.....17.....8.3.....9.7.4.3.15...2........3.44.79..61.',
+    'expert': '2.5.976...9.2.....4....53...7....93.....8.21...61.....3.....19.........5.69...7..',
+}
+
+
+@pytest.fixture
+def grader():
+    return DifficultyGrader(9)
+
+
+class TestDifficultyGrader:
+    @pytest.mark.parametrize("rating", list(PUZZLES))
+    def test_rates_puzzles(self, grader, rating):
+        """Test that sample puzzles get the rating of the hardest technique they need."""
+        assert grader.rate(parse_line(PUZZLES[rating])[1]) == rating
+
+    @pytest.mark.parametrize("rating", ['easy', 'medium', 'hard'])
+    def test_logical_solution_matches_search(self, grader, rating):
+        """Test that every deduction agrees with the solution found by search."""
+        values = parse_line(PUZZLES[rating])[1]
+        grader.grade(values)
+        assert grader.values == BitmaskSolver(9).solve(values)[1]
+
+    def test_early_exit(self, grader):
+        """Test that grading stops at the first technique above the limit."""
+        values = parse_line(PUZZLES['expert'])[1]
+        full_score = grader.grade(values)[1]
+        rating, score = grader.grade(values, max_rating='easy')
+        assert rating == 'medium'
+        assert score < full_score
+
+    def test_accepts(self, grader):
+        """Test accepting only puzzles rated at the requested difficulty."""
+        assert grader.accepts(parse_line(PUZZLES['easy'])[1], 'easy')
+        assert not grader.accepts(parse_line(PUZZLES['medium'])[1], 'easy')
+        assert not grader.accepts(parse_line(PUZZLES['easy'])[1], 'medium')
+        assert grader.accepts(parse_line(PUZZLES['expert'])[1], 'hard')
+
+    def test_contradiction_raises(self, grader):
+        """Test that a puzzle without a solution is reported."""
+        with pytest.raises(ValueError):
+            grader.grade([1, 2, 3, 4, 5, 6, 7, 8, 0] + [0] * 8 + [9] + [0] * 63)
+
+    def test_grading_speed(self, grader):
+        """Test that grading a 9x9 puzzle stays around a millisecond."""
+        puzzles = [parse_line(line)[1] for line in PUZZLES.values()] * 25
+        start = time.perf_counter()
+        for values in puzzles:
+            grader.grade(values, max_rating='medium')
+        assert (time.perf_counter() - start) / len(puzzles) < 0.005
+
+    def test_graded_generation(self, advanced_generator_9x9):
+        """Test that graded generation only returns puzzles of the requested rating."""
+        puzzle, _ = advanced_generator_9x9.generate_professional_sudoku(required_difficulty='easy', grade=True)
+        assert advanced_generator_9x9.grader.rate(puzzle.flatten().tolist()) == 'easy'
+        assert np.count_nonzero(puzzle) == choose_clues(9, 'easy', 60, grade=True)
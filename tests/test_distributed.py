@@ -0,0 +1,107 @@
+import json
+import socket
+import time
+from multiprocessing import Process
+
+import pytest
+
+from distributed import Coordinator, parse_address, run_worker
+
+
+def echo(task):
+    """Task function returning its input as bytes after a short delay."""
+    time.sleep(0.01)
+    return bytes(task)
+
+
+def reject(task):
+    raise ValueError("Bad task")
+
+
+def start_workers(address, count, func=echo):
+    workers = [Process(target=run_worker, args=(address, func), kwargs={'heartbeat_interval': 0.05})
+               for _ in range(count)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def join(workers):
+    for worker in workers:
+        worker.join(10)
+    assert all(worker.exitcode == 0 for worker in workers)
+
+
+class FakeWorker:
+    """Hand-driven worker connection for protocol tests."""
+
+    def __init__(self, address):
+        self.sock = socket.create_connection(address)
+        self.rfile = self.sock.makefile('rb')
+
+    def send(self, message):
+        self.sock.sendall((json.dumps(message) + '\n').encode())
+
+    def take_task(self):
+        self.send({'type': 'ready'})
+        return json.loads(self.rfile.readline())
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+
+class TestDistributed:
+    def test_parse_address(self):
+        """Test parsing of host:port addresses."""
+        assert parse_address("render-node:7700") == ("render-node", 7700)
+        with pytest.raises(ValueError):
+            parse_address("render-node")
+
+    def test_workers_complete_all_tasks(self):
+        """Test that several worker processes on localhost produce every result in task order."""
+        tasks = [(i, i + 1) for i in range(20)]
+        with Coordinator(tasks, heartbeat_timeout=1.0) as coordinator:
+            workers = start_workers(coordinator.address, 3)
+            assert coordinator.wait(timeout=10) == [bytes(task) for task in tasks]
+        join(workers)
+
+    def test_disconnected_worker_tasks_are_reassigned(self):
+        """Test that tasks of a worker whose connection drops go to another worker."""
+        with Coordinator([(1,), (2,)]) as coordinator:
+            fake = FakeWorker(coordinator.address)
+            assert fake.take_task()['id'] == 0
+            fake.close()
+            workers = start_workers(coordinator.address, 1)
+            assert coordinator.wait(timeout=10) == [b'\x01', b'\x02']
+        join(workers)
+
+    def test_silent_worker_tasks_are_reassigned(self):
+        """Test that a worker missing its heartbeats loses its task."""
+        with Coordinator([(1,), (2,)], heartbeat_timeout=0.3) as coordinator:
+            fake = FakeWorker(coordinator.address)
+            assert fake.take_task()['id'] == 0
+            workers = start_workers(coordinator.address, 1)
+            assert coordinator.wait(timeout=10) == [b'\x01', b'\x02']
+            fake.close()
+        join(workers)
+
+    def test_duplicate_results_keep_the_first(self):
+        """Test that a task completed twice keeps its first result."""
+        with Coordinator([(1,)]) as coordinator:
+            fake = FakeWorker(coordinator.address)
+            task = fake.take_task()
+            assert task['task'] == [1] and isinstance(task['seed'], int)
+            fake.send({'type': 'result', 'id': 0, 'data': 'Zmlyc3Q='})
+            fake.send({'type': 'result', 'id': 0, 'data': 'c2Vjb25k'})
+            assert coordinator.wait(timeout=10) == [b'first']
+            assert fake.take_task() == {'type': 'done'}
+            fake.close()
+
+    def test_failing_task(self):
+        """Test that a task failing max_failures times fails the run."""
+        with Coordinator([(1,)], max_failures=2) as coordinator:
+            workers = start_workers(coordinator.address, 1, func=reject)
+            with pytest.raises(RuntimeError, match="Bad task"):
+                coordinator.wait(timeout=10)
+        join(workers)
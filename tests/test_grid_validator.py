@@ -0,0 +1,57 @@
+import pytest
+import numpy as np
+from grid_validator import UNIT_KINDS, find_violations, validate_grids
+
+
+class TestValidateGrids:
+    def test_valid_complete_grid(self, valid_9x9_grid):
+        """Test a single solved grid."""
+        valid, complete = validate_grids(valid_9x9_grid)
+        assert valid.tolist() == [True]
+        assert complete.tolist() == [True]
+
+    def test_batch_mixed(self, valid_9x9_grid, partially_filled_9x9_grid):
+        """Test a batch mixing solved, partial and conflicting grids."""
+        broken = valid_9x9_grid.copy()
+        broken[0, 0], broken[0, 1] = broken[0, 1], broken[0, 0]  # Breaks two columns
+        box_only = partially_filled_9x9_grid.copy()
+        box_only[1, 1] = 8  # Duplicate of the 8 at (2, 2) in the same box only
+
+        valid, complete = validate_grids(np.stack([valid_9x9_grid, partially_filled_9x9_grid, broken, box_only]))
+        assert valid.tolist() == [True, True, False, False]
+        assert complete.tolist() == [True, False, True, False]
+
+    def test_out_of_range_symbols(self, valid_4x4_grid):
+        """Test that symbols outside 0..N make a grid invalid."""
+        grid = valid_4x4_grid.copy()
+        grid[0, 0] = 5
+        assert validate_grids(grid)[0].tolist() == [False]
+
+    def test_rejects_non_square_batches(self):
+        """Test that malformed shapes raise ValueError."""
+        with pytest.raises(ValueError):
+            validate_grids(np.zeros((2, 6, 6), dtype=int))
+
+
+class TestFindViolations:
+    def test_reports_violating_units(self, valid_9x9_grid):
+        """Test the mask and violation indices for a batch of completed grids."""
+        swapped = valid_9x9_grid.copy()
+        swapped[0, 0], swapped[0, 1] = swapped[0, 1], swapped[0, 0]
+        empty_cell = valid_9x9_grid.copy()
+        empty_cell[8, 8] = 0
+
+        ok, violations = find_violations(np.stack([valid_9x9_grid, swapped, empty_cell]))
+        assert ok.tolist() == [True, False, False]
+        # Swapping within a row and box only breaks columns 0 and 1
+        assert violations[violations[:, 0] == 1].tolist() == [[1, 1, 0], [1, 1, 1]]
+        kinds = {UNIT_KINDS[kind] for kind in violations[violations[:, 0] == 2][:, 1]}
+        assert kinds == {'row', 'column', 'box'}
+
+    def test_chunked_matches_single_pass(self, valid_4x4_grid):
+        """Test that chunking does not change the result."""
+        grids = np.repeat(valid_4x4_grid[np.newaxis], 10, axis=0)
+        grids[7, 2, 3] = 9
+        ok, violations = find_violations(grids, chunk_size=3)
+        assert np.flatnonzero(~ok).tolist() == [7]
+        assert np.array_equal(violations, find_violations(grids)[1])
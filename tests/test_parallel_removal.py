@@ -0,0 +1,87 @@
+import random
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+
+import pytest
+
+from bitmask_solver import BitmaskSolver
+from deadline import Deadline, FileFlag, SearchCancelled
+from parallel_removal import SpeculativeRemover, _shared_event, check_removal
+from puzzle_generator import PuzzleGenerator
+
+
+def sequential_pass(values, cells_to_remove, order):
+    """Single-cell removal pass the speculative one must agree with."""
+    solver = BitmaskSolver(9)
+    removed = 0
+    for cell in order:
+        if removed >= cells_to_remove:
+            break
+        value = values[cell]
+        values[cell] = 0
+        if solver.has_unique_solution(values):
+            removed += 1
+        else:
+            values[cell] = value
+    return removed
+
+
+class TestSpeculativeRemover:
+    def test_check_removal(self, valid_9x9_grid):
+        """Test the pool task on a full grid and on a board with two solutions."""
+        board = bytes(valid_9x9_grid.flatten().tolist())
+        assert check_removal((9, board, 0, None, None, None)) == (0, True)
+        values = [0] * 81
+        values[0] = 1
+        assert check_removal((9, bytes(values), 0, None, None, None)) == (0, False)
+
+    def test_check_removal_stops_at_deadline(self, valid_9x9_grid, tmp_path):
+        """Test that a worker's search gives up once the caller's time is up or its flag is set."""
+        board = bytes(valid_9x9_grid.flatten().tolist())
+        flag = FileFlag(str(tmp_path / 'cancel'))
+        assert check_removal((9, board, 0, None, 60, flag)) == (0, True)
+        assert check_removal((9, board, 0, None, 0, None)) == (0, False)
+        flag.set()
+        assert check_removal((9, board, 0, None, 60, flag)) == (0, False)
+
+    def test_shared_event(self, tmp_path):
+        """Test that only cancellation flags readable from other processes are sent to the workers."""
+        flag = FileFlag(str(tmp_path / 'cancel'))
+        assert _shared_event(Deadline(event=flag)) is flag
+        assert _shared_event(Deadline()) is None
+
+    @pytest.mark.parametrize("window", [1, 3, 8])
+    def test_matches_sequential_pass(self, valid_9x9_grid, window):
+        """Test that speculative checks remove exactly what the sequential pass removes."""
+        order = list(range(81))
+        random.Random(window).shuffle(order)
+        expected = valid_9x9_grid.flatten().tolist()
+        expected_removed = sequential_pass(expected, 60, order)
+
+        generator = PuzzleGenerator(9)
+        values = valid_9x9_grid.flatten().tolist()
+        generator.transpositions.put(generator.transpositions.key(values), 1)
+        with ThreadPool(2) as pool:
+            remover = SpeculativeRemover(generator, pool, window=window)
+            removed = remover.remove(values, 60, order, Deadline())
+        assert removed == expected_removed
+        assert values == expected
+        assert BitmaskSolver(9).has_unique_solution(values)
+
+    def test_generate_with_process_pool(self):
+        """Test that generation through a process pool hits the exact clue count."""
+        generator = PuzzleGenerator(9)
+        with Pool(2) as pool:
+            puzzle, solution = generator.generate_sudoku(min_clues=30, pool=pool)
+        values = puzzle.flatten().tolist()
+        assert sum(1 for value in values if value) == 30
+        assert BitmaskSolver(9).has_unique_solution(values)
+
+    def test_cancelled_deadline(self, valid_9x9_grid):
+        """Test that a cancelled deadline stops removal."""
+        generator = PuzzleGenerator(9)
+        deadline = Deadline()
+        deadline.cancel()
+        with ThreadPool(2) as pool:
+            with pytest.raises(SearchCancelled):
+                SpeculativeRemover(generator, pool).remove(valid_9x9_grid.flatten().tolist(), 50, range(81), deadline)
@@ -1,19 +1,22 @@
+import random
 import pytest
 import numpy as np
-from puzzle_generator import PuzzleGenerator
+from calibration import CLUE_TARGETS
+from deadline import Deadline
+from puzzle_generator import PuzzleGenerator, REMOVAL_POLICIES
 
 
 class TestPuzzleGenerator:
     def test_initialization_valid_sizes(self):
         """Test initializing PuzzleGenerator with valid grid sizes."""
-        for size in [4, 9, 16]:
+        for size in [4, 9, 16, 25]:
             generator = PuzzleGenerator(size=size)
             assert generator.size == size
             assert generator.box_size == int(size ** 0.5)
 
     def test_initialization_invalid_size(self):
         """Test that invalid grid sizes raise ValueError."""
-        with pytest.raises(ValueError, match="Grid size must be 4, 9, or 16"):
+        with pytest.raises(ValueError, match="Grid size must be 4, 9, 16, or 25"):
             PuzzleGenerator(size=6)
 
     def test_get_symbols(self):
@@ -31,6 +34,10 @@ class TestPuzzleGenerator:
         expected_symbols = list(range(1, 10)) + ['A', 'B', 'C', 'D', 'E', 'F', 'G']
         assert gen_16x16.symbols == expected_symbols
 
+        # 25x25 grid should have symbols 1-9 and A-P
+        gen_25x25 = PuzzleGenerator(size=25)
+        assert gen_25x25.symbols == list(range(1, 10)) + list('ABCDEFGHIJKLMNOP')
+
     def test_is_valid_empty_grid(self, puzzle_generator_9x9):
         """Test number validation in empty grid."""
         grid = np.zeros((9, 9), dtype=int)
@@ -148,8 +155,82 @@ class TestPuzzleGenerator:
         # Verify uniqueness
         assert puzzle_generator_9x9.has_unique_solution(result)
 
+    @pytest.mark.parametrize("policy", REMOVAL_POLICIES)
+    def test_removal_policies_16x16(self, puzzle_generator_16x16, policy):
+        """Test that both batch policies dig 16x16 grids to exactly the target, uniquely."""
+        puzzle_generator_16x16.removal_policy = policy
+        grid = np.zeros((16, 16), dtype=object)
+        puzzle_generator_16x16.fill_grid(grid)
+        result = puzzle_generator_16x16.remove_numbers_exact_clues(grid, num_clues=130)
+
+        assert np.count_nonzero(result) == 130
+        assert puzzle_generator_16x16.has_unique_solution(result)
+
+    def test_unknown_removal_policy(self, puzzle_generator_16x16):
+        """Test that an unknown batch policy is rejected."""
+        puzzle_generator_16x16.removal_policy = 'random'
+        grid = np.zeros((16, 16), dtype=object)
+        puzzle_generator_16x16.fill_grid(grid)
+        with pytest.raises(ValueError):
+            puzzle_generator_16x16.remove_numbers_exact_clues(grid, num_clues=130)
+
+    def test_remove_group_matches_one_by_one(self, puzzle_generator_9x9, valid_9x9_grid):
+        """Test that bisecting a group removes exactly what one-by-one removal would."""
+        generator = puzzle_generator_9x9
+        cells = list(range(81))
+        random.Random(3).shuffle(cells)
+
+        expected = valid_9x9_grid.flatten().tolist()
+        for cell in cells:
+            value = expected[cell]
+            expected[cell] = 0
+            if not generator.solver.has_unique_solution(expected):
+                expected[cell] = value
+
+        values = valid_9x9_grid.flatten().tolist()
+        key = generator.transpositions.key(values)
+        generator.transpositions.put(key, 1)
+        removed, key = generator._remove_group(values, key, [(cell, values[cell]) for cell in cells], Deadline())
+        assert values == expected
+        assert removed == 81 - sum(1 for value in values if value)
+        assert key == generator.transpositions.key(values)
+
     def test_generate_sudoku_timeout(self, puzzle_generator_9x9):
         """Test that generation times out appropriately."""
         # Force an immediate timeout by using 0 timeout
         with pytest.raises(TimeoutError):
             puzzle_generator_9x9.generate_sudoku(min_clues=81, max_attempts=1, timeout=0)
+
+    def test_generate_sudoku_clue_counts(self, puzzle_generator_4x4, puzzle_generator_9x9):
+        """Test that the default clue count is the calibrated one and infeasible counts are rejected."""
+        puzzle, _ = puzzle_generator_4x4.generate_sudoku()
+        assert np.count_nonzero(puzzle) == CLUE_TARGETS[4]['hard']
+        with pytest.raises(ValueError, match="use at least"):
+            puzzle_generator_9x9.generate_sudoku(min_clues=17)
+
+    def test_generate_sudoku_25x25(self):
+        """Test that 25x25 generation fills, digs and stays unique within the timeout."""
+        generator = PuzzleGenerator(size=25)
+        puzzle, solution = generator.generate_sudoku(min_clues=350, timeout=120)
+
+        assert puzzle.shape == (25, 25)
+        assert np.count_nonzero(puzzle) == 350
+        valid_symbols = set(generator.symbols)
+        for i in range(25):
+            assert set(solution[i, :]) == valid_symbols
+            assert set(solution[:, i]) == valid_symbols
+        assert generator.has_unique_solution(puzzle)
+
+    @pytest.mark.parametrize("size, min_clues", [(4, 6), (16, 200)])
+    def test_pack_puzzles_roundtrip(self, size, min_clues):
+        """Test that packed puzzles come back as the same grids of symbols."""
+        generator = PuzzleGenerator(size=size)
+        pairs = [generator.generate_sudoku(min_clues=min_clues) for _ in range(3)]
+        buffer = generator.pack_puzzles(pairs)
+
+        assert len(buffer) == 3 * 2 * size * size
+        unpacked = PuzzleGenerator(size=size).unpack_puzzles(buffer)
+        assert len(unpacked) == 3
+        for (puzzle, solution), (expected_puzzle, expected_solution) in zip(unpacked, pairs):
+            assert (puzzle == expected_puzzle).all()
+            assert (solution == expected_solution).all()
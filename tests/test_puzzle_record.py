@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from pdf_generator import PDFGenerator
+from puzzle_generator import PuzzleGenerator
+from puzzle_record import PuzzleRecord
+
+
+class TestPuzzleRecord:
+    def test_from_pair(self, partially_filled_9x9_grid, valid_9x9_grid):
+        """Test that a numpy pair is packed into bytes and read back as views."""
+        record = PuzzleRecord.from_pair(partially_filled_9x9_grid, valid_9x9_grid, 'easy', seed=7)
+        assert len(record.data) == 2 * 81
+        assert record.clues == np.count_nonzero(partially_filled_9x9_grid)
+        assert (record.puzzle == partially_filled_9x9_grid).all()
+        assert (record.solution == valid_9x9_grid).all()
+        assert record.puzzle.dtype == np.uint8
+        assert (record.difficulty, record.seed, record.stats) == ('easy', 7, None)
+        with pytest.raises(AttributeError):
+            record.extra = 1
+
+    def test_letters(self, puzzle_generator_16x16):
+        """Test that 16x16 letter symbols become their solver values."""
+        puzzle, solution = puzzle_generator_16x16.generate_sudoku(min_clues=200)
+        record = PuzzleRecord.from_pair(puzzle, solution)
+        assert record.solution.flatten().tolist() == puzzle_generator_16x16._to_values(solution)
+        assert record.solution.max() == 16
+
+    def test_matches_packed_pairs(self, valid_4x4_grid):
+        """Test that records use the layout of PuzzleGenerator.pack_puzzles."""
+        buffer = PuzzleGenerator(size=4).pack_puzzles([(valid_4x4_grid, valid_4x4_grid)])
+        assert PuzzleRecord(4, buffer).data == PuzzleRecord.from_pair(valid_4x4_grid, valid_4x4_grid).data
+        with pytest.raises(ValueError):
+            PuzzleRecord(4, buffer[:-1])
+
+    def test_pdf_from_records(self, tmp_path, partially_filled_9x9_grid, valid_9x9_grid):
+        """Test that PDFGenerator renders records directly."""
+        records = [PuzzleRecord.from_pair(partially_filled_9x9_grid, valid_9x9_grid, 'easy')] * 3
+        generator = PDFGenerator(grid_size=9)
+        generator.generate_puzzles_pdf(records, 'easy')
+        generator.save_pdf(str(tmp_path / "records.pdf"))
+        assert (tmp_path / "records.pdf").stat().st_size > 0
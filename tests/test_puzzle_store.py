@@ -0,0 +1,79 @@
+from multiprocessing import Pool
+
+import numpy as np
+import pytest
+
+from deadline import Deadline, SearchCancelled
+from puzzle_generator import PuzzleGenerator
+from puzzle_store import SharedPuzzleStore
+
+_worker_store = None
+
+
+def attach_store(handle):
+    global _worker_store
+    _worker_store = SharedPuzzleStore.attach(handle)
+
+
+def write_puzzle(index):
+    generator = PuzzleGenerator(size=4)
+    pair = generator.generate_sudoku(min_clues=6)
+    _worker_store.write(index, generator.pack_puzzles([pair]))
+    return index
+
+
+class TestSharedPuzzleStore:
+    def test_write_and_read_in_place(self, valid_9x9_grid):
+        """Test that written pairs are read back as views of the shared buffer."""
+        generator = PuzzleGenerator(size=9)
+        puzzle = valid_9x9_grid.copy()
+        puzzle[0, :] = 0
+        with SharedPuzzleStore(9, 3) as store:
+            store.write(1, generator.pack_puzzles([(puzzle, valid_9x9_grid)]))
+            pairs = store.pairs(1, 1)
+            assert (pairs[0][0] == puzzle).all()
+            assert (pairs[0][1] == valid_9x9_grid).all()
+            assert np.shares_memory(pairs[0][0], store.boards)
+            assert not store.pairs(0, 1)[0][1].any()
+            del pairs
+
+    def test_workers_write_into_store(self):
+        """Test that pool workers attached to the store fill their slots."""
+        generator = PuzzleGenerator(size=4)
+        with SharedPuzzleStore(4, 6) as store:
+            with Pool(2, initializer=attach_store, initargs=(store.handle(),)) as pool:
+                assert pool.map(write_puzzle, range(6)) == list(range(6))
+            for puzzle, solution in store.pairs():
+                assert np.count_nonzero(puzzle) == 6
+                assert generator.has_unique_solution(puzzle)
+                assert (solution[puzzle != 0] == puzzle[puzzle != 0]).all()
+
+    def test_first_racing_attempt_writes(self, valid_4x4_grid):
+        """Test that only the first attempt of a race writes, and that it cancels the others."""
+        generator = PuzzleGenerator(size=4)
+        first = generator.pack_puzzles([(valid_4x4_grid, valid_4x4_grid)])
+        second = generator.pack_puzzles([(np.zeros_like(valid_4x4_grid), valid_4x4_grid)])
+        deadline = Deadline()
+        with SharedPuzzleStore(4, 1) as store:
+            store.write(0, first, deadline)
+            assert deadline.cancelled
+            with pytest.raises(SearchCancelled):
+                store.write(0, second, deadline)
+            assert (store.boards[0, 0] == valid_4x4_grid).all()
+
+    def test_records_outlive_store(self, valid_9x9_grid):
+        """Test that records are copies that stay valid after the store is closed."""
+        generator = PuzzleGenerator(size=9)
+        with SharedPuzzleStore(9, 2) as store:
+            store.write(0, generator.pack_puzzles([(valid_9x9_grid, valid_9x9_grid)] * 2))
+            records = store.records(difficulty='hard')
+        assert [record.difficulty for record in records] == ['hard', 'hard']
+        assert (records[1].solution == valid_9x9_grid).all()
+        assert records[0].clues == 81
+
+    def test_capacity(self, valid_4x4_grid):
+        """Test that writes past the last slot are rejected."""
+        buffer = PuzzleGenerator(size=4).pack_puzzles([(valid_4x4_grid, valid_4x4_grid)] * 2)
+        with SharedPuzzleStore(4, 2) as store:
+            with pytest.raises(ValueError):
+                store.write(1, buffer)
@@ -0,0 +1,150 @@
+import random
+import time
+
+import pytest
+
+from deadline import Deadline
+from racing import RacePolicy, RacingExecutor
+
+
+class FixedSeeds:
+    """Stand-in for the executor's random source handing out seeds in order."""
+
+    def __init__(self, *seeds):
+        self.seeds = list(seeds)
+
+    def getrandbits(self, bits):
+        return self.seeds.pop(0)
+
+
+def finish_or_stall(deadline=None):
+    """Finish at once for seed 1, run until cancelled for seed 0."""
+    value = random.random()
+    while value > 0.5:
+        deadline.check()
+        time.sleep(0.01)
+    return value
+
+
+def square(x, deadline=None):
+    return x * x
+
+
+def fail(deadline=None):
+    raise RuntimeError("No luck")
+
+
+_worker_value = None
+
+
+def set_worker_value(value):
+    global _worker_value
+    _worker_value = value
+
+
+def read_worker_value(deadline=None):
+    return _worker_value
+
+
+def wait_for_slots(racer):
+    for _ in range(100):
+        if len(racer.free) == len(racer.flags):
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def racer():
+    with RacingExecutor(processes=2, policy=RacePolicy(initial_k=2)) as racer:
+        yield racer
+
+
+class TestRacePolicy:
+    def test_initial_k(self):
+        """Test that the initial K is used until enough races were observed."""
+        policy = RacePolicy(max_k=4, initial_k=2, min_samples=5)
+        for _ in range(4):
+            policy.observe('task', 1, 1.0)
+        assert policy.k('task') == 2
+        assert policy.k('other') == 2
+
+    def test_light_tail_is_not_raced(self):
+        """Test that tasks with steady latency run a single attempt."""
+        policy = RacePolicy(max_k=4, min_samples=20)
+        for i in range(100):
+            policy.observe('task', 1, 1.0 + i / 100)
+        assert policy.k('task') == 1
+
+    def test_heavy_tail_is_raced(self):
+        """Test that a heavy tail raises K, and that timeouts count towards it."""
+        policy = RacePolicy(max_k=4, min_samples=20)
+        for i in range(100):
+            if i % 10 == 0:
+                policy.observe('task', 1, 60.0, finished=False)
+            else:
+                policy.observe('task', 1, 1.0 + i / 100)
+        assert policy.k('task') > 1
+
+    def test_closed_loop(self):
+        """Test K when the policy only sees the races it chose: steady tasks settle at one attempt."""
+        rng = random.Random(0)
+
+        def steady():
+            return rng.uniform(0.9, 1.1)
+
+        def heavy():
+            return 40.0 if rng.random() < 0.1 else rng.uniform(0.9, 1.1)
+
+        # Races of the last 100 that ran a single attempt
+        for initial_k, draw, low, high in ((1, steady, 100, 100), (2, steady, 100, 100), (1, heavy, 0, 10)):
+            policy = RacePolicy(max_k=4, initial_k=initial_k)
+            chosen = []
+            for _ in range(300):
+                k = policy.k('task')
+                elapsed = min(draw() for _ in range(k))
+                policy.observe('task', k, min(elapsed, 30.0), finished=elapsed < 30.0)
+                chosen.append(k)
+            assert low <= chosen[-100:].count(1) <= high, chosen[-100:]
+
+    def test_survival_with_censoring(self):
+        """Test the Kaplan-Meier estimate of a race where the losers were cut off."""
+        policy = RacePolicy()
+        policy.observe('task', 2, 1.0)
+        policy.observe('task', 1, 2.0)
+        assert policy.survival('task') == [(1.0, pytest.approx(2 / 3)), (2.0, 0.0)]
+
+
+class TestRacingExecutor:
+    def test_first_finisher_wins(self, racer):
+        """Test that the finished attempt wins and the stalled one is cancelled."""
+        racer.rng = FixedSeeds(0, 1)
+        assert racer.run(finish_or_stall, key='stall') == pytest.approx(0.134364, abs=1e-6)
+        assert wait_for_slots(racer)
+        assert racer.policy.samples['stall'][0][1:] == (2, True)
+
+    def test_map_keeps_order(self, racer):
+        """Test that map returns results in task order."""
+        assert racer.map(square, [(x,) for x in range(6)]) == [0, 1, 4, 9, 16, 25]
+
+    def test_all_attempts_fail(self, racer):
+        """Test that a race where every attempt fails raises the attempt's error."""
+        with pytest.raises(RuntimeError, match="No luck"):
+            racer.run(fail)
+        assert racer.policy.samples[fail][0][2] is False
+
+    def test_caller_deadline_cancels_race(self, racer):
+        """Test that the caller's deadline stops a race and its attempts."""
+        racer.rng = FixedSeeds(0, 2)
+        with pytest.raises(TimeoutError):
+            racer.run(finish_or_stall, deadline=Deadline(0.1))
+        assert wait_for_slots(racer)
+
+    def test_worker_initializer(self):
+        """Test that the initializer runs in every worker before its tasks."""
+        with RacingExecutor(processes=2, initializer=set_worker_value, initargs=(7,)) as racer:
+            assert racer.map(read_worker_value, [()] * 4) == [7, 7, 7, 7]
+
+    def test_imap_unordered(self, racer):
+        """Test that every task is yielded once with its index."""
+        assert sorted(racer.imap_unordered(square, [(x,) for x in range(5)])) == [(x, x * x) for x in range(5)]
@@ -0,0 +1,31 @@
+import io
+from line_format import format_line
+from solve import read_chunks, solve_line, solve_stream
+
+
+class TestSolve:
+    def test_solve_line_unique(self, partially_filled_9x9_grid, valid_9x9_grid):
+        """Test that a unique puzzle line yields its solution line."""
+        line = format_line(partially_filled_9x9_grid.flatten().tolist())
+        assert solve_line(line) == ('solved', format_line(valid_9x9_grid.flatten().tolist()))
+
+    def test_solve_line_statuses(self):
+        """Test reporting of multi-solution, unsolvable and malformed lines."""
+        assert solve_line("." * 81) == ('multiple', 'multiple')
+        assert solve_line("55" + "." * 79) == ('unsolvable', 'unsolvable')
+        assert solve_line("not a sudoku") == ('invalid', 'invalid')
+
+    def test_read_chunks_skips_comments_and_blanks(self):
+        """Test chunking of an input stream."""
+        stream = io.StringIO("# header\n" + ("." * 16 + "\n") * 5 + "\n")
+        chunks = list(read_chunks(stream, 2))
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+
+    def test_solve_stream_preserves_order(self, partially_filled_9x9_grid):
+        """Test that results come back in input order across workers."""
+        unique = format_line(partially_filled_9x9_grid.flatten().tolist())
+        lines = [unique, "." * 81, "55" + "." * 79] * 4
+        for workers in (1, 2):
+            statuses = [status for results in solve_stream(read_chunks(iter(lines), 2), workers)
+                        for status, _ in results]
+            assert statuses == ['solved', 'multiple', 'unsolvable'] * 4
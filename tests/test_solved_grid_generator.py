@@ -0,0 +1,41 @@
+import random
+import pytest
+import numpy as np
+from deadline import Deadline
+from grid_validator import find_violations
+from solved_grid_generator import SolvedGridGenerator
+
+
+class TestSolvedGridGenerator:
+    @pytest.mark.parametrize("size", [4, 9, 16, 25])
+    def test_generate_valid_grids(self, size):
+        """Test that generated grids are complete and valid for all sizes."""
+        source = SolvedGridGenerator(size, pool_size=2)
+        grids = np.array([source.generate() for _ in range(4)]).reshape(-1, size, size)
+        ok, _ = find_violations(grids)
+        assert ok.all()
+        assert len(source.pool) == 2
+
+    def test_transform_preserves_validity(self, valid_9x9_grid):
+        """Test that random transforms map a solution to another solution."""
+        source = SolvedGridGenerator(9, rng=random.Random(1))
+        transformed = np.array([source.transform(valid_9x9_grid) for _ in range(20)])
+        assert find_violations(transformed)[0].all()
+        assert len({grid.tobytes() for grid in transformed}) > 1
+
+    def test_search_grid_completes_partial_board(self, partially_filled_9x9_grid, valid_9x9_grid):
+        """Test completing a given board and detecting impossible ones."""
+        source = SolvedGridGenerator(9)
+        assert source.search_grid(partially_filled_9x9_grid.flatten().tolist()) == valid_9x9_grid.flatten().tolist()
+        assert source.search_grid([5, 5] + [0] * 79) is None
+
+    def test_seeded_rng_is_reproducible(self):
+        """Test that a seeded random source yields the same grids."""
+        first = [SolvedGridGenerator(9, rng=random.Random(7)).generate() for _ in range(3)]
+        second = [SolvedGridGenerator(9, rng=random.Random(7)).generate() for _ in range(3)]
+        assert first == second
+
+    def test_search_honours_deadline(self):
+        """Test that an expired deadline stops the search."""
+        with pytest.raises(TimeoutError):
+            SolvedGridGenerator(16).search_grid(deadline=Deadline(0))
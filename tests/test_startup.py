@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Prints whether numpy or fpdf were imported while running a script's --help
+CHECK = """
+import runpy, sys
+sys.argv = [{script!r}, '--help']
+try:
+    runpy.run_path({script!r}, run_name='__main__')
+except SystemExit:
+    pass
+print('numpy' in sys.modules, 'fpdf' in sys.modules)
+"""
+
+
+def heavy_imports(script):
+    output = subprocess.run([sys.executable, '-c', CHECK.format(script=script)], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return output.split()[-2:]
+
+
+class TestStartup:
+    def test_cli_help_skips_heavy_imports(self):
+        """Test that --help of the command line tools loads neither numpy nor fpdf."""
+        for script in ('sudoku.py', 'sudoku_worker.py'):
+            assert heavy_imports(script) == ['False', 'False'], script
@@ -0,0 +1,37 @@
+import re
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+from svg_renderer import SVGRenderer, board_hash
+
+
+class TestSVGRenderer:
+    def test_invalid_size(self):
+        """Test that unsupported grid sizes raise ValueError."""
+        with pytest.raises(ValueError):
+            SVGRenderer(6)
+
+    def test_render_puzzle(self, partially_filled_9x9_grid):
+        """Test that every clue is drawn once, centred in its cell, and empty cells are left blank."""
+        svg = SVGRenderer(9).render(partially_filled_9x9_grid)
+        root = ET.fromstring(svg)
+        texts = root.findall('.//{http://www.w3.org/2000/svg}text')
+        assert len(texts) == np.count_nonzero(partially_filled_9x9_grid)
+        assert (texts[0].get('x'), texts[0].get('y'), texts[0].text) == ('6', '6', '5')
+        assert root.get('width') == '110mm'
+
+    def test_letters_on_large_grids(self):
+        """Test that values above 9 are drawn as letters, like in the PDF."""
+        board = np.zeros((16, 16), dtype=np.uint8)
+        board[0, :3] = [9, 10, 16]
+        board[1, 0] = 0
+        svg = SVGRenderer(16).render(board)
+        assert re.findall(r'>([^<]+)</text>', svg) == ['9', 'A', 'G']
+        assert SVGRenderer(16).render(board.astype(object)) == svg
+
+    def test_board_hash(self):
+        """Test that the hash depends on the board's contents only."""
+        assert board_hash([1, 0, 0, 2] * 4) == board_hash(np.array([1, 0, 0, 2] * 4))
+        assert board_hash([1, 0, 0, 2] * 4) != board_hash([2, 0, 0, 1] * 4)
@@ -0,0 +1,55 @@
+import random
+from bitmask_solver import BitmaskSolver
+from puzzle_generator import PuzzleGenerator
+from transposition_table import TranspositionTable
+
+
+class TestTranspositionTable:
+    def test_toggle_matches_full_hash(self, valid_9x9_grid):
+        """Test that incremental Zobrist updates agree with hashing from scratch."""
+        table = TranspositionTable(9, seed=1)
+        values = valid_9x9_grid.flatten().tolist()
+        key = table.key(values)
+        for cell in (0, 40, 80):
+            key = table.toggle(key, cell, values[cell])
+            values[cell] = 0
+        assert key == table.key(values)
+        assert key != table.key(valid_9x9_grid.flatten().tolist())
+
+    def test_lru_eviction(self):
+        """Test that the least recently used board is evicted first."""
+        table = TranspositionTable(4, capacity=2)
+        table.put(1, 1)
+        table.put(2, 5)
+        assert table.get(1) == 1
+        table.put(3, 0)
+        assert table.get(2) is None
+        assert table.get(1) == 1 and table.get(3) == 0
+        assert table.hits == 3 and table.misses == 1
+
+    def test_digging_matches_plain_search(self, valid_9x9_grid):
+        """Test that table-backed checks while digging agree with a fresh search."""
+        generator = PuzzleGenerator(9)
+        plain = BitmaskSolver(9)
+        values = valid_9x9_grid.flatten().tolist()
+        table = generator.transpositions
+        key = table.key(values)
+        table.put(key, 1)
+        cells = list(range(81))
+        random.Random(4).shuffle(cells)
+        for cell in cells:
+            value = values[cell]
+            values[cell] = 0
+            key = table.toggle(key, cell, value)
+            unique = generator._is_unique(values, key=key, removed=(cell, value))
+            assert unique == plain.has_unique_solution(values)
+            if not unique:
+                values[cell] = value
+                key = table.toggle(key, cell, value)
+        assert table.hits > 0
+
+    def test_table_cleared_per_puzzle(self, puzzle_generator_9x9):
+        """Test that each generated puzzle starts with a fresh table."""
+        puzzle_generator_9x9.transpositions.put(12345, 1)
+        puzzle_generator_9x9.generate_sudoku(min_clues=30)
+        assert puzzle_generator_9x9.transpositions.get(12345) is None
@@ -0,0 +1,247 @@
+import os
+import threading
+import time
+
+import pytest
+from book_cache import BookCache
+from line_format import format_line
+from web import app as web_app
+from web.app import app, API_MAX_BOARDS
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    return app.test_client()
+
+
+class TestApi:
+    def test_validate_single_board(self, client, valid_9x9_grid):
+        """Test validating one board given as rows."""
+        response = client.post('/api/validate', json={'board': valid_9x9_grid.tolist()})
+        assert response.status_code == 200
+        assert response.json['result'] == {'valid': True, 'complete': True, 'solved': True}
+        assert 'validate;dur=' in response.headers['Server-Timing']
+
+    def test_validate_batch_mixed_sizes(self, client, valid_4x4_grid, partially_filled_9x9_grid):
+        """Test validating a batch of line-format boards of different sizes."""
+        conflict = "55" + "." * 79
+        boards = [valid_4x4_grid.tolist(), format_line(partially_filled_9x9_grid.flatten().tolist()), conflict]
+        response = client.post('/api/validate', json={'boards': boards})
+        assert [r['valid'] for r in response.json['results']] == [True, True, False]
+        assert [r['complete'] for r in response.json['results']] == [True, False, False]
+
+    def test_solve(self, client, partially_filled_9x9_grid, valid_9x9_grid):
+        """Test solving unique, ambiguous and invalid boards."""
+        boards = [partially_filled_9x9_grid.tolist(), "." * 81, "55" + "." * 79]
+        results = client.post('/api/solve', json={'boards': boards}).json['results']
+        assert results[0]['unique'] and results[0]['solution'] == valid_9x9_grid.tolist()
+        assert results[1]['solvable'] and not results[1]['unique']
+        assert not results[2]['valid'] and results[2]['solution'] is None
+        assert not any(result['too_open'] for result in results)
+
+    def test_solve_open_board(self, client, open_25x25_line, partially_filled_9x9_grid):
+        """Test that a board over its node budget is answered as too open and the batch goes on."""
+        boards = [open_25x25_line, partially_filled_9x9_grid.tolist()]
+        results = client.post('/api/solve', json={'boards': boards}).json['results']
+        assert results[0] == {'valid': True, 'too_open': True, 'solvable': None, 'unique': None, 'solution': None}
+        assert results[1]['unique'] and not results[1]['too_open']
+
+    def test_solve_batch_deadline(self, client, monkeypatch, partially_filled_9x9_grid):
+        """Test that boards the batch deadline does not reach are answered as too open."""
+        monkeypatch.setattr(web_app, 'SOLVE_TIMEOUT', 0)
+        result = client.post('/api/solve', json={'board': partially_filled_9x9_grid.tolist()}).json['result']
+        assert result['too_open'] and result['solution'] is None
+
+    @pytest.mark.parametrize("payload", [
+        {},
+        {'board': "123"},
+        {'board': [[1, 2], [2, 1]]},
+        {'boards': []},
+        {'boards': ["." * 81] * (API_MAX_BOARDS['solve'] + 1)},
+    ])
+    def test_solve_rejects_bad_requests(self, client, payload):
+        """Test request validation and batch size limits."""
+        response = client.post('/api/solve', json=payload)
+        assert response.status_code == 400
+        assert response.json['status'] == 'error'
+
+    def test_metrics(self, client):
+        """Test that latency metrics are recorded per endpoint."""
+        client.post('/api/validate', json={'board': "." * 16})
+        metrics = client.get('/api/metrics').json
+        assert metrics['validate']['count'] >= 1
+        assert 'p99_ms' in metrics['validate']
+
+
+class TestBooks:
+    def test_download_again(self, client, tmp_path, monkeypatch):
+        """Test that the form leads to a page linking the book and its answers, which can be downloaded again."""
+        monkeypatch.setattr(web_app, '_book_cache', BookCache(str(tmp_path)))
+        response = client.post('/generate', data={'grid_size': '4', 'difficulty': 'easy', 'num_puzzles': '3'})
+        assert response.status_code == 303
+        book_id = response.headers['X-Book-Id']
+        assert response.headers['Location'].endswith(f'/books/{book_id}/ready')
+
+        page = client.get(response.headers['Location'])
+        assert page.status_code == 200
+        assert f'href="/books/{book_id}"'.encode() in page.data
+        assert f'href="/books/{book_id}/answers"'.encode() in page.data
+
+        response = client.get(f'/books/{book_id}')
+        assert response.status_code == 200
+        first = response.data
+        assert first.startswith(b'%PDF')
+        response.close()
+
+        for name in os.listdir(tmp_path):
+            if name.endswith('.pdf'):
+                os.remove(tmp_path / name)
+        response = client.get(f'/books/{book_id}')
+        assert response.status_code == 200
+        assert response.data == first
+        response.close()
+        response = client.get(f'/books/{book_id}/answers')
+        assert response.status_code == 200
+        assert response.data.startswith(b'%PDF')
+        response.close()
+
+    def test_unknown_book(self, client):
+        """Test that unknown and malformed book ids are not found."""
+        assert client.get('/books/' + '0' * 40).status_code == 404
+        assert client.get('/books/not-an-id/answers').status_code == 404
+        assert client.get('/books/' + '0' * 40 + '/ready').status_code == 404
+
+
+class TestJobs:
+    @pytest.fixture(autouse=True)
+    def jobs_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(web_app, 'JOBS_DIR', str(tmp_path))
+        return tmp_path
+
+    def test_cancel_unknown_job(self, client):
+        """Test cancelling a job id that is not running."""
+        response = client.post('/jobs/does-not-exist/cancel')
+        assert response.status_code == 404
+        assert client.post('/jobs/..%2F..%2Fetc/cancel').status_code == 404
+
+    def test_cancel_running_job(self, client, jobs_dir, monkeypatch):
+        """Test that a cancel request stops a running job through the job's flag file alone."""
+        def generate_until_cancelled(grid_size, difficulty, deadline):
+            while True:
+                deadline.check()
+                time.sleep(0.01)
+
+        monkeypatch.setattr(web_app, '_generate_one', generate_until_cancelled)
+        responses = []
+        form = {'grid_size': '9', 'difficulty': 'easy', 'num_puzzles': '1', 'job_id': 'job-1'}
+        worker = threading.Thread(target=lambda: responses.append(app.test_client().post('/generate', data=form)))
+        worker.start()
+        while not (jobs_dir / 'job-1.running').exists():
+            time.sleep(0.01)
+
+        assert client.post('/jobs/job-1/cancel').status_code == 200
+        worker.join(timeout=10)
+        assert responses[0].status_code == 500
+        assert 'cancelled' in responses[0].json['message']
+        assert not list(jobs_dir.iterdir())
+        assert client.post('/jobs/job-1/cancel').status_code == 404
+
+
+class TestPreload:
+    def test_preload_builds_solvers(self):
+        """Test that preload imports the generation stack and builds a solver per grid size."""
+        import sys
+        from web import app as web_app
+        web_app.preload()
+        assert {'pdf_generator', 'puzzle_generator', 'racing'} <= set(sys.modules)
+        assert set(web_app._solvers) == {4, 9, 16, 25}
+
+
+class TestGenerationPools:
+    def test_one_shared_pool(self, monkeypatch):
+        """Test that removal checks share the racer's pool and that shutdown stops it."""
+        monkeypatch.setattr(web_app, 'GENERATION_PROCESSES', 2)
+        racer = web_app._get_racer()
+        try:
+            assert racer.processes == 2
+            assert web_app._get_removal_pool() is racer.pool
+        finally:
+            web_app.shutdown()
+        assert web_app._racer is None
+
+    def test_pools_disabled(self, monkeypatch):
+        """Test that no pool is started when generation processes are disabled."""
+        monkeypatch.setattr(web_app, 'GENERATION_PROCESSES', 0)
+        assert web_app._get_racer() is None
+        assert web_app._get_removal_pool() is None
+
+    def test_gunicorn_divides_cpus(self, monkeypatch):
+        """Test that the gunicorn settings split the CPUs between workers and their pools."""
+        import runpy
+        config = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'web', 'gunicorn.conf.py')
+        monkeypatch.setattr(os, 'cpu_count', lambda: 8)
+        monkeypatch.setattr(os, 'environ', {})
+        assert runpy.run_path(config)['workers'] == 4
+        assert os.environ['GENERATION_PROCESSES'] == '2'
+
+        os.environ['GENERATION_PROCESSES'] = '0'
+        assert runpy.run_path(config)['workers'] == 8
+
+        # A second worker stays free for cancel requests
+        monkeypatch.setattr(os, 'cpu_count', lambda: 1)
+        os.environ.clear()
+        assert runpy.run_path(config)['workers'] == 2
+        assert os.environ['GENERATION_PROCESSES'] == '1'
+
+
+class TestPreview:
+    def test_preview_svg(self, client, partially_filled_9x9_grid):
+        """Test that a board line is served as SVG with long-lived caching and an ETag."""
+        line = format_line(partially_filled_9x9_grid.flatten().tolist())
+        response = client.get(f'/preview/{line}.svg')
+        assert response.status_code == 200
+        assert response.mimetype == 'image/svg+xml'
+        assert response.data.startswith(b'<svg')
+        assert 'immutable' in response.headers['Cache-Control']
+
+        again = client.get(f'/preview/{line.replace(".", "0")}.svg',
+                           headers={'If-None-Match': response.headers['ETag']})
+        assert again.status_code == 304
+
+    def test_preview_invalid_board(self, client):
+        """Test that malformed boards are rejected."""
+        assert client.get('/preview/12345.svg').status_code == 400
+
+
+class TestSession:
+    def test_session_round_trip(self, client, partially_filled_9x9_grid):
+        """Test that a client can carry the session state between moves and ask for hints."""
+        line = format_line(partially_filled_9x9_grid.flatten().tolist())
+        response = client.post('/api/session', json={'board': line, 'moves': [[0, 2, 5]]})
+        assert response.status_code == 200
+        assert response.json['conflicts'] == [[0, 0], [0, 2]]
+        assert response.json['solvable'] is False
+
+        response = client.post('/api/session', json={'state': response.json['state'], 'moves': [[0, 2, 0]],
+                                                      'hint': True})
+        assert response.json['conflicts'] == []
+        assert response.json['solvable'] is True
+        hint = response.json['hint']
+        assert hint['value'] == [
+            [5, 3, 4, 6, 7, 8, 9, 1, 2], [6, 7, 2, 1, 9, 5, 3, 4, 8], [1, 9, 8, 3, 4, 2, 5, 6, 7],
+            [8, 5, 9, 7, 6, 1, 4, 2, 3], [4, 2, 6, 8, 5, 3, 7, 9, 1], [7, 1, 3, 9, 2, 4, 8, 5, 6],
+            [9, 6, 1, 5, 3, 7, 2, 8, 4], [2, 8, 7, 4, 1, 9, 6, 3, 5], [3, 4, 5, 2, 8, 6, 1, 7, 9]
+        ][hint['row']][hint['col']]
+
+    @pytest.mark.parametrize('payload', [
+        {},
+        {'state': 42},
+        {'board': "." * 16, 'moves': [[4, 0, 1]]},
+        {'board': "1" + "." * 15, 'moves': [[0, 0, 2]]},
+    ])
+    def test_session_rejects_bad_requests(self, client, payload):
+        """Test validation of session requests."""
+        response = client.post('/api/session', json=payload)
+        assert response.status_code == 400
+        assert response.json['status'] == 'error'
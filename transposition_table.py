@@ -0,0 +1,70 @@
+import random
+from collections import OrderedDict
+
+
+class TranspositionTable:
+    """Bounded LRU cache of solution counts keyed by Zobrist hashes of boards.
+
+    Every (cell, value) pair gets a random 64-bit key and a board hashes to
+    the XOR of the keys of its clues, so removing or restoring one clue
+    updates a hash with a single XOR (see toggle). Counts are stored capped
+    at 2, which is all a uniqueness check needs: 0 (no solution), 1 (unique)
+    or 2 (several). Only finished searches are stored.
+
+    Digging removes one clue at a time from a board already proven unique.
+    When the removed clue is forced back by a single, the new board leads
+    straight back to its parent, so the parent's entry settles the check
+    without a search (see PuzzleGenerator._is_unique).
+
+    One table is shared by all uniqueness checks while digging one puzzle
+    and cleared when the next puzzle starts.
+    """
+
+    def __init__(self, size=9, capacity=1 << 16, seed=None):
+        """Initialize the Zobrist keys and an empty table.
+
+        Args:
+            size (int): Size of the grid (4, 9, 16, or 25)
+            capacity (int): Maximum number of boards kept, least recently used evicted first
+            seed: Seed for the Zobrist keys, random by default
+        """
+        rng = random.Random(seed)
+        self.zobrist = tuple(
+            (0,) + tuple(rng.getrandbits(64) for _ in range(size)) for _ in range(size * size)
+        )
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, values):
+        """Hash a flat board, 0 for empty cells."""
+        key = 0
+        for keys, value in zip(self.zobrist, values):
+            key ^= keys[value]
+        return key
+
+    def toggle(self, key, cell, value):
+        """Return the hash after placing value in cell or clearing it from there."""
+        return key ^ self.zobrist[cell][value]
+
+    def get(self, key):
+        """Return the stored solution count (capped at 2), or None if unknown."""
+        count = self.entries.get(key)
+        if count is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return count
+
+    def put(self, key, count):
+        """Store a solution count, evicting the least recently used board when full."""
+        self.entries[key] = min(count, 2)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """Forget all boards, e.g. when digging starts on a new solution."""
+        self.entries.clear()
@@ -1,20 +1,134 @@
-from flask import Flask, render_template, request, send_file, jsonify
+from flask import Flask, render_template, request, send_file, jsonify, redirect, url_for
 import os
+import re
 from dotenv import load_dotenv
 from pathlib import Path
 import tempfile
+import time
+from collections import deque
 from datetime import datetime
+from functools import wraps
+import importlib
+import numpy as np
 
 # Import existing PDF generator
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from pdf_generator import PDFGenerator
-from puzzle_generator import generate_puzzle
+from bitmask_solver import BitmaskSolver, SearchLimitReached, SUPPORTED_SIZES
+from grid_validator import validate_grids
+from line_format import format_line, parse_line, parse_rows
+from svg_renderer import SVGRenderer, board_hash
+from board_session import BoardSession, MAX_SEARCH_NODES
+from puzzle_record import PuzzleRecord
+from book_cache import BookCache
+from deadline import Deadline, FileFlag
+# pdf_generator (fpdf), puzzle_generator and racing are only needed by
+# /generate and imported there, or up front by preload() under gunicorn
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
+app.config['MAX_CONTENT_LENGTH'] = 1024 * 1024  # 1 MB JSON bodies
+
+# Per-request limits on the number of boards in a batch
+API_MAX_BOARDS = {
+    'validate': 1000,
+    'solve': 100
+}
+
+# Solvers are cached per process so lookup tables are built once
+_solvers = {}
+
+# SVG renderers by grid size, each holding the static frame of its previews
+_renderers = {}
+
+# Previews are rendered from the board alone, so a board's preview never changes
+PREVIEW_MAX_AGE = 365 * 24 * 3600
+
+# Recent request latencies in milliseconds, per API endpoint
+_latencies = {name: deque(maxlen=1000) for name in (*API_MAX_BOARDS, 'session')}
+
+# Seconds an /api/solve batch may spend searching; boards it does not reach are too open
+SOLVE_TIMEOUT = 10
+
+# Seconds a /generate request may spend generating puzzles
+GENERATION_TIMEOUT = 90
+
+# Running /generate requests by client-supplied job id, kept as files so that a
+# cancel request reaching any web process finds them; created on first use
+JOBS_DIR = os.getenv('JOBS_DIR', os.path.join(tempfile.gettempdir(), 'sudoku-jobs'))
+JOB_ID_PATTERN = re.compile(r'[A-Za-z0-9-]{1,64}')
+
+# Processes each web process may start for generation; gunicorn.conf.py
+# divides the CPUs between its workers. 0 or 1 disables the pools.
+GENERATION_PROCESSES = int(os.getenv('GENERATION_PROCESSES', os.cpu_count() or 1))
+
+# Generated books on local disk, so they can be downloaded again without
+# generating their puzzles again; created on first use
+BOOK_CACHE_DIR = os.getenv('BOOK_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'sudoku-books'))
+BOOK_CACHE_BYTES = int(os.getenv('BOOK_CACHE_BYTES', 256 * 1024 * 1024))
+_book_cache = None
+
+
+def _get_book_cache():
+    global _book_cache
+    if _book_cache is None:
+        _book_cache = BookCache(BOOK_CACHE_DIR, BOOK_CACHE_BYTES)
+    return _book_cache
+
+# Races independently seeded generation attempts when latency is heavy-tailed,
+# started on first use; None when generation pools are disabled
+_racer = None
+
+
+def _get_racer():
+    global _racer
+    if _racer is None and GENERATION_PROCESSES > 1:
+        from racing import RacingExecutor
+        _racer = RacingExecutor(processes=GENERATION_PROCESSES)
+    return _racer
+
+
+# Speculative removal checks on 16x16 and larger grids share the racer's
+# pool, which sits idle while a request generates without racing
+def _get_removal_pool():
+    racer = _get_racer()
+    return racer.pool if racer is not None else None
+
+
+def shutdown():
+    """Stop the generation processes; gunicorn runs this as each worker exits."""
+    global _racer
+    if _racer is not None:
+        _racer.close()
+        _racer = None
+
+
+def _generate_one(grid_size, difficulty, deadline):
+    """Generate one puzzle, racing attempts when its kind of task has a heavy tail.
+
+    Otherwise 16x16 and 25x25 puzzles spread their removal checks over the
+    removal pool instead, and the time taken feeds the racing policy.
+    """
+    from puzzle_generator import generate_puzzle
+
+    key = (grid_size, difficulty)
+    racer = _get_racer()
+    if racer is not None and racer.policy.k(key) > 1:
+        return racer.run(generate_puzzle, (grid_size, difficulty), key=key,
+                         timeout=deadline.remaining(), deadline=deadline)
+    pool = _get_removal_pool() if grid_size >= 16 else None
+    start = time.monotonic()
+    try:
+        result = generate_puzzle(grid_size, difficulty, deadline=deadline, pool=pool)
+    except (TimeoutError, RuntimeError):
+        if racer is not None:
+            racer.policy.observe(key, 1, time.monotonic() - start, finished=False)
+        raise
+    if racer is not None:
+        racer.policy.observe(key, 1, time.monotonic() - start)
+    return result
 
 # Add current year to all template contexts
 @app.context_processor
@@ -34,9 +148,9 @@ def generate():
         num_puzzles = min(int(request.form['num_puzzles']), 50)  # Limit to 50 puzzles max
         
         # Validate input
-        valid_grid_sizes = [4, 9, 16]
+        valid_grid_sizes = [4, 9, 16, 25]
         if grid_size not in valid_grid_sizes:
-            raise ValueError("Grid size must be 4x4, 9x9, or 16x16")
+            raise ValueError("Grid size must be 4x4, 9x9, 16x16, or 25x25")
         
         if difficulty not in ['easy', 'medium', 'hard']:
             raise ValueError("Invalid difficulty level")
@@ -44,29 +158,33 @@ def generate():
         if num_puzzles < 1:
             raise ValueError("Number of puzzles must be at least 1")
         
-        # Generate puzzles
-        puzzles = []
-        for _ in range(num_puzzles):
-            puzzle, solution = generate_puzzle(grid_size, difficulty)
-            puzzles.append((puzzle, solution))
-        
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp:
-            pdf_path = tmp.name
-        
-        # Generate PDF
-        generator = PDFGenerator(grid_size=grid_size)
-        generator.generate_puzzles_pdf(puzzles, difficulty)
-        generator.save_pdf(pdf_path)
+        # Generate puzzles under one deadline that /jobs/<job_id>/cancel can stop
+        # from any web process
+        flags = _job_flags(request.form.get('job_id') or '')
+        if flags:
+            os.makedirs(JOBS_DIR, exist_ok=True)
+            running, cancelled = flags
+            cancelled.clear()
+            running.set()
+        deadline = Deadline(GENERATION_TIMEOUT, event=flags[1] if flags else None)
+        try:
+            puzzles = []
+            for _ in range(num_puzzles):
+                start = time.monotonic()
+                puzzle, solution = _generate_one(grid_size, difficulty, deadline)
+                puzzles.append(PuzzleRecord.from_pair(puzzle, solution, difficulty,
+                                                      stats={'seconds': time.monotonic() - start}))
+        finally:
+            if flags:
+                running.clear()
+                cancelled.clear()
         
-        # Send file
-        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-        return send_file(
-            pdf_path,
-            as_attachment=True,
-            download_name=f'sudoku-{difficulty}-{timestamp}.pdf',
-            mimetype='application/pdf'
-        )
+        # Keep the batch and send the browser to a page linking the book and its
+        # answers, which stay downloadable while the batch is cached
+        book_id = _get_book_cache().put(puzzles, difficulty)
+        response = redirect(url_for('book_page', book_id=book_id), code=303)
+        response.headers['X-Book-Id'] = book_id
+        return response
         
     except Exception as e:
         return jsonify({
@@ -74,5 +192,304 @@ def generate():
             'message': str(e)
         }), 500
 
+def _job_flags(job_id):
+    """(running, cancelled) flags of a job, or None for a malformed job id."""
+    if not JOB_ID_PATTERN.fullmatch(job_id):
+        return None
+    path = os.path.join(JOBS_DIR, job_id)
+    return FileFlag(path + '.running'), FileFlag(path + '.cancel')
+
+
+def _get_book(book_id):
+    """A cached book's (difficulty, records), or None if the id is unknown or malformed."""
+    try:
+        return _get_book_cache().records(book_id)
+    except ValueError:
+        return None
+
+
+def _send_book(book_id, answers=False):
+    """Send a cached book's PDF, rendering it from its batch if needed; 404 if the book is unknown."""
+    try:
+        pdf = _get_book_cache().open(book_id, answers=answers)
+    except ValueError:
+        pdf = None
+    if pdf is None:
+        return jsonify({'status': 'error', 'message': 'No book with that id'}), 404
+    name = f'sudoku-{book_id[:12]}{"-answers" if answers else ""}.pdf'
+    return send_file(pdf, as_attachment=True, download_name=name, mimetype='application/pdf')
+
+
+@app.route('/books/<book_id>/ready')
+def book_page(book_id):
+    book = _get_book(book_id)
+    if book is None:
+        return jsonify({'status': 'error', 'message': 'No book with that id'}), 404
+    difficulty, records = book
+    return render_template('book.html', book_id=book_id, difficulty=difficulty, grid_size=records[0].size,
+                           count=len(records), preview=format_line(records[0].puzzle.ravel().tolist()))
+
+
+@app.route('/books/<book_id>')
+def download_book(book_id):
+    return _send_book(book_id)
+
+
+@app.route('/books/<book_id>/answers')
+def download_answers(book_id):
+    return _send_book(book_id, answers=True)
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    flags = _job_flags(job_id)
+    if flags is None or not flags[0].is_set():
+        return jsonify({'status': 'error', 'message': 'No running job with that id'}), 404
+    flags[1].set()
+    return jsonify({'status': 'ok'})
+
+
+def preload():
+    """Import the generation stack and build the lookup tables of every grid size.
+
+    gunicorn runs this in the master process (see gunicorn.conf.py), so that
+    its workers share the modules and tables copy-on-write instead of each
+    importing and building their own.
+    """
+    for module in ('pdf_generator', 'puzzle_generator', 'racing'):
+        importlib.import_module(module)
+    for size in SUPPORTED_SIZES:
+        _get_solver(size)
+        _get_renderer(size)
+
+
+def _get_solver(size):
+    solver = _solvers.get(size)
+    if solver is None:
+        solver = _solvers[size] = BitmaskSolver(size)
+    return solver
+
+
+def _get_renderer(size):
+    renderer = _renderers.get(size)
+    if renderer is None:
+        renderer = _renderers[size] = SVGRenderer(size)
+    return renderer
+
+
+def _parse_board(board):
+    """Parse one board given as a line-format string or a list of rows."""
+    size, values = parse_line(board) if isinstance(board, str) else parse_rows(board)
+    if size not in SUPPORTED_SIZES:
+        raise ValueError(f"Grid size must be one of {', '.join(map(str, SUPPORTED_SIZES))}")
+    return size, values
+
+
+def _parse_request_boards(endpoint):
+    """Read `board` or `boards` from the JSON body.
+
+    Returns:
+        tuple: (boards, single) where boards is a list of (size, values)
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or ('board' in payload) == ('boards' in payload):
+        raise ValueError("Request body must be a JSON object with either 'board' or 'boards'")
+
+    single = 'board' in payload
+    boards = [payload['board']] if single else payload['boards']
+    if not isinstance(boards, list) or not boards:
+        raise ValueError("'boards' must be a non-empty list")
+    if len(boards) > API_MAX_BOARDS[endpoint]:
+        raise ValueError(f"At most {API_MAX_BOARDS[endpoint]} boards per request")
+    return [_parse_board(board) for board in boards], single
+
+
+def _validate_batch(boards):
+    """Vectorized validity check, one NumPy call per grid size in the batch."""
+    valid = [False] * len(boards)
+    complete = [False] * len(boards)
+    by_size = {}
+    for index, (size, _) in enumerate(boards):
+        by_size.setdefault(size, []).append(index)
+
+    for size, indices in by_size.items():
+        grids = np.array([boards[i][1] for i in indices], dtype=np.int32).reshape(-1, size, size)
+        batch_valid, batch_complete = validate_grids(grids)
+        for i, is_valid, is_complete in zip(indices, batch_valid.tolist(), batch_complete.tolist()):
+            valid[i] = is_valid
+            complete[i] = is_complete
+    return valid, complete
+
+
+def api_endpoint(name):
+    """Wrap a JSON API view with error handling and latency metrics."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper():
+            start_time = time.perf_counter()
+            try:
+                boards, single = _parse_request_boards(name)
+                results = view(boards)
+                status = 200
+                body = {'status': 'ok'}
+                if single:
+                    body['result'] = results[0]
+                else:
+                    body['results'] = results
+            except ValueError as e:
+                status = 400
+                body = {'status': 'error', 'message': str(e)}
+
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            _latencies[name].append(elapsed_ms)
+            body['elapsed_ms'] = round(elapsed_ms, 3)
+            response = jsonify(body)
+            response.status_code = status
+            response.headers['Server-Timing'] = f'{name};dur={elapsed_ms:.3f}'
+            return response
+        return wrapper
+    return decorator
+
+
+@app.route('/api/validate', methods=['POST'])
+@api_endpoint('validate')
+def api_validate(boards):
+    valid, complete = _validate_batch(boards)
+    return [
+        {'valid': is_valid, 'complete': is_complete, 'solved': is_valid and is_complete}
+        for is_valid, is_complete in zip(valid, complete)
+    ]
+
+
+@app.route('/api/solve', methods=['POST'])
+@api_endpoint('solve')
+def api_solve(boards):
+    valid, _ = _validate_batch(boards)
+    deadline = Deadline(SOLVE_TIMEOUT)
+    results = []
+    for (size, values), is_valid in zip(boards, valid):
+        count, solution = _search_board(size, values, deadline) if is_valid else (0, None)
+        results.append({
+            'valid': is_valid,
+            'too_open': count is None,
+            'solvable': None if count is None else count > 0,
+            'unique': None if count is None else count == 1,
+            'solution': np.array(solution).reshape(size, size).tolist() if solution else None
+        })
+    return results
+
+
+def _search_board(size, values, deadline):
+    """Count solutions up to two within the board's node budget.
+
+    Returns:
+        tuple: (count, solution), or (None, None) if the board is too open to
+        settle within the budget or the batch deadline has passed
+    """
+    if deadline.expired():
+        return None, None
+    try:
+        return _get_solver(size).solve(values, limit=2, max_nodes=MAX_SEARCH_NODES[size])
+    except SearchLimitReached:
+        return None, None
+
+
+def _apply_moves(session, moves):
+    """Apply [row, col, value] moves in order, value 0 erasing the cell."""
+    if not isinstance(moves, list):
+        raise ValueError("'moves' must be a list of [row, col, value]")
+    size = session.size
+    for move in moves:
+        if (not isinstance(move, list) or len(move) != 3 or not all(isinstance(item, int) for item in move)
+                or not 0 <= move[0] < size or not 0 <= move[1] < size):
+            raise ValueError(f"Moves must be [row, col, value] with row and col below {size}")
+        row, col, value = move
+        if value:
+            session.place(row * size + col, value)
+        else:
+            session.erase(row * size + col)
+
+
+@app.route('/api/session', methods=['POST'])
+def api_session():
+    """Play a board without server-side state.
+
+    The body holds either a new `board` or the `state` returned by an earlier
+    call, optional `moves` to apply and `hint: true` to ask for the next step.
+    The response carries the new state for the client to send back.
+    """
+    start_time = time.perf_counter()
+    try:
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict) or ('board' in payload) == ('state' in payload):
+            raise ValueError("Request body must be a JSON object with either 'board' or 'state'")
+        if 'board' in payload:
+            session = BoardSession(*_parse_board(payload['board']))
+        elif isinstance(payload['state'], str):
+            session = BoardSession.from_state(payload['state'])
+        else:
+            raise ValueError("'state' must be a string")
+        _apply_moves(session, payload.get('moves', []))
+
+        size = session.size
+        body = {
+            'status': 'ok',
+            'state': session.state(),
+            'conflicts': [[cell // size, cell % size] for cell in session.conflicts()],
+            'complete': session.is_complete(),
+            'solvable': session.is_solvable()
+        }
+        if payload.get('hint'):
+            step = session.next_step()
+            body['hint'] = step and {'row': step['cell'] // size, 'col': step['cell'] % size,
+                                     'value': step['value'], 'technique': step['technique']}
+        status = 200
+    except ValueError as e:
+        status = 400
+        body = {'status': 'error', 'message': str(e)}
+
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    _latencies['session'].append(elapsed_ms)
+    body['elapsed_ms'] = round(elapsed_ms, 3)
+    response = jsonify(body)
+    response.status_code = status
+    response.headers['Server-Timing'] = f'session;dur={elapsed_ms:.3f}'
+    return response
+
+
+@app.route('/preview/<board>.svg')
+def preview(board):
+    """SVG of one board given in line format, cached by clients under the board's hash."""
+    try:
+        size, values = _parse_board(board)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    rows = [values[row * size:(row + 1) * size] for row in range(size)]
+    response = app.response_class(_get_renderer(size).render(rows), mimetype='image/svg+xml')
+    response.set_etag(board_hash(values))
+    response.cache_control.public = True
+    response.cache_control.max_age = PREVIEW_MAX_AGE
+    response.cache_control.immutable = True
+    return response.make_conditional(request)
+
+
+@app.route('/api/metrics')
+def api_metrics():
+    """Latency summary of recent API requests, per endpoint."""
+    metrics = {}
+    for name, samples in _latencies.items():
+        if not samples:
+            metrics[name] = {'count': 0}
+            continue
+        values = np.array(samples)
+        metrics[name] = {
+            'count': len(values),
+            'mean_ms': round(float(values.mean()), 3),
+            'p50_ms': round(float(np.percentile(values, 50)), 3),
+            'p99_ms': round(float(np.percentile(values, 99)), 3)
+        }
+    return jsonify(metrics)
+
+
 if __name__ == '__main__':
     app.run(debug=os.getenv('FLASK_ENV') == 'development')
@@ -0,0 +1,40 @@
+"""gunicorn settings for the web app: gunicorn -c web/gunicorn.conf.py
+
+The app is loaded once in the master process, which then imports the
+generation stack and builds the solver tables of every grid size
+(app.preload) before forking the workers. The workers share all of it
+copy-on-write instead of each importing and building their own.
+
+Each worker also starts a pool of GENERATION_PROCESSES processes on its
+first /generate request. By default half the CPUs serve requests and the
+pools divide the CPUs between the workers; GENERATION_PROCESSES=0
+disables the pools and runs a worker per CPU instead. There are at least
+two workers, so that a cancel request for a running /generate job is not
+queued behind it.
+"""
+import gc
+import os
+import sys
+
+wsgi_app = 'web.app:app'
+bind = os.getenv('BIND', '0.0.0.0:8000')
+cpus = os.cpu_count() or 1
+pools = os.getenv('GENERATION_PROCESSES') != '0'
+workers = int(os.getenv('WEB_CONCURRENCY', max(2, cpus // 2 if pools else cpus)))
+if pools:
+    # Read by the app when the master loads it
+    os.environ.setdefault('GENERATION_PROCESSES', str(max(1, cpus // workers)))
+# /generate may run for app.GENERATION_TIMEOUT seconds
+timeout = 120
+preload_app = True
+
+
+def on_starting(server):
+    sys.modules[server.app.wsgi().import_name].preload()
+    # Move the preloaded objects out of the collector's reach; collections
+    # write to the objects they traverse and would copy their pages into every worker
+    gc.freeze()
+
+
+def worker_exit(server, worker):
+    sys.modules[server.app.wsgi().import_name].shutdown()
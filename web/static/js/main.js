@@ -3,18 +3,37 @@ document.addEventListener('DOMContentLoaded', function() {
     const submitButton = form.querySelector('button[type="submit"]');
     const originalButtonText = submitButton.innerText;
 
+    const jobIdInput = form.querySelector('input[name="job_id"]');
+    let runningJobId = null;
+
     form.addEventListener('submit', function() {
+        // A resubmitted form replaces the request still running
+        if (runningJobId) {
+            navigator.sendBeacon(`/jobs/${runningJobId}/cancel`);
+        }
+        // Tag the request so the server can cancel it if the user leaves
+        runningJobId = crypto.randomUUID();
+        jobIdInput.value = runningJobId;
+
         // Disable button and show loading state
         submitButton.disabled = true;
         submitButton.innerText = 'Generating...';
 
-        // Re-enable after a delay (in case of error)
+        // Re-enable after a delay (in case of error). The job id is kept until
+        // the response replaces this page, as large grids take much longer.
         setTimeout(() => {
             submitButton.disabled = false;
             submitButton.innerText = originalButtonText;
         }, 10000);
     });
 
+    // Stop server-side generation when the page is closed mid-request
+    window.addEventListener('pagehide', function() {
+        if (runningJobId) {
+            navigator.sendBeacon(`/jobs/${runningJobId}/cancel`);
+        }
+    });
+
     // Handle radio button styling
     const difficultyOptions = document.querySelectorAll('input[name="difficulty"]');
     difficultyOptions.forEach(radio => {